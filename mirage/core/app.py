@@ -114,7 +114,7 @@ class App(interpreter.Interpreter):
 		:param pattern: Filter
 		:type pattern: str
 		'''
-		io.chart(["PID","Name","State","Output"], self.taskManager.getTasksList(pattern),"Background Tasks")
+		io.chart(["PID","Name","State","Output","CPU time (s)","Memory (kB)"], self.taskManager.getTasksList(pattern),"Background Tasks")
 
 	def create_scenario(self):
 		'''
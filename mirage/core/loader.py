@@ -7,13 +7,10 @@ class Loader:
 	def __init__(self):
 		'''
 		This constructor generates the modules list.
+		The modules are indexed without being imported : a module is imported when it is loaded.
 		'''
 		import mirage.modules as modules
-		self.modulesList = {}
-		for moduleName,module in modules.__modules__.items():
-			current = module#__import__("modules."+module, fromlist=module)
-			moduleClass = getattr(current,moduleName)
-			self.modulesList[moduleName] = moduleClass
+		self.modulesList = modules.__modules__
 
 	def getModulesNames(self):
 		'''
@@ -33,8 +30,9 @@ class Loader:
 		:return: an instance of the module
 		:rtype: core.module.Module
 		'''
-		if moduleName in self.modulesList:
-			return self.modulesList[moduleName]()
+		moduleClass = self.modulesList.getClass(moduleName)
+		if moduleClass is not None:
+			return moduleClass()
 		else:
 			return None
 
@@ -42,6 +40,7 @@ class Loader:
 	def list(self,pattern=""):
 		'''
 		Display the list of module, filtered by the string provided as ``pattern``.
+		The informations are provided by the modules' manifest, so the modules are not imported.
 
 		:param pattern: filter
 		:type pattern: str
@@ -49,7 +48,7 @@ class Loader:
 		displayDict = {}
 
 		for module in self.modulesList:
-			info = self.modulesList[module]().info()
+			info = self.modulesList.getInfo(module)
 			technology = (info["technology"][:1]).upper() + (info["technology"][1:]).lower()
 			if (
 				pattern in info["description"]	or
@@ -65,3 +64,4 @@ class Loader:
 		for module in sorted(displayDict):
 			if displayDict[module]:
 				io.chart(["Name", "Type","Description"], sorted(displayDict[module]), "{} Modules".format(module))
+		self.modulesList.saveManifest()
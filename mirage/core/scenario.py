@@ -1,4 +1,4 @@
-import traceback
+import traceback,time
 from mirage.core import module,app
 from mirage.libs import io
 
@@ -24,16 +24,70 @@ class Scenario:
 		self.description = "A generic collection of callbacks"
 		self.module = module
 		self.args = module.args
-		
+		self.signalTiming = False
+		self.signalStatistics = {}
+		self.resolveSignals()
 
+	def resolveSignals(self):
+		'''
+		This method resolves the methods of the scenario able to handle a signal, and stores them in a dictionary (``signalHandlers``)
+		indexed by signal name. It is called by the constructor, and must be called again if some handlers are added after the instantiation.
+		'''
+		self.signalHandlers = {}
+		for name in dir(self):
+			if "__" not in name:
+				self.signalHandlers[name] = getattr(self,name)
+
+	def enableSignalTiming(self,enable=True):
+		'''
+		This method enables or disables the measurement of the time spent in every signal handler (see ``getSignalStatistics``).
+
+		:param enable: boolean indicating if the timing is enabled
+		:type enable: bool
+		'''
+		self.signalTiming = enable
+
+	def getSignalStatistics(self):
+		'''
+		This method returns the time spent in every signal handler, if the timing has been enabled (see ``enableSignalTiming``).
+
+		:return: dictionary indexed by signal name, indicating the number of calls, the total, average and maximal time (in seconds) spent in the handler
+		:rtype: dict
+
+		:Example:
+
+			>>> scenario.enableSignalTiming()
+			>>> scenario.getSignalStatistics()
+			{'onMasterWriteRequest': {'calls': 12, 'totalTime': 0.0041, 'averageTime': 0.00034, 'maxTime': 0.0012}}
+
+		'''
+		return {signal:{
+				"calls":calls,
+				"totalTime":totalTime,
+				"averageTime":totalTime / calls,
+				"maxTime":maxTime
+			} for signal,(calls,totalTime,maxTime) in self.signalStatistics.items()}
+
+	def _timeSignal(self,signal,handler,*args,**kwargs):
+		start = time.perf_counter()
+		try:
+			return handler(*args,**kwargs)
+		finally:
+			duration = time.perf_counter() - start
+			calls,totalTime,maxTime = self.signalStatistics.get(signal,(0,0.0,0.0))
+			self.signalStatistics[signal] = (calls + 1,totalTime + duration,max(maxTime,duration))
 
 	def receiveSignal(self,signal,*args, **kwargs):
 		'''
 		This method is called when a signal is received, and calls the corresponding method in the scenario if it exists.
 		'''
-		if signal in [i for i in dir(self) if "__" not in i]:
+		handler = self.signalHandlers.get(signal)
+		if handler is not None:
 			try:
-				defaultBehaviour = getattr(self,signal)(*args,**kwargs)
+				if self.signalTiming:
+					defaultBehaviour = self._timeSignal(signal,handler,*args,**kwargs)
+				else:
+					defaultBehaviour = handler(*args,**kwargs)
 				return defaultBehaviour
 			except Exception as e:
 				if not hasattr(self,signal):
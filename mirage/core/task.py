@@ -1,16 +1,55 @@
 from mirage.libs import utils
-import multiprocessing,os,sys
-from ctypes import c_char_p
+import multiprocessing,os,sys,signal
+
+# States of a task, stored as their index in the state table of the task manager
+STATES = ("stopped","queued","running","ended")
+STOPPED,QUEUED,RUNNING,ENDED = range(len(STATES))
+
+# State table, submission tokens and lock of the task manager, provided to the workers of the pool by _initPooledWorker
+_pooledTable = None
+_pooledTokens = None
+_pooledLock = None
+
+def _initPooledWorker(table,tokens,lock):
+	global _pooledTable,_pooledTokens,_pooledLock
+	_pooledTable = table
+	_pooledTokens = tokens
+	_pooledLock = lock
+
+def _runPooledTask(slot,token,function,taskName,tempDir,args,kwargs):
+	'''
+	This function is executed by the workers of the pool : it runs the function of a pooled task, and updates its state and PID in the state table.
+	The task is only run if its slot is still queued with the same submission token (the slot may have been stopped and reused by another task since the submission).
+	The standard output is redirected in a temporary file, named ``<taskName>-<workerPID>.out``
+	'''
+	with _pooledLock:
+		if _pooledTokens[slot] != token or _pooledTable[2*slot] != QUEUED:
+			return
+		_pooledTable[2*slot+1] = os.getpid()
+		_pooledTable[2*slot] = RUNNING
+	stdout = sys.stdout
+	with open(tempDir+"/"+taskName+"-"+str(os.getpid())+".out", 'a') as outputFile:
+		sys.stdout = outputFile
+		try:
+			function(*args, **kwargs)
+		finally:
+			sys.stdout = stdout
+			with _pooledLock:
+				if _pooledTokens[slot] == token:
+					_pooledTable[2*slot] = ENDED
 
 class Task(multiprocessing.Process):
 	'''
 	This class defines a background Task, it inherits from ``multiprocessing.Process``.
 	It provides an user friendly API to easily run a given function in background.
+
+	The state and the PID of the task are stored in a slot of the state table owned by the task manager (``core.taskManager.TaskManager``),
+	a shared memory array inherited by the task's process : reading the state of a task doesn't require any inter-process communication.
 	'''
-	def __init__(self,function,name,args=[],kwargs={}):
+	def __init__(self,function,name,args=[],kwargs={},table=None,slot=0):
 		'''
 		This constructor allows to provide the main characteristics of the task, and initializes the attributes.
-		
+
 		:param function: function to run in background
 		:type function: function
 		:param name: name of the current task
@@ -19,35 +58,60 @@ class Task(multiprocessing.Process):
 		:type args: list
 		:param kwargs: dictionary of named arguments
 		:type kwargs: dict
+		:param table: state table of the task manager (a new table is allocated if not provided)
+		:type table: multiprocessing.Array
+		:param slot: index of the task's slot in the state table
+		:type slot: int
 		'''
 		self.function = function
 		self.taskName = name
 		self.args = args
 		self.kwargs = kwargs
-		self.manager = multiprocessing.Manager()
-		self.state = self.manager.Value(c_char_p, "stopped")
+		self.table = table if table is not None else multiprocessing.RawArray('i',2)
+		self.slot = slot
+		self.table[2*slot] = STOPPED
+		self.table[2*slot+1] = 0
 		self.outputFilename = ""
 		self.outputFile = None
 		super().__init__()
 
+	def getState(self):
+		'''
+		This method returns the state of the current task ("stopped", "queued", "running" or "ended").
+
+		:return: state of the task
+		:rtype: str
+		'''
+		return STATES[self.table[2*self.slot]]
+
+	def getPID(self):
+		'''
+		This method returns the PID of the process running the current task (or None if the task has not been started).
+
+		:return: PID of the task
+		:rtype: int
+		'''
+		return self.table[2*self.slot+1] or None
+
 	def run(self):
 		'''
 		This method runs the specified function in background.
-		
+
 		.. note:: The standard output is automatically redirected in a temporary file, named ``<taskName>-<taskPID>.out``
 		'''
 		self.outputFilename = utils.getTempDir()+"/"+self.taskName+"-"+str(os.getpid()) + ".out"
 		self.outputFile = open(self.outputFilename, 'a')
 		sys.stdout = self.outputFile
 		self.function(*(self.args), **(self.kwargs))
-		self.state.value = "ended"
+		self.table[2*self.slot] = ENDED
 
 	def start(self):
 		'''
 		This method allows to start the current task.
 		'''
-		self.state.value = "running"
+		self.table[2*self.slot] = RUNNING
 		super().start()
+		self.table[2*self.slot+1] = self.pid
 		self.outputFilename = utils.getTempDir()+"/"+self.taskName+"-"+str(self.pid)+".out"
 
 
@@ -55,8 +119,9 @@ class Task(multiprocessing.Process):
 		'''
 		This method allows to stop the current task.
 		'''
-		self.state.value = "stopped"
+		self.table[2*self.slot] = STOPPED
 		self.terminate()
+		self.join()
 		if self.outputFile is not None:
 			self.outputFile.close()
 
@@ -72,5 +137,123 @@ class Task(multiprocessing.Process):
 
 		:return: list representing the current task
 		:rtype: list of str
-		''' 
-		return [str(self.pid), self.taskName, self.state.value, self.outputFilename]
+		'''
+		return [str(self.pid), self.taskName, self.getState(), self.outputFilename]
+
+class PooledTask:
+	'''
+	This class defines a background Task executed by a worker of the task manager's pool, instead of a dedicated process.
+	It is designed for the short-lived tasks, and provides the same API as ``core.task.Task``.
+
+	.. note:: The function and its arguments are transmitted to the worker, they must be picklable (e.g. the function must be defined at the top level of a module).
+	'''
+	def __init__(self,function,name,args=[],kwargs={},table=None,slot=0,pool=None,tokens=None,lock=None):
+		'''
+		This constructor allows to provide the main characteristics of the task, and initializes the attributes.
+
+		:param function: function to run in background
+		:type function: function
+		:param name: name of the current task
+		:type name: str
+		:param args: list of unnamed arguments
+		:type args: list
+		:param kwargs: dictionary of named arguments
+		:type kwargs: dict
+		:param table: state table of the task manager
+		:type table: multiprocessing.Array
+		:param slot: index of the task's slot in the state table
+		:type slot: int
+		:param pool: function returning the pool of workers
+		:type pool: function
+		:param tokens: submission tokens of the task manager (one per slot)
+		:type tokens: multiprocessing.Array
+		:param lock: lock of the task manager, shared with the workers
+		:type lock: multiprocessing.Lock
+		'''
+		self.function = function
+		self.taskName = name
+		self.args = args
+		self.kwargs = kwargs
+		self.table = table
+		self.slot = slot
+		self.pool = pool
+		self.tokens = tokens
+		self.lock = lock
+		self.token = None
+		self.result = None
+		self.table[2*slot] = STOPPED
+		self.table[2*slot+1] = 0
+
+	@property
+	def pid(self):
+		return self.getPID()
+
+	def getState(self):
+		'''
+		This method returns the state of the current task ("stopped", "queued", "running" or "ended").
+
+		:return: state of the task
+		:rtype: str
+		'''
+		return STATES[self.table[2*self.slot]]
+
+	def getPID(self):
+		'''
+		This method returns the PID of the worker running the current task (or None if the task has not been started by a worker).
+
+		:return: PID of the task
+		:rtype: int
+		'''
+		return self.table[2*self.slot+1] or None
+
+	def _onError(self,error):
+		with self.lock:
+			if self.tokens[self.slot] == self.token:
+				self.table[2*self.slot] = ENDED
+
+	def start(self):
+		'''
+		This method allows to queue the current task, it is started as soon as a worker of the pool is available.
+		'''
+		pool = self.pool()
+		with self.lock:
+			self.tokens[self.slot] += 1
+			self.token = self.tokens[self.slot]
+			self.table[2*self.slot] = QUEUED
+		self.result = pool.apply_async(
+			_runPooledTask,
+			(self.slot,self.token,self.function,self.taskName,utils.getTempDir(),self.args,self.kwargs),
+			error_callback=self._onError
+		)
+
+	def stop(self):
+		'''
+		This method allows to stop the current task.
+		If the task is running, the worker is terminated (and automatically replaced by the pool).
+		'''
+		# The worker is terminated while the lock is held, so it can't be killed while holding it
+		with self.lock:
+			state = self.table[2*self.slot]
+			self.table[2*self.slot] = STOPPED
+			if state == RUNNING and self.getPID() is not None:
+				try:
+					os.kill(self.getPID(),signal.SIGTERM)
+				except ProcessLookupError:
+					pass
+
+	def toList(self):
+		'''
+		This method returns a list representing the current task.
+		It is composed of :
+
+			* the task's PID
+			* the task's name
+			* the task's state
+			* the associated output file
+
+		:return: list representing the current task
+		:rtype: list of str
+		'''
+		pid = self.getPID()
+		outputFilename = utils.getTempDir()+"/"+self.taskName+"-"+str(pid)+".out" if pid is not None else ""
+		return [str(pid), self.taskName, self.getState(), outputFilename]
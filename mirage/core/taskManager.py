@@ -1,16 +1,44 @@
-from .task import Task
+from .task import Task,PooledTask,_initPooledWorker,RUNNING
 from copy import copy
-import psutil
+import multiprocessing,psutil
 
 class TaskManager:
 	'''
 	This class is a manager allowing to easily manipulate background tasks (using multiprocessing).
 	It is instantiated by the main application instance (``core.app.App``).
+
+	The states and PIDs of the tasks are stored in a state table (a shared memory array owned by the manager), each task using a slot of this table.
+	The short-lived tasks can be executed by a pool of workers (``pooled`` parameter of ``addTask``), created on demand using the provided start method.
+
+	:param capacity: maximal number of tasks (size of the state table)
+	:type capacity: int
+	:param poolSize: number of workers of the pool (None means the number of CPUs)
+	:type poolSize: int
+	:param startMethod: start method of the pool's workers ("forkserver", "spawn" or "fork")
+	:type startMethod: str
 	'''
-	def __init__(self):
+	def __init__(self,capacity=1024,poolSize=None,startMethod="forkserver"):
 		self.tasks = {}
+		self.capacity = capacity
+		self.table = multiprocessing.RawArray('i',2*capacity)
+		self.tokens = multiprocessing.RawArray('i',capacity)
+		self.lock = multiprocessing.get_context(startMethod).Lock()
+		self.freeSlots = list(range(capacity-1,-1,-1))
+		self.poolSize = poolSize
+		self.startMethod = startMethod
+		self.pool = None
+
+	def _getPool(self):
+		if self.pool is None:
+			context = multiprocessing.get_context(self.startMethod)
+			self.pool = context.Pool(self.poolSize,initializer=_initPooledWorker,initargs=(self.table,self.tokens,self.lock))
+		return self.pool
 
-	def addTask(self, function, name="", args=[],kwargs={}):
+	def _removeTask(self,name):
+		self.freeSlots.append(self.tasks[name].slot)
+		del self.tasks[name]
+
+	def addTask(self, function, name="", args=[],kwargs={},pooled=False):
 		'''
 		This method allows to create a new background task.
 		It instantiates a ``core.task.Task`` and adds it to the task dictionary ``tasks``.
@@ -24,7 +52,9 @@ class TaskManager:
 		:type args: list
 		:param kwargs: dictionary of named arguments
 		:type kwargs: dict
-		:return: real name of the instantiated task (it may be suffixed)
+		:param pooled: boolean indicating if the task must be executed by a worker of the pool (``core.task.PooledTask``) instead of a dedicated process
+		:type pooled: bool
+		:return: real name of the instantiated task (it may be suffixed), or None if the maximal number of tasks is reached
 		:rtype: str
 		'''
 		baseName = name if name != "" else function.__name__
@@ -34,7 +64,13 @@ class TaskManager:
 			taskName = baseName + "." + str(counter)
 			counter+=1
 
-		self.tasks[taskName] = Task(function,taskName, args=args, kwargs=kwargs)
+		if len(self.freeSlots) == 0:
+			return None
+		slot = self.freeSlots.pop()
+		if pooled:
+			self.tasks[taskName] = PooledTask(function,taskName, args=args, kwargs=kwargs, table=self.table, slot=slot, pool=self._getPool, tokens=self.tokens, lock=self.lock)
+		else:
+			self.tasks[taskName] = Task(function,taskName, args=args, kwargs=kwargs, table=self.table, slot=slot)
 		return taskName
 
 	def startTask(self,name):
@@ -44,7 +80,7 @@ class TaskManager:
 		:param name: name of the task to start
 		:type name: str
 		'''
-		if name in self.tasks and self.tasks[name].state.value == "stopped":
+		if name in self.tasks and self.tasks[name].getState() == "stopped":
 			self.tasks[name].start()
 			return True
 		return False
@@ -56,11 +92,15 @@ class TaskManager:
 		:param name: name of the task to stop
 		:type name: str
 		'''
-		if name in self.tasks and self.tasks[name].state.value == "running":
-			for child in psutil.Process(self.tasks[name].pid).children():
-				child.terminate()
+		if name in self.tasks and self.tasks[name].getState() in ("queued","running"):
+			if self.tasks[name].getState() == "running":
+				try:
+					for child in psutil.Process(self.tasks[name].pid).children():
+						child.terminate()
+				except psutil.NoSuchProcess:
+					pass
 			self.tasks[name].stop()
-			del self.tasks[name]
+			self._removeTask(name)
 			return True
 		return False
 
@@ -72,8 +112,9 @@ class TaskManager:
 		:type name: str
 		'''
 		task = self.tasks[name]
-		self.stopTask(name)
-		self.tasks[name] = Task(task.function,name, args=task.args, kwargs=task.kwargs)
+		if not self.stopTask(name):
+			self._removeTask(name)
+		self.addTask(task.function,name, args=task.args, kwargs=task.kwargs, pooled=isinstance(task,PooledTask))
 		self.tasks[name].start()
 		return True
 
@@ -82,10 +123,13 @@ class TaskManager:
 		This method stop all running tasks.
 		'''
 		for task in copy(self.tasks):
-			if self.tasks[task].state.value == "running":
+			if self.tasks[task].getState() in ("queued","running"):
 				self.stopTask(task)
 			else:
-				del self.tasks[task]
+				self._removeTask(task)
+		if self.pool is not None:
+			self.pool.terminate()
+			self.pool = None
 
 	def getTaskPID(self,name):
 		'''
@@ -111,10 +155,40 @@ class TaskManager:
 		:rtype: str
 		'''
 		if name in self.tasks:
-			return self.tasks[name].state.value
+			return self.tasks[name].getState()
 		else:
 			return None
 
+	def getTaskStatistics(self,name):
+		'''
+		This method returns the resources used by a running task (and its children), according to its name.
+
+		:param name: name of the task
+		:type name: str
+		:return: dictionary indicating the CPU time (in seconds), the CPU usage (in percent, since the previous call), the resident memory (in bytes) and the number of children of the task (or None if the task is not running)
+		:rtype: dict
+
+		:Example:
+
+			>>> app.App.Instance.taskManager.getTaskStatistics("scan")
+			{'cpuTime': 1.52, 'cpuPercent': 12.5, 'rss': 31207424, 'children': 0}
+
+		'''
+		if name not in self.tasks or self.tasks[name].getState() != "running" or self.tasks[name].pid is None:
+			return None
+		try:
+			process = psutil.Process(self.tasks[name].pid)
+			processes = [process] + process.children(recursive=True)
+			cpuTime,cpuPercent,rss = 0.0,0.0,0
+			for p in processes:
+				times = p.cpu_times()
+				cpuTime += times.user + times.system
+				cpuPercent += p.cpu_percent(interval=None)
+				rss += p.memory_info().rss
+			return {"cpuTime":cpuTime,"cpuPercent":cpuPercent,"rss":rss,"children":len(processes)-1}
+		except psutil.NoSuchProcess:
+			return None
+
 	def getTasksList(self,pattern=""):
 		'''
 		This method returns the list of the existing tasks, filtered by a specified pattern.
@@ -125,5 +199,10 @@ class TaskManager:
 		:rtype: list
 		
 		'''
-		return [t.toList() for t in self.tasks.values() if pattern in t.name or pattern in str(t.pid) or pattern in t.state.value]
+		tasksList = []
+		for name,task in self.tasks.items():
+			if pattern in name or pattern in str(task.pid) or pattern in task.getState():
+				statistics = self.getTaskStatistics(name)
+				tasksList.append(task.toList() + (["{:.2f}".format(statistics["cpuTime"]),str(statistics["rss"]//1024)] if statistics is not None else ["",""]))
+		return tasksList
 	
@@ -18,6 +18,7 @@ from mirage.libs.ble_utils.crypto import *
 from mirage.libs.ble_utils.scapy_link_layers import *
 from mirage.libs.ble_utils.dissectors import *
 from mirage.libs.ble_utils.att_server import *
+from mirage.libs.ble_utils.converters import *
 from mirage.libs import wireless,bt,io
 
 
@@ -629,193 +630,15 @@ class BLEEmitter(wireless.Emitter):
 						elif isinstance(packet,BLEEmptyPDU):
 							data.LLID = 1
 						elif isinstance(packet,BLEControlPDU):
-							optcode = 0
-							if packet.type == "LL_CONNECTION_UPDATE_REQ":
-								optcode = 0x00
-							elif packet.type == "LL_CHANNEL_MAP_REQ":
-								optcode = 0x01
-							elif packet.type == "LL_TERMINATE_IND":
-								optcode = 0x02
-							elif packet.type == "LL_ENC_REQ":
-								optcode = 0x03
-							elif packet.type == "LL_ENC_RSP":
-								optcode = 0x04
-							elif packet.type == "LL_START_ENC_REQ":
-								optcode = 0x05
-							elif packet.type == "LL_START_ENC_RESP":
-								optcode = 0x06
-							elif packet.type == "LL_UNKNOWN_RSP":
-								optcode = 0x07
-							elif packet.type == "LL_FEATURE_REQ":
-								optcode = 0x08
-							elif packet.type == "LL_FEATURE_RSP":
-								optcode = 0x09
-							elif packet.type == "LL_PAUSE_ENC_REQ":
-								optcode = 0x0A
-							elif packet.type == "LL_PAUSE_ENC_RSP":
-								optcode = 0x0B
-							elif packet.type == "LL_VERSION_IND":
-								optcode = 0x0C
-							elif packet.type == "LL_REJECT_IND":
-								optcode = 0x0D
+							optcode = CONTROL_OPCODES.get(packet.type,0)
 							packet.packet /= BTLE_CTRL(opcode = optcode)
 							if packet.data is not None or packet.data != b"":
 								packet.packet /= packet.data
 
 				# Common sublayers
 				if HCI_Command_Hdr not in packet.packet and BTLE_CTRL not in packet.packet and BTLE_ADV not in packet.packet:
-
-
-					if (
-						isinstance(packet,BLEConnectionParameterUpdateRequest) or
-					     	isinstance(packet,BLEConnectionParameterUpdateResponse)
-					   ):
-							packet.packet /= L2CAP_Hdr()/L2CAP_CmdHdr(id=packet.l2capCmdId)
-					elif (
-						isinstance(packet,BLESecurityRequest) or
-						isinstance(packet,BLEPairingRequest) or
-						isinstance(packet,BLEPairingResponse) or
-						isinstance(packet,BLEPairingFailed) or
-						isinstance(packet,BLEPairingConfirm) or
-						isinstance(packet,BLEPairingRandom) or
-						isinstance(packet,BLEEncryptionInformation) or
-						isinstance(packet,BLEMasterIdentification) or
-						isinstance(packet,BLEIdentityInformation) or
-						isinstance(packet,BLEIdentityAddressInformation) or
-						isinstance(packet,BLESigningInformation)
-					):
-						packet.packet /= L2CAP_Hdr(cid=6)/SM_Hdr()
-					else:
-						packet.packet /= L2CAP_Hdr(cid=4)/ATT_Hdr()
-
-
-					# Common upper layers
-					if isinstance(packet,BLEConnectionParameterUpdateRequest):
-						packet.packet /= L2CAP_Connection_Parameter_Update_Request(
-							max_interval=packet.maxInterval,
-							min_interval=packet.minInterval,
-							slave_latency=packet.slaveLatency,
-							timeout_mult=packet.timeoutMult)
-
-					elif isinstance(packet,BLEConnectionParameterUpdateResponse):
-						packet.packet /= L2CAP_Connection_Parameter_Update_Response(move_result=packet.moveResult)
-
-					elif isinstance(packet,BLESecurityRequest):
-						packet.packet /= SM_Security_Request(authentication=packet.authentication)
-
-					elif isinstance(packet,BLEPairingRequest):
-						packet.packet /= SM_Pairing_Request(
-								iocap=packet.inputOutputCapability,
-								oob=1 if packet.outOfBand else 0,
-								authentication=packet.authentication,
-								max_key_size = packet.maxKeySize,
-								initiator_key_distribution=packet.initiatorKeyDistribution,
-								responder_key_distribution = packet.responderKeyDistribution)
-
-
-					elif isinstance(packet,BLEPairingResponse):
-						packet.packet /= SM_Pairing_Response(
-								iocap=packet.inputOutputCapability,
-								oob=1 if packet.outOfBand else 0,
-								authentication=packet.authentication,
-								max_key_size = packet.maxKeySize,
-								initiator_key_distribution=packet.initiatorKeyDistribution,
-								responder_key_distribution = packet.responderKeyDistribution)
-
-					elif isinstance(packet,BLEPairingFailed):
-						packet.packet /= SM_Failed(reason=packet.reason)
-
-					elif isinstance(packet,BLEPairingConfirm):
-						packet.packet /= SM_Confirm(confirm=packet.confirm)
-
-
-					elif isinstance(packet,BLEPairingRandom):
-						packet.packet /= SM_Random(random=packet.random)
-
-					elif isinstance(packet,BLEEncryptionInformation):
-						packet.packet /= SM_Encryption_Information(ltk=packet.ltk)
-
-					elif isinstance(packet,BLEMasterIdentification):
-						packet.packet /= SM_Master_Identification(ediv=packet.ediv, rand=packet.rand)
-
-					elif isinstance(packet,BLEIdentityInformation):
-						packet.packet /= SM_Identity_Information(irk=packet.irk)
-
-					elif isinstance(packet,BLEIdentityAddressInformation):
-						packet.packet /= SM_Identity_Address_Information(
-											atype=0 if packet.type=="public" else 1,
-											address=packet.address
-												)
-					elif isinstance(packet,BLESigningInformation):
-						packet.packet /= SM_Signing_Information(csrk=packet.csrk)
-
-					elif isinstance(packet, BLEFindByTypeValueRequest):
-						packet.packet /= ATT_Find_By_Type_Value_Request(start=packet.startHandle,
-																		end=packet.endHandle,
-																		uuid=packet.uuid,
-																		data=packet.data)
-
-					elif isinstance(packet, BLEFindByTypeValueResponse):
-						packet.packet /= ATT_Find_By_Type_Value_Response(handles=packet.handles)
-
-					elif isinstance(packet,BLEErrorResponse):
-						packet.packet /= ATT_Error_Response(request=packet.request, handle=packet.handle,ecode=packet.ecode)
-
-					elif isinstance(packet,BLEExchangeMTURequest):
-						packet.packet /= ATT_Exchange_MTU_Request(mtu = packet.mtu)
-
-					elif isinstance(packet,BLEExchangeMTUResponse):
-						packet.packet /= ATT_Exchange_MTU_Response(mtu = packet.mtu)
-
-					elif isinstance(packet,BLEReadByGroupTypeRequest):
-						packet.packet /= ATT_Read_By_Group_Type_Request(
-								start=packet.startHandle,
-								end=packet.endHandle,
-								uuid=packet.uuid)
-
-					elif isinstance(packet,BLEReadByGroupTypeResponse):
-						packet.packet /= ATT_Read_By_Group_Type_Response(data=packet.data,length=packet.length)
-
-					elif isinstance(packet,BLEReadByTypeRequest):
-						packet.packet /= ATT_Read_By_Type_Request(
-								start=packet.startHandle,
-								end=packet.endHandle,
-								uuid=packet.uuid)
-
-					elif isinstance(packet,BLEReadByTypeResponse):
-						packet.packet /= ATT_Read_By_Type_Response(packet.data)
-
-					elif isinstance(packet,BLEReadBlobRequest):
-						packet.packet /= ATT_Read_Blob_Request(gatt_handle=packet.handle,offset=packet.offset)
-					elif isinstance(packet,BLEReadBlobResponse):
-						packet.packet /= ATT_Read_Blob_Response(value=packet.value)
-					elif isinstance(packet,BLEHandleValueNotification):
-						packet.packet /= ATT_Handle_Value_Notification(gatt_handle=packet.handle,value=packet.value)
-					elif isinstance(packet,BLEHandleValueIndication):
-						packet.packet /= ATT_Handle_Value_Indication(gatt_handle=packet.handle,value=packet.value)
-					elif isinstance(packet,BLEHandleValueConfirmation):
-						packet.packet /= ATT_Handle_Value_Confirmation()
-
-					elif isinstance(packet,BLEFindInformationRequest):
-						packet.packet /= ATT_Find_Information_Request(start=packet.startHandle,end = packet.endHandle)
-
-					elif isinstance(packet,BLEFindInformationResponse):
-						packet.packet /= ATT_Find_Information_Response(bytes([packet.format]) + packet.data)
-
-					elif isinstance(packet,BLEWriteRequest):
-						packet.packet /= ATT_Write_Request(gatt_handle=packet.handle,data=packet.value)
-
-					elif isinstance(packet,BLEWriteCommand):
-						packet.packet /= ATT_Write_Command(gatt_handle=packet.handle,data=packet.value)
-
-					elif isinstance(packet,BLEWriteResponse):
-						packet.packet /= ATT_Write_Response()
-
-					elif isinstance(packet,BLEReadRequest):
-						packet.packet /= ATT_Read_Request(gatt_handle=packet.handle)
-
-					elif isinstance(packet,BLEReadResponse):
-						packet.packet /= ATT_Read_Response(value=packet.value)
+					payload = buildL2CAPPayload(packet)
+					packet.packet /= L2CAP_Hdr()/payload if payload is not None else L2CAP_Hdr(cid=4)/ATT_Hdr()
 
 
 		if self.interface[-5:] == ".pcap" and packet.additionalInformations is not None:
@@ -889,7 +712,7 @@ class BLEReceiver(wireless.Receiver):
 	def convert(self,packet):
 		if "hackrf" in self.interface:
 			packet, iqSamples = packet
-		cryptoInstance = BLELinkLayerCrypto.getInstance()
+		cryptoInstance = BLELinkLayerCrypto.getInstance(packet[BTLE].access_addr if BTLE in packet else None)
 		if cryptoInstance is not None and cryptoInstance.ready and BTLE_DATA in packet and packet.LLID > 1:
 			plain, success = cryptoInstance.tryToDecrypt(raw(packet[BTLE_DATA:]))
 			if success:
@@ -923,299 +746,20 @@ class BLEReceiver(wireless.Receiver):
 					return None
 
 			if packet.type == TYPE_ACL_DATA:
-				if ATT_Exchange_MTU_Request in packet:
-					return BLEExchangeMTURequest(
-						mtu = packet[ATT_Exchange_MTU_Request].mtu,
-						connectionHandle = packet.handle
-						)
-				elif ATT_Error_Response in packet:
-					return BLEErrorResponse(
-						request = packet.request,
-						handle = packet[ATT_Error_Response].handle,
-						ecode = packet.ecode,
-						connectionHandle = packet.handle
-						)
-				elif ATT_Exchange_MTU_Response in packet:
-					return BLEExchangeMTUResponse(
-						mtu = packet[ATT_Exchange_MTU_Response].mtu,
-						connectionHandle = packet.handle
-						)
-				elif ATT_Read_Response in packet:
-					return BLEReadResponse(
-						value = packet[ATT_Read_Response].value,
-						connectionHandle = packet.handle
-						)
-				elif ATT_Hdr in packet and packet[ATT_Hdr].opcode == 0xb:
-					return BLEReadResponse(
-						value = b"",
-						connectionHandle = packet.handle
-						)
-				elif ATT_Read_Request in packet:
-					return BLEReadRequest(
-						handle = packet[ATT_Read_Request].gatt_handle,
-						connectionHandle = packet.handle
-						)
-				elif ATT_Read_By_Group_Type_Response in packet:
-					return BLEReadByGroupTypeResponse(
-						connectionHandle = packet.handle,
-						length = packet[ATT_Read_By_Group_Type_Response].length,
-						data = packet[ATT_Read_By_Group_Type_Response].data
-						)
-				elif ATT_Read_By_Group_Type_Request in packet:
-					return BLEReadByGroupTypeRequest(
-						connectionHandle = packet.handle,
-						startHandle = packet[ATT_Read_By_Group_Type_Request].start,
-						endHandle = packet[ATT_Read_By_Group_Type_Request].end,
-						uuid =packet[ATT_Read_By_Group_Type_Request].uuid
-						)
-				elif ATT_Read_By_Type_Response in packet:
-					return BLEReadByTypeResponse(
-						connectionHandle = packet.handle,
-						data = bytes(packet[ATT_Read_By_Type_Response])
-						)
-				elif ATT_Read_By_Type_Request in packet:
-					return BLEReadByTypeRequest(
-						connectionHandle = packet.handle,
-						startHandle = packet[ATT_Read_By_Type_Request].start,
-						endHandle = packet[ATT_Read_By_Type_Request].end,
-						uuid=packet[ATT_Read_By_Type_Request].uuid
-						)
-				elif ATT_Read_Blob_Request in packet:
-					return BLEReadBlobRequest(
-						handle = packet[ATT_Read_Blob_Request].gatt_handle,
-						offset = packet[ATT_Read_Blob_Request].offset,
-						connectionHandle = packet.handle
-						)
-				elif ATT_Read_Blob_Response in packet:
-					return BLEReadBlobResponse(
-						value = packet[ATT_Read_Blob_Response].value,
-						connectionHandle = packet.handle
-						)
-				elif ATT_Handle_Value_Notification in packet:
-					return BLEHandleValueNotification(
-						connectionHandle = packet.handle,
-						handle = packet[ATT_Handle_Value_Notification].gatt_handle,
-						value = packet[ATT_Handle_Value_Notification].value
-						)
-				elif ATT_Handle_Value_Indication in packet:
-					return BLEHandleValueIndication(
-						connectionHandle = packet.handle,
-						handle = packet[ATT_Handle_Value_Indication].gatt_handle,
-						value = packet[ATT_Handle_Value_Indication].value
-						)
-				elif ATT_Handle_Value_Confirmation in packet or (ATT_Hdr in packet and packet[ATT_Hdr].opcode == 0x1e):
-					return BLEHandleValueConfirmation(connectionHandle = packet.handle)
-
-				elif ATT_Write_Response in packet or (ATT_Hdr in packet and packet[ATT_Hdr].opcode == 0x13):
-					return BLEWriteResponse(connectionHandle = packet.handle)
-				elif ATT_Write_Request in packet:
-					return BLEWriteRequest(
-						connectionHandle = packet.handle,
-						handle = packet.gatt_handle,
-						value = packet.data
-						)
-				elif ATT_Write_Command in packet:
-					return BLEWriteCommand(
-						connectionHandle = packet.handle,
-						handle = packet.gatt_handle,
-						value = packet.data
-						)
-				elif ATT_Find_Information_Request in packet:
-					return BLEFindInformationRequest(
-						connectionHandle = packet.handle,
-						startHandle=packet.start,
-						endHandle=packet.end
-						)
-				elif ATT_Find_Information_Response in packet:
-					return BLEFindInformationResponse(
-						connectionHandle = packet.handle,
-						data=bytes(packet[ATT_Find_Information_Response])[1:],
-						format=packet.format
-						)
-
-				elif SM_Security_Request in packet:
-					return BLESecurityRequest(
-							connectionHandle = packet.handle,
-							authentication = packet.authentication)
-
-				elif SM_Pairing_Request in packet:
-					return BLEPairingRequest(
-						connectionHandle = packet.handle,
-						inputOutputCapability=packet.iocap,
-						outOfBand=packet.oob == 1,
-						authentication=packet.authentication,
-						initiatorKeyDistribution=packet.initiator_key_distribution,
-						responderKeyDistribution=packet.responder_key_distribution,
-						payload=raw(packet[SM_Hdr:]))
-
-				elif SM_Pairing_Response in packet:
-					return BLEPairingResponse(
-						connectionHandle = packet.handle,
-						inputOutputCapability=packet.iocap,
-						outOfBand=packet.oob == 1,
-						authentication=packet.authentication,
-						initiatorKeyDistribution=packet.initiator_key_distribution,
-						responderKeyDistribution=packet.responder_key_distribution,
-						payload=raw(packet[SM_Hdr:]))
-
-				elif SM_Failed in packet:
-					return BLEPairingFailed(
-						connectionHandle = packet.handle,
-						reason=packet.reason)
-
-				elif SM_Confirm in packet:
-
-					return BLEPairingConfirm(
-						connectionHandle = packet.handle,
-						confirm=packet.confirm)
-
-				elif SM_Random in packet:
-					return BLEPairingRandom(
-						connectionHandle = packet.handle,
-						random=packet.random)
-
-				elif SM_Encryption_Information in packet:
-					return BLEEncryptionInformation(
-						connectionHandle = packet.handle,
-						ltk=packet.ltk)
-
-				elif SM_Master_Identification in packet:
-					return BLEMasterIdentification(
-						connectionHandle = packet.handle,
-						ediv=packet.ediv,
-						rand=packet.rand)
-
-				elif SM_Identity_Information in packet:
-					return BLEIdentityInformation(
-						connectionHandle = packet.handle,
-						irk=packet.irk)
-
-				elif SM_Identity_Address_Information in packet:
-					return BLEIdentityAddressInformation(
-						connectionHandle = packet.handle,
-						type="public" if packet.atype == 0 else "random",
-						address=packet.address)
-
-
-				elif SM_Signing_Information in packet:
-					return BLESigningInformation(
-						connectionHandle = packet.handle,
-						csrk=packet.csrk)
-
-				elif ATT_Find_By_Type_Value_Request in packet:
-					return BLEFindByTypeValueRequest(
-						startHandle=packet[ATT_Find_By_Type_Value_Request].start,
-						endHandle=packet[ATT_Find_By_Type_Value_Request].end,
-						uuid=packet[ATT_Find_By_Type_Value_Request].uuid,
-						data=packet[ATT_Find_By_Type_Value_Request].data)
-
-				elif ATT_Find_By_Type_Value_Response in packet:
-					return BLEFindByTypeValueResponse(
-						handles=packet[ATT_Find_By_Type_Value_Response].handles)
-
-				elif L2CAP_Connection_Parameter_Update_Request in packet:
-					return BLEConnectionParameterUpdateRequest(
-						l2capCmdId = packet.id,
-						connectionHandle = packet.handle,
-						maxInterval=packet.max_interval,
-						minInterval=packet.min_interval,
-						timeoutMult=packet.timeout_mult,
-						slaveLatency=packet.slave_latency
-						)
-				elif L2CAP_Connection_Parameter_Update_Response in packet:
-					return BLEConnectionParameterUpdateResponse(
-						l2capCmdId = packet.id,
-						connectionHandle = packet.handle,
-						moveResult=packet.move_result
-						)
-					return new
+				converted = convertL2CAPPacket(packet,connectionHandle=packet.handle)
+				if converted is not None:
+					return converted
 			elif packet.type == TYPE_HCI_COMMAND:
-				if HCI_Cmd_LE_Create_Connection in packet:
-					return BLEConnect(
-							dstAddr = packet.paddr,
-							type="public" if packet.patype == 0 else "random",
-							initiatorType = "public" if packet.atype == 0 else "random")
-				elif HCI_Cmd_LE_Create_Connection_Cancel in packet:
-					return BLEConnectionCancel()
-				elif L2CAP_Connection_Parameter_Update_Request in packet:
-					return BLEConnectionParameterUpdateRequest(
-											l2capCmdId = packet.id,
-											connectionHandle = packet.handle,
-											maxInterval = packet.max_interval,
-											minInterval = packet.min_interval,
-											slaveLatency = packet.slave_latency,
-											timeoutMult=packet.timeout_mult
-											)
-				elif L2CAP_Connection_Parameter_Update_Response in packet:
-					return BLEConnectionParameterUpdateResponse(
-											l2capCmdId = packet.id,
-											connectionHandle = packet.handle,
-											moveResult=packet.move_result)
-				elif HCI_Cmd_LE_Start_Encryption_Request in packet:
-					return BLELongTermKeyRequest(
-									connectionHandle = packet.handle,
-									rand = packet.rand,
-									ediv = packet.ediv,
-									ltk=packet.ltk)
-				elif HCI_Cmd_LE_Long_Term_Key_Request_Reply in packet:
-					return BLELongTermKeyRequestReply(
-									connectionHandle = packet.handle,
-									ltk=packet.ltk,
-									positive=True)
-				elif HCI_Cmd_LE_Long_Term_Key_Request_Negative_Reply in packet:
-					return BLELongTermKeyRequestReply(connectionHandle = packet.handle,positive=False)
+				converted = convertHCICommand(packet)
+				if converted is not None:
+					return converted
 
 			elif packet.type == TYPE_HCI_EVENT:
-				if packet.code == HCI_LE_META:
-					if packet.event == HCI_ENHANCED_CONNECTION_COMPLETE and packet.status == 0x0:
-						newHandle = packet[HCI_LE_Meta_Enhanced_Connection_Complete].handle
-						newAddress = str(packet[HCI_LE_Meta_Enhanced_Connection_Complete].paddr)
-						self.device._setCurrentHandle(newHandle,address=newAddress,mode="public" if packet.patype == 0 else "random")
-						io.info('Updating connection handle : '+str(newHandle))
-
-						return BLEConnectResponse(
-							srcAddr = packet.paddr,
-							dstAddr = '',
-							role="master" if packet.role==0 else "slave",
-							success=True,
-							type="public" if packet.patype == 0 else "random",
-							interval = packet.interval
-							)
-					if packet.event == HCI_CONNECTION_COMPLETE and packet.status == 0x0:
-						newHandle = packet[HCI_LE_Meta_Connection_Complete].handle
-						newAddress = str(packet[HCI_LE_Meta_Connection_Complete].paddr)
-						self.device._setCurrentHandle(newHandle,address=newAddress,mode="public" if packet.patype == 0 else "random")
-						io.info('Updating connection handle : '+str(newHandle))
-
-						return BLEConnectResponse(
-							srcAddr = packet.paddr,
-							dstAddr = '',
-							role="master" if packet.role==0 else "slave",
-							success=True,
-							type="public" if packet.patype == 0 else "random",
-							interval = packet.interval
-							)
-					elif packet.event == HCI_ADVERTISING_REPORT:
-						layer = packet[HCI_LE_Meta_Advertising_Report]
-						type = "SCAN_RSP" if layer.type == SCAN_RSP else "ADV_IND"
-						return BLEAdvertisement(
-							addr = layer.addr,
-							addrType = layer.atype,
-							data=layer.data,
-							type=type
-							)
-					elif packet.event == HCI_LONG_TERM_KEY_REQUEST or HCI_LE_Meta_Long_Term_Key_Request in packet:
-						return BLELongTermKeyRequest(
-							connectionHandle=packet.handle,
-							rand=packet.rand,
-							ediv=packet.ediv
-						)
-
-				elif packet.code == HCI_DISCONNECTION_COMPLETE:
-					handle = packet.handle
-					self.device._removeConnectionHandle(handle)
-					return BLEDisconnect(connectionHandle=handle)
-				else:
+				converted = convertHCIEvent(packet,self.device)
+				if converted is not None:
+					return converted
+				# The unsupported LE meta events are converted into generic packets
+				elif packet.code != HCI_LE_META:
 					return None
 		elif (	"hackrf" in self.interface or
 				"butterfly" in self.interface or
@@ -1231,7 +775,7 @@ class BLEReceiver(wireless.Receiver):
 
 					if BTLE_ADV in packet:
 						if BTLE_CONNECT_REQ in packet:
-
+							BLELinkLayerCrypto.createContext(packet.AA)
 							new = BLEConnectRequest(
 									srcAddr=packet.InitA,
 									dstAddr=packet.AdvA,
@@ -1260,6 +804,7 @@ class BLEReceiver(wireless.Receiver):
 								data = b""
 
 							if advType == "CONNECT_REQ":
+								BLELinkLayerCrypto.createContext(packet.AA)
 								new = BLEConnectRequest(
 									srcAddr=packet.InitA,
 									dstAddr=packet.AdvA,
@@ -1312,197 +857,11 @@ class BLEReceiver(wireless.Receiver):
 					elif packet.LLID == 1:
 						new = BLEEmptyPDU()
 					elif packet.LLID == 2:
-						if ATT_Exchange_MTU_Request in packet:
-							new = BLEExchangeMTURequest(
-								mtu = packet[ATT_Exchange_MTU_Request].mtu
-								)
-						elif ATT_Error_Response in packet:
-							new = BLEErrorResponse(
-								request = packet.request,
-								handle = packet[ATT_Error_Response].handle,
-								ecode = packet.ecode
-								)
-						elif ATT_Exchange_MTU_Response in packet:
-							new = BLEExchangeMTUResponse(
-								mtu = packet[ATT_Exchange_MTU_Response].mtu
-								)
-						elif ATT_Read_Response in packet :
-							new = BLEReadResponse(
-								value = packet[ATT_Read_Response].value
-								)
-						elif ATT_Hdr in packet and packet[ATT_Hdr].opcode == 0xb:
-							new = BLEReadResponse(
-								value = b""
-								)
-						elif ATT_Read_Request in packet:
-							new = BLEReadRequest(
-								handle = packet[ATT_Read_Request].gatt_handle
-								)
-						elif ATT_Read_By_Group_Type_Response in packet:
-							new = BLEReadByGroupTypeResponse(
-								length = packet[ATT_Read_By_Group_Type_Response].length,
-								data = packet[ATT_Read_By_Group_Type_Response].data
-								)
-						elif ATT_Read_By_Group_Type_Request in packet:
-							new = BLEReadByGroupTypeRequest(
-								startHandle = packet[ATT_Read_By_Group_Type_Request].start,
-								endHandle = packet[ATT_Read_By_Group_Type_Request].end,
-								uuid =packet[ATT_Read_By_Group_Type_Request].uuid
-								)
-						elif ATT_Read_By_Type_Response in packet:
-							new = BLEReadByTypeResponse(
-								data = bytes(packet[ATT_Read_By_Type_Response])
-								)
-						elif ATT_Read_By_Type_Request in packet:
-							new = BLEReadByTypeRequest(
-								startHandle = packet[ATT_Read_By_Type_Request].start,
-								endHandle = packet[ATT_Read_By_Type_Request].end,
-								uuid=packet[ATT_Read_By_Type_Request].uuid
-								)
-						elif ATT_Handle_Value_Notification in packet:
-							new = BLEHandleValueNotification(
-								handle = packet[ATT_Handle_Value_Notification].handle,
-								value = packet[ATT_Handle_Value_Notification].value
-								)
-						elif ATT_Handle_Value_Indication in packet:
-							new = BLEHandleValueIndication(
-								connectionHandle = packet.handle,
-								handle = packet[ATT_Handle_Value_Indication].gatt_handle,
-								value = packet[ATT_Handle_Value_Indication].value
-								)
-						elif ATT_Handle_Value_Confirmation in packet or (ATT_Hdr in packet and packet[ATT_Hdr].opcode == 0x1e):
-							new = BLEHandleValueConfirmation(connectionHandle = packet.handle)
-						elif ATT_Read_Blob_Request in packet:
-							new = BLEReadBlobRequest(
-								handle = packet[ATT_Read_Blob_Request].gatt_handle,
-								offset = packet[ATT_Read_Blob_Request].offset
-								)
-						elif ATT_Read_Blob_Response in packet:
-							new = BLEReadBlobResponse(
-								value = packet[ATT_Read_Blob_Response].value
-								)
-						elif ATT_Write_Response in packet or (ATT_Hdr in packet and packet[ATT_Hdr].opcode == 0x13):
-							new = BLEWriteResponse()
-						elif ATT_Write_Request in packet:
-							new = BLEWriteRequest(
-								handle = packet.gatt_handle,
-								value = packet.data
-								)
-						elif ATT_Write_Command in packet:
-							new = BLEWriteCommand(
-								handle = packet.gatt_handle,
-								value = packet.data
-								)
-						elif ATT_Find_Information_Request in packet:
-							new = BLEFindInformationRequest(
-								startHandle=packet.start,
-								endHandle=packet.end
-								)
-						elif ATT_Find_Information_Response in packet:
-							new = BLEFindInformationResponse(
-								data=bytes(packet[ATT_Find_Information_Response])[1:],
-								format=packet.format
-								)
-						elif SM_Security_Request in packet:
-							return BLESecurityRequest(
-									connectionHandle = packet.handle,
-									authentication = packet.authentication)
-						elif SM_Pairing_Request in packet:
-							new = BLEPairingRequest(
-								inputOutputCapability=packet.iocap,
-								outOfBand=packet.oob == 1,
-								authentication=packet.authentication,
-								initiatorKeyDistribution=packet.initiator_key_distribution,
-								responderKeyDistribution=packet.responder_key_distribution,
-								payload=raw(packet[SM_Hdr:]))
-
-						elif SM_Pairing_Response in packet:
-							new = BLEPairingResponse(
-								inputOutputCapability=packet.iocap,
-								outOfBand=packet.oob == 1,
-								authentication=packet.authentication,
-								initiatorKeyDistribution=packet.initiator_key_distribution,
-								responderKeyDistribution=packet.responder_key_distribution,
-								payload=raw(packet[SM_Hdr:]))
-
-						elif SM_Failed in packet:
-							new = BLEPairingFailed(reason=packet.reason)
-
-						elif SM_Confirm in packet:
-							new = BLEPairingConfirm(confirm=packet.confirm)
-
-						elif SM_Random in packet:
-							new = BLEPairingRandom(random=packet.random)
-
-						elif SM_Encryption_Information in packet:
-							new = BLEEncryptionInformation(ltk=packet.ltk)
-
-						elif SM_Master_Identification in packet:
-							new = BLEMasterIdentification(
-								ediv=packet.ediv,
-								rand=packet.rand)
-
-						elif SM_Identity_Information in packet:
-							new = BLEIdentityInformation(irk=packet.irk)
-
-						elif SM_Identity_Address_Information in packet:
-							new = BLEIdentityAddressInformation(
-								type="public" if packet.atype == 0 else "random",
-								address=packet.address)
-
-
-						elif SM_Signing_Information in packet:
-							new = BLESigningInformation(
-								csrk=packet.csrk)
-
-						elif ATT_Find_By_Type_Value_Request in packet:
-							new = BLEFindByTypeValueRequest(
-								startHandle=packet[ATT_Find_By_Type_Value_Request].start,
-								endHandle=packet[ATT_Find_By_Type_Value_Request].end,
-								uuid=packet[ATT_Find_By_Type_Value_Request].uuid,
-								data=packet[ATT_Find_By_Type_Value_Request].data)
-
-						elif ATT_Find_By_Type_Value_Response in packet:
-							new = BLEFindByTypeValueResponse(handles=packet[ATT_Find_By_Type_Value_Response].handles)
-
-						elif L2CAP_Connection_Parameter_Update_Request in packet:
-							new = BLEConnectionParameterUpdateRequest(
-								maxInterval=packet.max_interval,
-								minInterval=packet.min_interval,
-								timeoutMult=packet.timeout_mult,
-								slaveLatency=packet.slave_latency
-								)
-						elif L2CAP_Connection_Parameter_Update_Response in packet:
-							new = BLEConnectionParameterUpdateResponse(
-								moveResult=packet.move_result
-								)
+						converted = convertL2CAPPacket(packet)
+						if converted is not None:
+							new = converted
 					elif packet.LLID == 3:
-
-						try:
-							controlType = CONTROL_TYPES[packet.opcode]
-						except:
-							controlType = "???"
-						try:
-							data = bytes(packet[BTLE_CTRL:])[1:]
-						except:
-							data = b""
-						if controlType == "LL_TERMINATE_IND" and packet.code == 0x24:
-							return BLEDisconnect()
-						if controlType == "LL_ENC_REQ":
-							#packet.show()
-							if cryptoInstance is not None:
-								cryptoInstance.setMasterValues(packet.skd,packet.iv)
-						elif controlType == "LL_ENC_RSP":
-							#packet.show()
-							if cryptoInstance is not None:
-								cryptoInstance.setSlaveValues(packet.skd,packet.iv)
-
-						elif controlType == "LL_START_ENC_REQ":
-							self.encrypted = True
-							if cryptoInstance is not None:
-								cryptoInstance.generateSessionKey()
-
-						new = BLEControlPDU(type=controlType,data=data)
+						new = convertControlPacket(packet,self,cryptoInstance)
 
 			except:
 				new = BLEPacket()
@@ -1,6 +1,7 @@
 from scapy.all import *
-import subprocess,struct
+import subprocess
 from mirage.libs import io,utils,wireless
+from mirage.libs.ble_utils.btsnoop import BtsnoopStream
 
 class ADBDevice(wireless.Device):
 	'''
@@ -65,7 +66,8 @@ class ADBDevice(wireless.Device):
 		"getSnoopFileLocation",
 		"getSnoopFileSize",
 		"getSerial",
-		"getDeviceIndex"
+		"getDeviceIndex",
+		"getStreamStatistics"
 		]
 	@classmethod
 	def startADBDaemon(cls):
@@ -182,14 +184,8 @@ class ADBDevice(wireless.Device):
 			return s
 		return None
 
-	def _getNewSnoopFileData(self,location, size):
-		stdout, _, _ = self._runADBCommand("tail -c +"+str(self.size)+" "+location)
-		return stdout
-
-	def _isPacketHeader(self,buffer):
-		header = buffer[:24]	
-		originalLength, includedLength, flags, drops, timestamp = struct.unpack( ">IIIIq", header)
-		return originalLength == includedLength
+	def _openSnoopFileProcess(self,location,size):
+		return subprocess.Popen(["adb","-s",self.adbDevice,"shell","tail","-c","+"+str(size),"-f",location],stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
 
 	def _getSnoopFileLocation(self):
 		stdout, _, returncode = self._runADBCommand("cat /etc/bluetooth/bt_stack.conf | grep BtSnoopLogOutput")
@@ -259,7 +255,7 @@ class ADBDevice(wireless.Device):
 
 		'''
 		if self.socket is None:
-			return self.size
+			return self.size + self.stream.receivedBytes
 		else:
 			return -1
 	def getSerial(self):
@@ -286,12 +282,24 @@ class ADBDevice(wireless.Device):
 		return int(stdout.decode('ascii').replace('\n',''))
 
 
-	def _getPacket(self,buffer):
-		header = buffer[:24]	
-		originalLength, includedLength, flags, drops, timestamp = struct.unpack( ">IIIIq", header)
-		data = buffer[24:24+includedLength]
-		output = None if len(data) != includedLength else HCI_Hdr(data)
-		return (buffer[24+includedLength:],includedLength,output)
+	def getStreamStatistics(self):
+		'''
+		This method returns the statistics of the btsnoop stream used to monitor the smartphone.
+
+		:return: dictionary indicating the throughput (bytes and frames per second), the number of received and discarded bytes, and the number of received, processed, dropped and queued frames
+		:rtype: dict
+
+		:Example:
+
+			>>> device.getStreamStatistics()
+			{'receivedBytes': 1048576, 'discardedBytes': 0, 'receivedFrames': 20164, 'processedFrames': 20164, 'droppedFrames': 0, 'queued': 0, 'maxBacklog': 1260, 'bytesPerSecond': 104857.6, 'framesPerSecond': 2016.4}
+
+		.. note::
+
+			This method is a **shared method** and can be called from the corresponding Emitters / Receivers.
+
+		'''
+		return self.stream.getStatistics()
 
 	def getCurrentHandle(self):
 		'''
@@ -467,38 +475,18 @@ class ADBDevice(wireless.Device):
 				self._setCurrentHandle(-1)
 
 	def recv(self):
-		if self.socket is None:
-			if len(self.buffer) < 24:
-				self.buffer += self._getNewSnoopFileData(self.location,self.size)
-			if len(self.buffer) >= 24:
-				while not self._isPacketHeader(self.buffer):
-					self.size += 1
-					self.buffer = self.buffer[1:]
-				if len(self.buffer) >= 24:
-					self.buffer,includedLength,packet = self._getPacket(self.buffer)
-					self.size += 24 + includedLength
-					if packet is not None:			
-						return packet
-		else:
-			try:
-				self.buffer += self.socket.recv(1)
-			except BlockingIOError:
-				pass
-			if len(self.buffer) >= 24:
-				if self._isPacketHeader(self.buffer):
-					buffer,includedLength,packet = self._getPacket(self.buffer)
-					if len(self.buffer) >= 24 + includedLength and packet is not None:
-						self.buffer = buffer
-						return packet
-					
-				else:
-					self.buffer = self.buffer[1:]
+		frame = self.stream.recv(timeout=0.1)
+		if frame is not None:
+			return HCI_Hdr(frame)
 
 	def __init__(self,interface):
 		super().__init__(interface=interface)
 		self.currentHandle = -1
 		self.handles = []
 		self.ready = False
+		self.socket = None
+		self.process = None
+		self.stream = None
 		if "adb" == interface:
 			self.index = 0
 			self.interface = "adb0"
@@ -526,8 +514,9 @@ class ADBDevice(wireless.Device):
 						start = self.socket.recv(16)
 						if b"btsnoop" in start:
 							io.success("Connected to TCP Btsnoop service !")
-							self.socket.setblocking(0)
-							self.buffer = b""
+							self.socket.settimeout(0.1)
+							self.stream = BtsnoopStream(self.socket.recv)
+							self.stream.start()
 							self.ready = True
 						else:
 							io.fail("TCP service not available !")
@@ -542,10 +531,18 @@ class ADBDevice(wireless.Device):
 						size = self._getSizeOfSnoopFile(location)
 						io.success("Size found: "+str(size))
 						self.size = size + 1
-						self.buffer = b""
+						self.process = self._openSnoopFileProcess(location,self.size)
+						self.stream = BtsnoopStream(self.process.stdout.read1)
+						self.stream.start()
 						self.ready = True
 					else:
 						io.fail("Log not found, aborting ...")
 						self.ready = False
 	def close(self):
+		if self.socket is not None:
+			self.socket.close()
+		if self.process is not None:
+			self.process.terminate()
+		if self.stream is not None:
+			self.stream.stop()
 		ADBDevice.stopADBDaemon()
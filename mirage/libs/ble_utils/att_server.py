@@ -1,6 +1,7 @@
 from mirage.libs.ble_utils.dissectors import *
 from mirage.libs.ble_utils.constants import *
 from mirage.libs import utils,io
+import bisect
 
 class ATT_Attribute:
 	'''
@@ -47,11 +48,56 @@ class ATT_Database:
 	'''
 	This class describes an ATT Database.
 	It acts as a classic Database, and offer multiple primitives in order to manipulate the attributes.
-	The internal representation is just a list containing some ``ATT_Attribute``.
+	The internal representation is a list containing some ``ATT_Attribute`` (indexed by handle), completed by the following indexes maintained by ``setAttribute`` :
+
+	  * **handles** : sorted list of the existing handles, allowing to select a range of handles using a binary search
+	  * **typeIndex** : dictionary linking an attribute type to the sorted list of the corresponding handles
+	  * **groupEnds** : dictionary linking a handle to the last handle of its group (the handle preceding the next attribute of the same type, or None if it is the last one)
 
 	'''
 	def __init__(self):
 		self.attributes = []
+		self.handles = []
+		self.typeIndex = {}
+		self.groupEnds = {}
+
+	def _getTypeKey(self,type):
+		return type.content["UUID128"] if "UUID128" in type.content else type.data
+
+	def _getRange(self,handles,start,end):
+		return handles[bisect.bisect_left(handles,start):bisect.bisect_right(handles,end)]
+
+	def _getGroupEnd(self,handle,end):
+		groupEnd = self.groupEnds[handle]
+		if groupEnd is None:
+			groupEnd = self.handles[-1]
+		return max(handle,min(groupEnd,end))
+
+	def _updateGroupEnd(self,handles,position):
+		if 0 <= position < len(handles):
+			self.groupEnds[handles[position]] = handles[position+1] - 1 if position+1 < len(handles) else None
+
+	def _indexAttribute(self,attribute):
+		handle = attribute.handle
+		previous = self.attributes[handle] if handle < len(self.attributes) else None
+		if previous is not None:
+			key = self._getTypeKey(previous.type)
+			handles = self.typeIndex[key]
+			position = bisect.bisect_left(handles,handle)
+			del handles[position]
+			del self.groupEnds[handle]
+			if len(handles) == 0:
+				del self.typeIndex[key]
+			else:
+				self._updateGroupEnd(handles,position-1)
+		else:
+			bisect.insort(self.handles,handle)
+
+		handles = self.typeIndex.setdefault(self._getTypeKey(attribute.type),[])
+		position = bisect.bisect_left(handles,handle)
+		handles.insert(position,handle)
+		self._updateGroupEnd(handles,position)
+		self._updateGroupEnd(handles,position-1)
 
 	def _getRType(self,type):
 		if isinstance(type, int):
@@ -131,49 +177,48 @@ class ATT_Database:
 		:type title: str
 		'''
 		formattedCharacteristics = []
-		for i in range(startHandle,endHandle):
-			if i < len(self.attributes):
-				att = self.attributes[i]
-				if att.type == UUID(name="Characteristic Declaration"):
-					declarationHandle = "0x{:04x}".format(att.handle)
-					characteristic = CharacteristicDeclaration(data=att.value[::-1])
-					uuid16 = ("0x{:04x}".format(characteristic.UUID.UUID16) 
-							if characteristic.UUID.UUID16 is not None
-							else ""
-						 )
-					uuid128 = (characteristic.UUID.UUID128.hex() 
-							if characteristic.UUID.UUID128 is not None
-							else ""
-						)
-					name = (characteristic.UUID.name
-							if characteristic.UUID.name is not None
-							else ""
-						)
-					valueHandle = "0x{:04x}".format(characteristic.valueHandle)
-					value = self.attributes[characteristic.valueHandle].value
-					value = (value.replace(b"\x00",b"").decode("ascii") 
-						if utils.isPrintable(value)
-						else value.hex()
+		declarations = self.typeIndex.get(self._getTypeKey(UUID(name="Characteristic Declaration")),[])
+		for i in self._getRange(declarations,startHandle,endHandle-1):
+			att = self.attributes[i]
+			declarationHandle = "0x{:04x}".format(att.handle)
+			characteristic = CharacteristicDeclaration(data=att.value[::-1])
+			uuid16 = ("0x{:04x}".format(characteristic.UUID.UUID16) 
+					if characteristic.UUID.UUID16 is not None
+					else ""
+				 )
+			uuid128 = (characteristic.UUID.UUID128.hex() 
+					if characteristic.UUID.UUID128 is not None
+					else ""
+				)
+			name = (characteristic.UUID.name
+					if characteristic.UUID.name is not None
+					else ""
+				)
+			valueHandle = "0x{:04x}".format(characteristic.valueHandle)
+			value = self.attributes[characteristic.valueHandle].value
+			value = (value.replace(b"\x00",b"").decode("ascii") 
+				if utils.isPrintable(value)
+				else value.hex()
+			)
+			permissions = ",".join(characteristic.permissionsFlag.permissions)
+			startDescriptor = characteristic.valueHandle + 1
+			descriptors = ""
+			while (startDescriptor < len(self.attributes) and 
+				self.attributes[startDescriptor] is not None and
+			       (self.attributes[startDescriptor].type != UUID(name="Characteristic Declaration") and
+				self.attributes[startDescriptor].type != UUID(name="Primary Service") and
+				self.attributes[startDescriptor].type != UUID(name="Secondary Service"))):
+				descriptor = self.attributes[startDescriptor]
+				
+				namedesc = CharacteristicDescriptor(UUID=descriptor.type).UUID.name
+				valuedesc = (descriptor.value.replace(b"\x00",b"").decode("ascii") 
+						if utils.isPrintable(descriptor.value)
+						else descriptor.value.hex()
 					)
-					permissions = ",".join(characteristic.permissionsFlag.permissions)
-					startDescriptor = characteristic.valueHandle + 1
-					descriptors = ""
-					while (startDescriptor < len(self.attributes) and 
-						self.attributes[startDescriptor] is not None and
-					       (self.attributes[startDescriptor].type != UUID(name="Characteristic Declaration") and
-						self.attributes[startDescriptor].type != UUID(name="Primary Service") and
-						self.attributes[startDescriptor].type != UUID(name="Secondary Service"))):
-						descriptor = self.attributes[startDescriptor]
-						
-						namedesc = CharacteristicDescriptor(UUID=descriptor.type).UUID.name
-						valuedesc = (descriptor.value.replace(b"\x00",b"").decode("ascii") 
-								if utils.isPrintable(descriptor.value)
-								else descriptor.value.hex()
-							)
-						startSymbol = "" if descriptors == "" else "\n"
-						descriptors += startSymbol + namedesc +" : "+ valuedesc
-						startDescriptor += 1
-					formattedCharacteristics.append([declarationHandle, valueHandle, uuid16, uuid128, name,permissions,value,descriptors])
+				startSymbol = "" if descriptors == "" else "\n"
+				descriptors += startSymbol + namedesc +" : "+ valuedesc
+				startDescriptor += 1
+			formattedCharacteristics.append([declarationHandle, valueHandle, uuid16, uuid128, name,permissions,value,descriptors])
 		io.chart(["Declaration Handle","Value Handle","UUID16","UUID128","Name","Permissions", "Value","Descriptors"]
 			,formattedCharacteristics,
 			io.colorize(title, "yellow")
@@ -214,22 +259,15 @@ class ATT_Database:
 			└──────────────────┴────────────────────────────────────────────┴────────────────────────────────────────┘
 
 		'''
-		if handle is not None:
-			if handle >= len(self.attributes):
-				for i in range(handle):
-					if i >= len(self.attributes):
-						self.attributes.append(None)
-				self.attributes.append(ATT_Attribute(	handle=handle,
-										value=value,
-										type=type,
-										permissions=permissions
-									))
-			else:
-				self.attributes[handle] = ATT_Attribute(handle=handle, value=value,type=type,permissions=permissions)
+		if handle is None:
+			handle = max(len(self.attributes),1)
+		attribute = ATT_Attribute(handle=handle, value=value,type=type,permissions=permissions)
+		self._indexAttribute(attribute)
+		if handle >= len(self.attributes):
+			self.attributes.extend([None]*(handle - len(self.attributes)))
+			self.attributes.append(attribute)
 		else:
-			if len(self.attributes) == 0:
-				self.attributes.append(None)
-			self.attributes.append(ATT_Attribute(handle=handle, value=value,type=type,permissions=permissions))
+			self.attributes[handle] = attribute
 
 	def getNextHandle(self):
 		'''
@@ -243,10 +281,7 @@ class ATT_Database:
 			>>> db.getNextHandle()
 			25
 		'''
-		highestHandle = 0x0000
-		for att in self.attributes:
-			if att is not None and att.handle >= highestHandle:
-				highestHandle = att.handle
+		highestHandle = self.handles[-1] if len(self.handles) > 0 else 0x0000
 		return highestHandle + 1
 
 	def read(self,handle):
@@ -339,11 +374,10 @@ class ATT_Database:
 			[{'attributeHandle': 2, 'value': b'\x00\x18'}, {'attributeHandle': 5, 'value': b'\x00\x18'}]
 
 		'''
-		rtype = self._getRType(type)
+		handles = self.typeIndex.get(self._getTypeKey(self._getRType(type)),[])
 		response = []
-		for att in self.attributes[start:end+1]:
-			if att is not None and att.type == rtype:
-				response.append({"attributeHandle":att.handle,"value":att.value})
+		for handle in self._getRange(handles,start,end):
+			response.append({"attributeHandle":handle,"value":self.attributes[handle].value})
 		return response
 
 	def findInformation(self, start, end):
@@ -374,9 +408,8 @@ class ATT_Database:
 		'''
 		response = []
 
-		for att in self.attributes[start:end+1]:
-			if att is not None:
-				response.append({"attributeHandle":att.handle,"type":att.type.data})
+		for handle in self._getRange(self.handles,start,end):
+			response.append({"attributeHandle":handle,"type":self.attributes[handle].type.data})
 
 		return response
 
@@ -394,23 +427,10 @@ class ATT_Database:
 		:rtype: list of dict
 
 		'''
-		rtype = self._getRType(type)
+		handles = self.typeIndex.get(self._getTypeKey(self._getRType(type)),[])
 		response = []
-		for i in range(start, end+1):
-			try:
-				att = self.attributes[i]
-				if att is not None and att.type == rtype:
-					maxhandle = i
-					try:
-						for j in range(i+1,end+1):
-							if self.attributes[j] is not None and self.attributes[j].type == rtype:
-								break
-							maxhandle = j
-					except:
-						pass
-				response.append({"attributeHandle":i,"endGroupHandle":maxhandle,"value":att.value})
-			except:
-				pass
+		for handle in self._getRange(handles,start,end):
+			response.append({"attributeHandle":handle,"endGroupHandle":self._getGroupEnd(handle,end),"value":self.attributes[handle].value})
 		return response
 
 	def findByTypeValue(self,start,end,type,value):
@@ -429,23 +449,11 @@ class ATT_Database:
 		:rtype: list of dict
 
 		'''
-		rtype = self._getRType(type)
+		handles = self.typeIndex.get(self._getTypeKey(self._getRType(type)),[])
 		response = []
-		for i in range(start, end+1):
-			try:
-				att = self.attributes[i]
-				if att is not None and att.type == rtype and att.value == value:
-					maxhandle = i
-					try:
-						for j in range(i+1,end+1):
-							if self.attributes[j] is not None and self.attributes[j].type == rtype:
-								break
-							maxhandle = j
-					except:
-						pass
-				response.append({"attributeHandle":i,"endGroupHandle":maxhandle})
-			except:
-				pass
+		for handle in self._getRange(handles,start,end):
+			if self.attributes[handle].value == value:
+				response.append({"attributeHandle":handle,"endGroupHandle":self._getGroupEnd(handle,end)})
 		return response
 
 class ATT_Server:
@@ -702,7 +710,7 @@ class ATT_Server:
 				if ((last_size_type is None or last_size_type == size_type) and 
 				     total_size + size_handle + size_type <  self.mtu - 1):
 					body.append(elmt)
-					size_type += size_handle + size_type
+					total_size += size_handle + size_type
 					last_size_type = size_type
 				else:
 					break
@@ -5,6 +5,7 @@ from serial.tools.list_ports import comports
 from serial import Serial,SerialException
 from mirage.libs.ble_utils.constants import *
 from mirage.libs.ble_utils.scapy_btlejack_layers import *
+from mirage.libs.wireless_utils.serialTransport import SerialTransport,HeaderLengthFramer
 from mirage.libs import io,utils,wireless
 
 class BTLEJackDevice(wireless.Device):
@@ -54,6 +55,7 @@ class BTLEJackDevice(wireless.Device):
 	sharedMethods = [
 			"getFirmwareVersion",
 			"getDeviceIndex",
+			"getTransportStatistics",
 			"setCRCChecking",
 
 			"setChannel",
@@ -363,6 +365,8 @@ class BTLEJackDevice(wireless.Device):
 	def _flush(self):
 		while self.microbit.in_waiting:
 			self.microbit.read()
+		if hasattr(self,"transport"):
+			self.transport.flush()
 
 	def _flushCommandResponses(self):
 		while not self.commandResponses.empty():
@@ -437,9 +441,7 @@ class BTLEJackDevice(wireless.Device):
 		return self.index
 
 	def _send(self,packet):
-		self.lock.acquire()
-		self.microbit.write(raw(packet))
-		self.lock.release()
+		self.transport.send(raw(packet))
 
 	def send(self,packet):
 		command = None
@@ -723,31 +725,30 @@ class BTLEJackDevice(wireless.Device):
 			self._setAccessAddress(accessAddress)
 			self._recoverFromAccessAddress(accessAddress=accessAddress)
 
-	def _recv(self):
-		self.lock.acquire()
-		if self.microbit is not None and self.microbit.in_waiting:
-			self.receptionBuffer += self.microbit.read()
-		self.lock.release()
+	def _recv(self,timeout=0.1):
+		frame = self.transport.recv(timeout=timeout)
+		if frame is not None:
+			return BTLEJack_Hdr(frame)
+		return None
 
-		if len(self.receptionBuffer) > 0:
-			try:
-				start = self.receptionBuffer.index(0xBC)
-				self.receptionBuffer = self.receptionBuffer[start:]
-
-			except ValueError:
-				self.receptionBuffer = b""
-
-			if len(self.receptionBuffer) >= 4:
-				size = struct.unpack('<H',self.receptionBuffer[2:4])[0]
-				if len(self.receptionBuffer) >= size + 5:
-					#print(self.receptionBuffer[:size+5].hex())
-					pkt = BTLEJack_Hdr(self.receptionBuffer[:size+5])
-					self.receptionBuffer = self.receptionBuffer[size+5:]
-					return pkt
-				else:
-					receptionBuffer = b""
+	def getTransportStatistics(self):
+		'''
+		This method returns the statistics of the serial transport used to communicate with the BTLEJack device.
 
-		return None
+		:return: dictionary indicating the throughput, the number of received, processed and dropped frames and the latencies (see ``mirage.libs.wireless_utils.serialTransport.SerialTransport.getStatistics``)
+		:rtype: dict
+
+		:Example:
+
+			>>> device.getTransportStatistics()["framesPerSecond"]
+			452.3
+
+		.. note::
+
+			This method is a **shared method** and can be called from the corresponding Emitters / Receivers.
+
+		'''
+		return self.transport.getStatistics()
 
 
 	def disableAdvertisementsJamming(self):
@@ -757,6 +758,7 @@ class BTLEJackDevice(wireless.Device):
 	def close(self):
 		self.lock.acquire()
 		self._stopSweepingThread()
+		self.transport.stop()
 		self.microbit.close()
 		self.microbit = None
 		self.lock.release()
@@ -1026,8 +1028,6 @@ class BTLEJackDevice(wireless.Device):
 				self.synchronized = False
 			else:
 				self.commandResponses.put(pkt)
-		else:
-			utils.wait(seconds=0.0001)
 
 
 	def setScanInterval(self,seconds=1):
@@ -1140,8 +1140,9 @@ class BTLEJackDevice(wireless.Device):
 			self.hijacking = False
 			self.jamming = False
 			self.customMirageFirmware = False
-			self.receptionBuffer = b""
 			self.lock = Lock()
+			self.transport = SerialTransport(self.microbit,HeaderLengthFramer(header=0xBC,lengthOffset=2,overhead=5))
+			self.transport.start()
 			self.commandResponses = Queue()
 			self.channel = 37
 			self.accessAddress = None
@@ -0,0 +1,195 @@
+import time,struct,socket
+from queue import Queue,Empty,Full
+from mirage.libs.wireless_utils.packetQueue import StoppableThread
+
+'''
+This submodule provides a streaming decoder for the btsnoop format (used by Android to log the HCI packets).
+A reader thread reads the stream (e.g. the TCP btsnoop service forwarded by adb, or the output of a ``tail -f`` on the snoop file) in large chunks,
+a decoder extracts the HCI frames from the btsnoop records, and the frames are stored in a queue until they are received by the device.
+'''
+
+class BtsnoopDecoder:
+	'''
+	This class decodes a btsnoop stream (without the 16 bytes file header).
+	The received bytes are accumulated in a ``bytearray``, and the 24 bytes headers of the records are parsed in place.
+	If a header is not valid (original length different from the included length or length too large), the decoder resynchronizes by skipping one byte.
+
+	:param maxLength: maximal length of a valid record
+	:type maxLength: int
+
+	:Example:
+
+		>>> decoder = BtsnoopDecoder()
+		>>> decoder.feed(bytes.fromhex("0000000700000007000000000000000000e2b0ab1c0a5bf2040e04"))
+		[]
+		>>> decoder.feed(bytes.fromhex("01030c00"))
+		[b'\x04\x0e\x04\x01\x03\x0c\x00']
+
+	'''
+	header = struct.Struct(">IIIIq")
+
+	def __init__(self,maxLength=65540):
+		self.maxLength = maxLength
+		self.buffer = bytearray()
+		self.discardedBytes = 0
+
+	def feed(self,data):
+		'''
+		This method appends the provided bytes to the buffer and returns the HCI frames of the complete records.
+		The incomplete record is kept in the buffer.
+
+		:param data: bytes received from the stream
+		:type data: bytes
+		:return: list of HCI frames
+		:rtype: list of bytes
+		'''
+		self.buffer += data
+		frames = []
+		offset,size = 0,len(self.buffer)
+		with memoryview(self.buffer) as view:
+			while size - offset >= 24:
+				originalLength,includedLength,_,_,_ = self.header.unpack_from(view,offset)
+				if originalLength != includedLength or includedLength > self.maxLength:
+					offset += 1
+					self.discardedBytes += 1
+					continue
+				end = offset + 24 + includedLength
+				if end > size:
+					break
+				frames.append(view[offset+24:end].tobytes())
+				offset = end
+		del self.buffer[:offset]
+		return frames
+
+	def flush(self):
+		'''
+		This method removes the bytes not yet decoded.
+		'''
+		del self.buffer[:]
+
+class BtsnoopStream:
+	'''
+	This class implements a btsnoop stream : a reader thread reads the stream in large chunks using the provided function,
+	decodes the records using a ``BtsnoopDecoder`` and stores the HCI frames in a queue. The ``recv`` method blocks on this queue.
+	The reader thread stops when the provided function returns an empty bytes (end of the stream).
+
+	:param read: function returning at most the provided number of bytes from the stream (e.g. ``socket.recv``)
+	:type read: function
+	:param queueSize: maximum number of frames stored in the queue (0 means unlimited), the frames received when the queue is full are dropped
+	:type queueSize: int
+	:param chunkSize: maximum number of bytes read at once
+	:type chunkSize: int
+
+	:Example:
+
+		>>> s = socket.create_connection(("127.0.0.1",8872))
+		>>> s.recv(16)
+		b'btsnoop\x00\x00\x00\x00\x01\x00\x00\x03\xea'
+		>>> s.settimeout(0.1)
+		>>> stream = BtsnoopStream(s.recv)
+		>>> stream.start()
+		>>> stream.recv(timeout=1.0)
+		b'\x04\x0e\x04\x01\x03\x0c\x00'
+
+	'''
+	def __init__(self,read,queueSize=0,chunkSize=65536):
+		self.read = read
+		self.chunkSize = chunkSize
+		self.decoder = BtsnoopDecoder()
+		self.queue = Queue(maxsize=queueSize)
+		self.readerThread = None
+		self.ended = False
+		self.startTime = time.time()
+		self.receivedBytes = 0
+		self.receivedFrames = 0
+		self.processedFrames = 0
+		self.droppedFrames = 0
+		self.maxBacklog = 0
+
+	def start(self):
+		'''
+		This method starts the reader thread.
+		'''
+		if self.readerThread is None:
+			self.readerThread = StoppableThread(target=self._read)
+			self.readerThread.start()
+
+	def stop(self):
+		'''
+		This method stops the reader thread.
+		'''
+		if self.readerThread is not None:
+			self.readerThread.stop()
+			self.readerThread.join(0.5)
+			self.readerThread = None
+
+	def isStarted(self):
+		'''
+		This method indicates if the reader thread is running.
+
+		:return: boolean indicating if the reader thread is running
+		:rtype: bool
+		'''
+		return self.readerThread is not None and not self.ended
+
+	def _read(self):
+		try:
+			data = self.read(self.chunkSize)
+		except (BlockingIOError,socket.timeout):
+			return
+		if not data:
+			self.ended = True
+			self.readerThread.stop()
+			return
+		self.receivedBytes += len(data)
+		for frame in self.decoder.feed(data):
+			self.receivedFrames += 1
+			try:
+				self.queue.put_nowait(frame)
+			except Full:
+				self.droppedFrames += 1
+		backlog = self.queue.qsize()
+		if backlog > self.maxBacklog:
+			self.maxBacklog = backlog
+
+	def recv(self,timeout=None):
+		'''
+		This method returns the next HCI frame, waiting at most ``timeout`` seconds if no frame is available.
+
+		:param timeout: time (in seconds) before the method returns None (None means no timeout)
+		:type timeout: float
+		:return: HCI frame (or None if no frame has been received)
+		:rtype: bytes
+		'''
+		try:
+			frame = self.queue.get(timeout=timeout)
+		except Empty:
+			return None
+		self.processedFrames += 1
+		return frame
+
+	def getStatistics(self):
+		'''
+		This method returns the statistics of the stream.
+
+		:return: dictionary indicating the throughput (bytes and frames per second), the number of received and discarded bytes, and the number of received, processed, dropped and queued frames
+		:rtype: dict
+
+		:Example:
+
+			>>> stream.getStatistics()
+			{'receivedBytes': 1048576, 'discardedBytes': 0, 'receivedFrames': 20164, 'processedFrames': 20164, 'droppedFrames': 0, 'queued': 0, 'maxBacklog': 1260, 'bytesPerSecond': 104857.6, 'framesPerSecond': 2016.4}
+
+		'''
+		elapsed = max(time.time() - self.startTime,1e-6)
+		return {
+			"receivedBytes":self.receivedBytes,
+			"discardedBytes":self.decoder.discardedBytes,
+			"receivedFrames":self.receivedFrames,
+			"processedFrames":self.processedFrames,
+			"droppedFrames":self.droppedFrames,
+			"queued":self.queue.qsize(),
+			"maxBacklog":self.maxBacklog,
+			"bytesPerSecond":self.receivedBytes / elapsed,
+			"framesPerSecond":self.receivedFrames / elapsed
+		}
@@ -77,6 +77,8 @@ CONTROL_TYPES = {
 0x0D : "LL_REJECT_IND"
 }
 
+CONTROL_OPCODES = {name:opcode for opcode,name in CONTROL_TYPES.items()}
+
 ADV_TYPES = {
 0: "ADV_IND",
 1: "ADV_DIRECT_IND",
@@ -0,0 +1,599 @@
+'''
+This module provides the registries used by the BLE Emitter and Receiver in order to convert the L2CAP based packets (ATT, Security Manager and L2CAP signaling packets), the HCI commands, the HCI events and the Link Layer control packets.
+
+The received packets are dispatched according to their L2CAP channel identifier and their opcode (respectively their HCI opcode, their HCI event code and LE meta subevent, or their Link Layer control opcode),
+and the transmitted packets are dispatched according to their Mirage class : the conversion cost doesn't depend anymore on the position of a packet type in a chain of tests.
+New packet types can be supported by registering their converters using ``registerL2CAPConverter``, ``registerHCICommandConverter``, ``registerHCIEventConverter``, ``registerControlConverter`` and ``registerPacketConverter``.
+'''
+
+from scapy.all import *
+from mirage.libs.ble_utils.scapy_hci_layers import *
+from mirage.libs.ble_utils.packets import *
+from mirage.libs.ble_utils.constants import *
+from mirage.libs.ble_utils.crypto import BLELinkLayerCrypto
+from mirage.libs import io
+
+L2CAP_SIGNALING_CID = 0x05
+ATT_CID = 0x04
+SM_CID = 0x06
+
+# Name of the field containing the opcode in the header following the L2CAP header, for each channel identifier
+_OPCODE_FIELDS = {
+	ATT_CID:"opcode",
+	L2CAP_SIGNALING_CID:"code",
+	SM_CID:"sm_command"
+}
+# (cid, opcode) -> (layer, converter)
+_L2CAP_CONVERTERS = {}
+# HCI command opcode -> converter
+_HCI_COMMAND_CONVERTERS = {}
+# (HCI event code, LE meta subevent) -> converter
+_HCI_EVENT_CONVERTERS = {}
+# Link Layer control opcode -> converter
+_CONTROL_CONVERTERS = {}
+# Mirage packet class -> converter
+_PACKET_CONVERTERS = {}
+
+def registerL2CAPConverter(cid,opcode,converter,layer=None,opcodeField=None):
+	'''
+	This function allows to register a converter transforming a received L2CAP based packet into a Mirage Packet.
+
+	:param cid: L2CAP channel identifier of the packet
+	:type cid: int
+	:param opcode: opcode of the packet (None if the converter handles every packet transmitted on this channel)
+	:type opcode: int
+	:param converter: function converting the packet, it receives the header following the L2CAP header (e.g. ``ATT_Hdr``) and the connection handle, and returns a Mirage Packet (or None)
+	:type converter: function
+	:param layer: scapy layer expected after the header (if provided, the converter is only called if the packet includes this layer)
+	:type layer: scapy layer class
+	:param opcodeField: name of the field containing the opcode in the header, if the channel identifier is not already known
+	:type opcodeField: str
+
+	:Example:
+
+		>>> registerL2CAPConverter(ATT_CID, 0x0e, lambda header,connectionHandle:MyReadMultipleRequest(handles=header.payload.handles,connectionHandle=connectionHandle), layer=ATT_Read_Multiple_Request)
+
+	'''
+	if opcodeField is not None:
+		_OPCODE_FIELDS[cid] = opcodeField
+	_L2CAP_CONVERTERS[(cid,opcode)] = (layer,converter)
+
+def registerHCICommandConverter(opcode,converter):
+	'''
+	This function allows to register a converter transforming a received HCI command into a Mirage Packet.
+
+	:param opcode: HCI opcode of the command (e.g. 0x200d for LE Create Connection)
+	:type opcode: int
+	:param converter: function converting the command, it receives the scapy frame and returns a Mirage Packet (or None)
+	:type converter: function
+
+	:Example:
+
+		>>> registerHCICommandConverter(0x2016, lambda packet:MyReadRemoteFeatures(connectionHandle=packet.handle))
+
+	'''
+	_HCI_COMMAND_CONVERTERS[opcode] = converter
+
+def registerHCIEventConverter(code,converter,subevent=None):
+	'''
+	This function allows to register a converter transforming a received HCI event into a Mirage Packet.
+
+	:param code: HCI event code
+	:type code: int
+	:param converter: function converting the event, it receives the scapy frame and the HCI device (allowing to update the connection handles), and returns a Mirage Packet (or None)
+	:type converter: function
+	:param subevent: LE meta subevent (only used if code is ``HCI_LE_META``)
+	:type subevent: int
+
+	:Example:
+
+		>>> registerHCIEventConverter(HCI_LE_META, lambda packet,device:MyDataLengthChange(connectionHandle=packet.handle), subevent=0x07)
+
+	'''
+	_HCI_EVENT_CONVERTERS[(code,subevent)] = converter
+
+def registerControlConverter(opcode,converter):
+	'''
+	This function allows to register a converter transforming a received Link Layer control packet into a Mirage Packet.
+	The control packets without converter are converted into ``BLEControlPDU``.
+
+	:param opcode: Link Layer control opcode (e.g. ``CONTROL_OPCODES["LL_ENC_REQ"]``)
+	:type opcode: int
+	:param converter: function converting the packet, it receives the scapy frame, the BLE Receiver and the link layer crypto instance associated to the connection (or None), and returns a Mirage Packet
+	:type converter: function
+
+	:Example:
+
+		>>> registerControlConverter(CONTROL_OPCODES["LL_VERSION_IND"], lambda packet,receiver,cryptoInstance:MyVersionIndication(version=packet.version))
+
+	'''
+	_CONTROL_CONVERTERS[opcode] = converter
+
+def registerPacketConverter(packetClass,converter):
+	'''
+	This function allows to register a converter transforming a Mirage Packet into the scapy layers following the L2CAP header.
+
+	:param packetClass: Mirage Packet class (its subclasses are also handled by this converter, if they don't provide their own converter)
+	:type packetClass: class
+	:param converter: function converting the packet, it receives the Mirage Packet and returns the corresponding scapy layers (e.g. ``ATT_Hdr()/ATT_Read_Request(gatt_handle=packet.handle)``)
+	:type converter: function
+
+	:Example:
+
+		>>> registerPacketConverter(MyReadMultipleRequest, lambda packet:ATT_Hdr()/ATT_Read_Multiple_Request(handles=packet.handles))
+
+	'''
+	_PACKET_CONVERTERS[packetClass] = converter
+
+def convertL2CAPPacket(packet,connectionHandle=-1):
+	'''
+	This function converts a received scapy frame including an L2CAP header into the corresponding Mirage Packet.
+
+	:param packet: scapy frame to convert
+	:type packet: scapy packet
+	:param connectionHandle: connection handle associated to the packet
+	:type connectionHandle: int
+	:return: Mirage Packet, or None if no converter matches this packet
+	:rtype: mirage.libs.ble_utils.packets.BLEPacket
+	'''
+	l2cap = packet.getlayer(L2CAP_Hdr)
+	if l2cap is None:
+		return None
+	cid = l2cap.cid
+	header = l2cap.payload
+	opcodeField = _OPCODE_FIELDS.get(cid)
+	opcode = getattr(header,opcodeField,None) if opcodeField is not None else None
+	entry = _L2CAP_CONVERTERS.get((cid,opcode))
+	if entry is None:
+		entry = _L2CAP_CONVERTERS.get((cid,None))
+		if entry is None:
+			return None
+	layer,converter = entry
+	if layer is not None and not isinstance(header.payload,layer):
+		return None
+	return converter(header,connectionHandle)
+
+def convertHCICommand(packet):
+	'''
+	This function converts a received HCI command into the corresponding Mirage Packet.
+
+	:param packet: scapy frame to convert
+	:type packet: scapy packet
+	:return: Mirage Packet, or None if no converter matches this command
+	:rtype: mirage.libs.ble_utils.packets.BLEPacket
+	'''
+	header = packet.getlayer(HCI_Command_Hdr)
+	if header is None:
+		return None
+	# Depending on the scapy version, the opcode is provided as a single field or as the OGF and OCF fields
+	opcode = header.opcode if "opcode" in header.fields else (header.ogf << 10) | header.ocf
+	converter = _HCI_COMMAND_CONVERTERS.get(opcode)
+	if converter is None:
+		return None
+	return converter(packet)
+
+def convertHCIEvent(packet,device=None):
+	'''
+	This function converts a received HCI event into the corresponding Mirage Packet.
+
+	:param packet: scapy frame to convert
+	:type packet: scapy packet
+	:param device: HCI device which received the event
+	:type device: mirage.libs.ble.BLEHCIDevice
+	:return: Mirage Packet, or None if no converter matches this event
+	:rtype: mirage.libs.ble_utils.packets.BLEPacket
+	'''
+	code = packet.code
+	converter = _HCI_EVENT_CONVERTERS.get((code,packet.event if code == HCI_LE_META else None))
+	if converter is None:
+		return None
+	return converter(packet,device)
+
+def convertControlPacket(packet,receiver=None,cryptoInstance=None):
+	'''
+	This function converts a received Link Layer control packet into the corresponding Mirage Packet.
+
+	:param packet: scapy frame to convert
+	:type packet: scapy packet
+	:param receiver: BLE Receiver which received the packet
+	:type receiver: mirage.libs.ble.BLEReceiver
+	:param cryptoInstance: link layer crypto instance associated to the connection
+	:type cryptoInstance: mirage.libs.ble_utils.crypto.BLELinkLayerCrypto
+	:return: Mirage Packet
+	:rtype: mirage.libs.ble_utils.packets.BLEPacket
+	'''
+	converter = _CONTROL_CONVERTERS.get(packet.opcode)
+	if converter is None:
+		return _buildControlPDU(packet)
+	return converter(packet,receiver,cryptoInstance)
+
+def _buildControlPDU(packet):
+	try:
+		data = bytes(packet[BTLE_CTRL:])[1:]
+	except:
+		data = b""
+	return BLEControlPDU(type=CONTROL_TYPES.get(packet.opcode,"???"),data=data)
+
+def buildL2CAPPayload(packet):
+	'''
+	This function converts a Mirage Packet into the scapy layers following the L2CAP header.
+
+	:param packet: Mirage Packet to convert
+	:type packet: mirage.libs.ble_utils.packets.BLEPacket
+	:return: scapy layers, or None if no converter matches this packet
+	:rtype: scapy packet
+	'''
+	converter = _PACKET_CONVERTERS.get(type(packet))
+	if converter is None:
+		for packetClass in type(packet).__mro__[1:]:
+			converter = _PACKET_CONVERTERS.get(packetClass)
+			if converter is not None:
+				break
+		else:
+			return None
+	return converter(packet)
+
+# Received packets
+
+registerL2CAPConverter(ATT_CID,0x01,lambda header,connectionHandle:BLEErrorResponse(
+	request = header.payload.request,
+	handle = header.payload.handle,
+	ecode = header.payload.ecode,
+	connectionHandle = connectionHandle
+	),layer=ATT_Error_Response)
+
+registerL2CAPConverter(ATT_CID,0x02,lambda header,connectionHandle:BLEExchangeMTURequest(
+	mtu = header.payload.mtu,
+	connectionHandle = connectionHandle
+	),layer=ATT_Exchange_MTU_Request)
+
+registerL2CAPConverter(ATT_CID,0x03,lambda header,connectionHandle:BLEExchangeMTUResponse(
+	mtu = header.payload.mtu,
+	connectionHandle = connectionHandle
+	),layer=ATT_Exchange_MTU_Response)
+
+registerL2CAPConverter(ATT_CID,0x04,lambda header,connectionHandle:BLEFindInformationRequest(
+	startHandle = header.payload.start,
+	endHandle = header.payload.end,
+	connectionHandle = connectionHandle
+	),layer=ATT_Find_Information_Request)
+
+registerL2CAPConverter(ATT_CID,0x05,lambda header,connectionHandle:BLEFindInformationResponse(
+	data = bytes(header.payload)[1:],
+	format = header.payload.format,
+	connectionHandle = connectionHandle
+	),layer=ATT_Find_Information_Response)
+
+registerL2CAPConverter(ATT_CID,0x06,lambda header,connectionHandle:BLEFindByTypeValueRequest(
+	startHandle = header.payload.start,
+	endHandle = header.payload.end,
+	uuid = header.payload.uuid,
+	data = header.payload.data,
+	connectionHandle = connectionHandle
+	),layer=ATT_Find_By_Type_Value_Request)
+
+registerL2CAPConverter(ATT_CID,0x07,lambda header,connectionHandle:BLEFindByTypeValueResponse(
+	handles = header.payload.handles,
+	connectionHandle = connectionHandle
+	),layer=ATT_Find_By_Type_Value_Response)
+
+registerL2CAPConverter(ATT_CID,0x08,lambda header,connectionHandle:BLEReadByTypeRequest(
+	startHandle = header.payload.start,
+	endHandle = header.payload.end,
+	uuid = header.payload.uuid,
+	connectionHandle = connectionHandle
+	),layer=ATT_Read_By_Type_Request)
+
+registerL2CAPConverter(ATT_CID,0x09,lambda header,connectionHandle:BLEReadByTypeResponse(
+	data = bytes(header.payload),
+	connectionHandle = connectionHandle
+	),layer=ATT_Read_By_Type_Response)
+
+registerL2CAPConverter(ATT_CID,0x0a,lambda header,connectionHandle:BLEReadRequest(
+	handle = header.payload.gatt_handle,
+	connectionHandle = connectionHandle
+	),layer=ATT_Read_Request)
+
+# An empty Read Response is not dissected as an ATT_Read_Response layer
+registerL2CAPConverter(ATT_CID,0x0b,lambda header,connectionHandle:BLEReadResponse(
+	value = header.payload.value if isinstance(header.payload,ATT_Read_Response) else b"",
+	connectionHandle = connectionHandle
+	))
+
+registerL2CAPConverter(ATT_CID,0x0c,lambda header,connectionHandle:BLEReadBlobRequest(
+	handle = header.payload.gatt_handle,
+	offset = header.payload.offset,
+	connectionHandle = connectionHandle
+	),layer=ATT_Read_Blob_Request)
+
+registerL2CAPConverter(ATT_CID,0x0d,lambda header,connectionHandle:BLEReadBlobResponse(
+	value = header.payload.value,
+	connectionHandle = connectionHandle
+	),layer=ATT_Read_Blob_Response)
+
+registerL2CAPConverter(ATT_CID,0x10,lambda header,connectionHandle:BLEReadByGroupTypeRequest(
+	startHandle = header.payload.start,
+	endHandle = header.payload.end,
+	uuid = header.payload.uuid,
+	connectionHandle = connectionHandle
+	),layer=ATT_Read_By_Group_Type_Request)
+
+registerL2CAPConverter(ATT_CID,0x11,lambda header,connectionHandle:BLEReadByGroupTypeResponse(
+	length = header.payload.length,
+	data = header.payload.data,
+	connectionHandle = connectionHandle
+	),layer=ATT_Read_By_Group_Type_Response)
+
+registerL2CAPConverter(ATT_CID,0x12,lambda header,connectionHandle:BLEWriteRequest(
+	handle = header.payload.gatt_handle,
+	value = header.payload.data,
+	connectionHandle = connectionHandle
+	),layer=ATT_Write_Request)
+
+registerL2CAPConverter(ATT_CID,0x13,lambda header,connectionHandle:BLEWriteResponse(connectionHandle = connectionHandle))
+
+registerL2CAPConverter(ATT_CID,0x52,lambda header,connectionHandle:BLEWriteCommand(
+	handle = header.payload.gatt_handle,
+	value = header.payload.data,
+	connectionHandle = connectionHandle
+	),layer=ATT_Write_Command)
+
+registerL2CAPConverter(ATT_CID,0x1b,lambda header,connectionHandle:BLEHandleValueNotification(
+	handle = header.payload.gatt_handle,
+	value = header.payload.value,
+	connectionHandle = connectionHandle
+	),layer=ATT_Handle_Value_Notification)
+
+registerL2CAPConverter(ATT_CID,0x1d,lambda header,connectionHandle:BLEHandleValueIndication(
+	handle = header.payload.gatt_handle,
+	value = header.payload.value,
+	connectionHandle = connectionHandle
+	),layer=ATT_Handle_Value_Indication)
+
+registerL2CAPConverter(ATT_CID,0x1e,lambda header,connectionHandle:BLEHandleValueConfirmation(connectionHandle = connectionHandle))
+
+registerL2CAPConverter(SM_CID,0x01,lambda header,connectionHandle:BLEPairingRequest(
+	inputOutputCapability = header.payload.iocap,
+	outOfBand = header.payload.oob == 1,
+	authentication = header.payload.authentication,
+	initiatorKeyDistribution = header.payload.initiator_key_distribution,
+	responderKeyDistribution = header.payload.responder_key_distribution,
+	payload = raw(header),
+	connectionHandle = connectionHandle
+	),layer=SM_Pairing_Request)
+
+registerL2CAPConverter(SM_CID,0x02,lambda header,connectionHandle:BLEPairingResponse(
+	inputOutputCapability = header.payload.iocap,
+	outOfBand = header.payload.oob == 1,
+	authentication = header.payload.authentication,
+	initiatorKeyDistribution = header.payload.initiator_key_distribution,
+	responderKeyDistribution = header.payload.responder_key_distribution,
+	payload = raw(header),
+	connectionHandle = connectionHandle
+	),layer=SM_Pairing_Response)
+
+registerL2CAPConverter(SM_CID,0x03,lambda header,connectionHandle:BLEPairingConfirm(
+	confirm = header.payload.confirm,
+	connectionHandle = connectionHandle
+	),layer=SM_Confirm)
+
+registerL2CAPConverter(SM_CID,0x04,lambda header,connectionHandle:BLEPairingRandom(
+	random = header.payload.random,
+	connectionHandle = connectionHandle
+	),layer=SM_Random)
+
+registerL2CAPConverter(SM_CID,0x05,lambda header,connectionHandle:BLEPairingFailed(
+	reason = header.payload.reason,
+	connectionHandle = connectionHandle
+	),layer=SM_Failed)
+
+registerL2CAPConverter(SM_CID,0x06,lambda header,connectionHandle:BLEEncryptionInformation(
+	ltk = header.payload.ltk,
+	connectionHandle = connectionHandle
+	),layer=SM_Encryption_Information)
+
+registerL2CAPConverter(SM_CID,0x07,lambda header,connectionHandle:BLEMasterIdentification(
+	ediv = header.payload.ediv,
+	rand = header.payload.rand,
+	connectionHandle = connectionHandle
+	),layer=SM_Master_Identification)
+
+registerL2CAPConverter(SM_CID,0x08,lambda header,connectionHandle:BLEIdentityInformation(
+	irk = header.payload.irk,
+	connectionHandle = connectionHandle
+	),layer=SM_Identity_Information)
+
+registerL2CAPConverter(SM_CID,0x09,lambda header,connectionHandle:BLEIdentityAddressInformation(
+	type = "public" if header.payload.atype == 0 else "random",
+	address = header.payload.address,
+	connectionHandle = connectionHandle
+	),layer=SM_Identity_Address_Information)
+
+registerL2CAPConverter(SM_CID,0x0a,lambda header,connectionHandle:BLESigningInformation(
+	csrk = header.payload.csrk,
+	connectionHandle = connectionHandle
+	),layer=SM_Signing_Information)
+
+# Some scapy versions provide their own Security Request layer, only the opcode is checked
+registerL2CAPConverter(SM_CID,0x0b,lambda header,connectionHandle:BLESecurityRequest(
+	authentication = header.payload.authentication,
+	connectionHandle = connectionHandle
+	))
+
+registerL2CAPConverter(L2CAP_SIGNALING_CID,0x12,lambda header,connectionHandle:BLEConnectionParameterUpdateRequest(
+	l2capCmdId = header.id,
+	maxInterval = header.payload.max_interval,
+	minInterval = header.payload.min_interval,
+	timeoutMult = header.payload.timeout_mult,
+	slaveLatency = header.payload.slave_latency,
+	connectionHandle = connectionHandle
+	),layer=L2CAP_Connection_Parameter_Update_Request)
+
+registerL2CAPConverter(L2CAP_SIGNALING_CID,0x13,lambda header,connectionHandle:BLEConnectionParameterUpdateResponse(
+	l2capCmdId = header.id,
+	moveResult = header.payload.move_result,
+	connectionHandle = connectionHandle
+	),layer=L2CAP_Connection_Parameter_Update_Response)
+
+registerHCICommandConverter(0x200d,lambda packet:BLEConnect(
+	dstAddr = packet.paddr,
+	type = "public" if packet.patype == 0 else "random",
+	initiatorType = "public" if packet.atype == 0 else "random"
+	))
+
+registerHCICommandConverter(0x200e,lambda packet:BLEConnectionCancel())
+
+registerHCICommandConverter(0x2019,lambda packet:BLELongTermKeyRequest(
+	connectionHandle = packet.handle,
+	rand = packet.rand,
+	ediv = packet.ediv,
+	ltk = packet.ltk
+	))
+
+registerHCICommandConverter(0x201a,lambda packet:BLELongTermKeyRequestReply(
+	connectionHandle = packet.handle,
+	ltk = packet.ltk,
+	positive = True
+	))
+
+registerHCICommandConverter(0x201b,lambda packet:BLELongTermKeyRequestReply(connectionHandle = packet.handle,positive = False))
+
+def _convertConnectionComplete(layer):
+	def converter(packet,device):
+		# A failed connection is converted into a generic packet
+		if packet.status != 0x0:
+			return None
+		newHandle = packet[layer].handle
+		newAddress = str(packet[layer].paddr)
+		device._setCurrentHandle(newHandle,address=newAddress,mode="public" if packet.patype == 0 else "random")
+		io.info('Updating connection handle : '+str(newHandle))
+		return BLEConnectResponse(
+			srcAddr = packet.paddr,
+			dstAddr = '',
+			role = "master" if packet.role == 0 else "slave",
+			success = True,
+			type = "public" if packet.patype == 0 else "random",
+			interval = packet.interval
+			)
+	return converter
+
+registerHCIEventConverter(HCI_LE_META,_convertConnectionComplete(HCI_LE_Meta_Enhanced_Connection_Complete),subevent=HCI_ENHANCED_CONNECTION_COMPLETE)
+registerHCIEventConverter(HCI_LE_META,_convertConnectionComplete(HCI_LE_Meta_Connection_Complete),subevent=HCI_CONNECTION_COMPLETE)
+
+registerHCIEventConverter(HCI_LE_META,lambda packet,device:BLEAdvertisement(
+	addr = packet[HCI_LE_Meta_Advertising_Report].addr,
+	addrType = packet[HCI_LE_Meta_Advertising_Report].atype,
+	data = packet[HCI_LE_Meta_Advertising_Report].data,
+	type = "SCAN_RSP" if packet[HCI_LE_Meta_Advertising_Report].type == SCAN_RSP else "ADV_IND"
+	),subevent=HCI_ADVERTISING_REPORT)
+
+registerHCIEventConverter(HCI_LE_META,lambda packet,device:BLELongTermKeyRequest(
+	connectionHandle = packet.handle,
+	rand = packet.rand,
+	ediv = packet.ediv
+	),subevent=HCI_LONG_TERM_KEY_REQUEST)
+
+def _convertDisconnectionComplete(packet,device):
+	handle = packet.handle
+	device._removeConnectionHandle(handle)
+	return BLEDisconnect(connectionHandle=handle)
+
+registerHCIEventConverter(HCI_DISCONNECTION_COMPLETE,_convertDisconnectionComplete)
+
+def _convertTerminateIndication(packet,receiver,cryptoInstance):
+	BLELinkLayerCrypto.removeContext(packet.access_addr)
+	if packet.code == 0x24:
+		return BLEDisconnect()
+	return _buildControlPDU(packet)
+
+def _convertEncryptionRequest(packet,receiver,cryptoInstance):
+	# The CONNECT_REQ may have been missed (e.g. sniffing of an existing connection)
+	if cryptoInstance is None:
+		cryptoInstance = BLELinkLayerCrypto.createContext(packet.access_addr)
+	if cryptoInstance is not None:
+		cryptoInstance.setMasterValues(packet.skd,packet.iv)
+	return _buildControlPDU(packet)
+
+def _convertEncryptionResponse(packet,receiver,cryptoInstance):
+	if cryptoInstance is not None:
+		cryptoInstance.setSlaveValues(packet.skd,packet.iv)
+	return _buildControlPDU(packet)
+
+def _convertStartEncryptionRequest(packet,receiver,cryptoInstance):
+	if receiver is not None:
+		receiver.encrypted = True
+	if cryptoInstance is not None:
+		cryptoInstance.generateSessionKey()
+	return _buildControlPDU(packet)
+
+registerControlConverter(CONTROL_OPCODES["LL_TERMINATE_IND"],_convertTerminateIndication)
+registerControlConverter(CONTROL_OPCODES["LL_ENC_REQ"],_convertEncryptionRequest)
+registerControlConverter(CONTROL_OPCODES["LL_ENC_RSP"],_convertEncryptionResponse)
+registerControlConverter(CONTROL_OPCODES["LL_START_ENC_REQ"],_convertStartEncryptionRequest)
+
+# Transmitted packets
+
+registerPacketConverter(BLEErrorResponse,lambda packet:ATT_Hdr()/ATT_Error_Response(request=packet.request, handle=packet.handle,ecode=packet.ecode))
+registerPacketConverter(BLEExchangeMTURequest,lambda packet:ATT_Hdr()/ATT_Exchange_MTU_Request(mtu = packet.mtu))
+registerPacketConverter(BLEExchangeMTUResponse,lambda packet:ATT_Hdr()/ATT_Exchange_MTU_Response(mtu = packet.mtu))
+registerPacketConverter(BLEFindInformationRequest,lambda packet:ATT_Hdr()/ATT_Find_Information_Request(start=packet.startHandle,end = packet.endHandle))
+registerPacketConverter(BLEFindInformationResponse,lambda packet:ATT_Hdr()/ATT_Find_Information_Response(bytes([packet.format]) + packet.data))
+registerPacketConverter(BLEFindByTypeValueRequest,lambda packet:ATT_Hdr()/ATT_Find_By_Type_Value_Request(
+	start=packet.startHandle,
+	end=packet.endHandle,
+	uuid=packet.uuid,
+	data=packet.data))
+registerPacketConverter(BLEFindByTypeValueResponse,lambda packet:ATT_Hdr()/ATT_Find_By_Type_Value_Response(handles=packet.handles))
+registerPacketConverter(BLEReadByTypeRequest,lambda packet:ATT_Hdr()/ATT_Read_By_Type_Request(
+	start=packet.startHandle,
+	end=packet.endHandle,
+	uuid=packet.uuid))
+registerPacketConverter(BLEReadByTypeResponse,lambda packet:ATT_Hdr()/ATT_Read_By_Type_Response(packet.data))
+registerPacketConverter(BLEReadRequest,lambda packet:ATT_Hdr()/ATT_Read_Request(gatt_handle=packet.handle))
+registerPacketConverter(BLEReadResponse,lambda packet:ATT_Hdr()/ATT_Read_Response(value=packet.value))
+registerPacketConverter(BLEReadBlobRequest,lambda packet:ATT_Hdr()/ATT_Read_Blob_Request(gatt_handle=packet.handle,offset=packet.offset))
+registerPacketConverter(BLEReadBlobResponse,lambda packet:ATT_Hdr()/ATT_Read_Blob_Response(value=packet.value))
+registerPacketConverter(BLEReadByGroupTypeRequest,lambda packet:ATT_Hdr()/ATT_Read_By_Group_Type_Request(
+	start=packet.startHandle,
+	end=packet.endHandle,
+	uuid=packet.uuid))
+registerPacketConverter(BLEReadByGroupTypeResponse,lambda packet:ATT_Hdr()/ATT_Read_By_Group_Type_Response(data=packet.data,length=packet.length))
+registerPacketConverter(BLEWriteRequest,lambda packet:ATT_Hdr()/ATT_Write_Request(gatt_handle=packet.handle,data=packet.value))
+registerPacketConverter(BLEWriteResponse,lambda packet:ATT_Hdr()/ATT_Write_Response())
+registerPacketConverter(BLEWriteCommand,lambda packet:ATT_Hdr()/ATT_Write_Command(gatt_handle=packet.handle,data=packet.value))
+registerPacketConverter(BLEHandleValueNotification,lambda packet:ATT_Hdr()/ATT_Handle_Value_Notification(gatt_handle=packet.handle,value=packet.value))
+registerPacketConverter(BLEHandleValueIndication,lambda packet:ATT_Hdr()/ATT_Handle_Value_Indication(gatt_handle=packet.handle,value=packet.value))
+registerPacketConverter(BLEHandleValueConfirmation,lambda packet:ATT_Hdr()/ATT_Handle_Value_Confirmation())
+
+registerPacketConverter(BLEPairingRequest,lambda packet:SM_Hdr()/SM_Pairing_Request(
+	iocap=packet.inputOutputCapability,
+	oob=1 if packet.outOfBand else 0,
+	authentication=packet.authentication,
+	max_key_size = packet.maxKeySize,
+	initiator_key_distribution=packet.initiatorKeyDistribution,
+	responder_key_distribution = packet.responderKeyDistribution))
+registerPacketConverter(BLEPairingResponse,lambda packet:SM_Hdr()/SM_Pairing_Response(
+	iocap=packet.inputOutputCapability,
+	oob=1 if packet.outOfBand else 0,
+	authentication=packet.authentication,
+	max_key_size = packet.maxKeySize,
+	initiator_key_distribution=packet.initiatorKeyDistribution,
+	responder_key_distribution = packet.responderKeyDistribution))
+registerPacketConverter(BLEPairingConfirm,lambda packet:SM_Hdr()/SM_Confirm(confirm=packet.confirm))
+registerPacketConverter(BLEPairingRandom,lambda packet:SM_Hdr()/SM_Random(random=packet.random))
+registerPacketConverter(BLEPairingFailed,lambda packet:SM_Hdr()/SM_Failed(reason=packet.reason))
+registerPacketConverter(BLEEncryptionInformation,lambda packet:SM_Hdr()/SM_Encryption_Information(ltk=packet.ltk))
+registerPacketConverter(BLEMasterIdentification,lambda packet:SM_Hdr()/SM_Master_Identification(ediv=packet.ediv, rand=packet.rand))
+registerPacketConverter(BLEIdentityInformation,lambda packet:SM_Hdr()/SM_Identity_Information(irk=packet.irk))
+registerPacketConverter(BLEIdentityAddressInformation,lambda packet:SM_Hdr()/SM_Identity_Address_Information(
+	atype=0 if packet.type=="public" else 1,
+	address=packet.address))
+registerPacketConverter(BLESigningInformation,lambda packet:SM_Hdr()/SM_Signing_Information(csrk=packet.csrk))
+registerPacketConverter(BLESecurityRequest,lambda packet:SM_Hdr()/SM_Security_Request(authentication=packet.authentication))
+
+registerPacketConverter(BLEConnectionParameterUpdateRequest,lambda packet:L2CAP_CmdHdr(id=packet.l2capCmdId)/L2CAP_Connection_Parameter_Update_Request(
+	max_interval=packet.maxInterval,
+	min_interval=packet.minInterval,
+	slave_latency=packet.slaveLatency,
+	timeout_mult=packet.timeoutMult))
+registerPacketConverter(BLEConnectionParameterUpdateResponse,lambda packet:L2CAP_CmdHdr(id=packet.l2capCmdId)/L2CAP_Connection_Parameter_Update_Response(move_result=packet.moveResult))
@@ -1,41 +1,72 @@
 from Cryptodome.Cipher import AES
 from os import urandom
-from multiprocessing import Process, Manager,cpu_count
-import time,struct
+from multiprocessing import Pool,Array,Value,cpu_count
+from threading import Lock
+import time,struct,atexit
 from mirage.libs import io
 
+# Packing of the counter in the nonce used by the Link Layer encryption
+_counter = struct.Struct("i")
+
+# Shared objects of the cracking processes (see BLETemporaryKeyCracker)
+_crackerResults = None
+_crackerTestedKeys = None
+
+def _initCrackingProcess(results,testedKeys):
+	global _crackerResults,_crackerTestedKeys
+	_crackerResults = results
+	_crackerTestedKeys = testedKeys
+
+def _crackTemporaryKeyChunk(task):
+	'''
+	This function is executed by the cracking processes: it tests the PIN codes of the provided chunk for a given capture, and stops as soon as the PIN is found (by any process).
+	'''
+	index,pMin,pMax,a,p2,confirm = task
+	p2 = int.from_bytes(p2,'big')
+	pin = pMin
+	while pin < pMax and _crackerResults[index] < 0:
+		end = min(pin+1024,pMax)
+		for candidate in range(pin,end):
+			aes = AES.new(candidate.to_bytes(16,'big'),AES.MODE_ECB)
+			b = (int.from_bytes(aes.encrypt(a),'big') ^ p2).to_bytes(16,'big')
+			if aes.encrypt(b) == confirm:
+				_crackerResults[index] = candidate
+				end = candidate + 1
+				break
+		with _crackerTestedKeys.get_lock():
+			_crackerTestedKeys.value += end - pin
+		pin = end
+
 class BLECrypto:
 	'''
 	This class provides some cryptographic functions used by the Security Manager.
 
 	.. note::
 
-		The ``temporaryKeys`` class attribute is used in order to precalculate the possible temporary keys. It allows to avoid some time consuming calculations during the cracking process.
+		The possible temporary keys are generated on demand (see ``getTemporaryKey``) by the cracking processes, no key is allocated when this module is imported.
 
 	'''
 
-	temporaryKeys = [bytes.fromhex((32-len(hex(i)[2:]))*"0"+hex(i)[2:]) for i in range(1000000)]	
-
 	@classmethod
-	def _findKey(cls,L,pMin,pMax,r,pres,preq,iat,ia,rat,ra,confirm):
-		i = pMin
-		p1 = pres + preq + rat + iat
-		p2 = b"\x00\x00\x00\x00" + ia + ra
-		a = cls.xor128(p1,r)
-		
-		while i < pMax:
-			aes = AES.new(cls.temporaryKeys[i],AES.MODE_ECB)
-			res1 = aes.encrypt(a)
-			b = cls.xor128(res1,p2)
-			res2 = aes.encrypt(b)
-			if res2 == confirm:
-				L.append(i)
-				break
-			else:
-				i+=1
+	def getTemporaryKey(cls,pin):
+		'''
+		This class method returns the temporary key corresponding to the provided PIN code.
+
+		:param pin: PIN code (between 0 and 999999)
+		:type pin: int
+		:return: corresponding temporary key
+		:rtype: bytes
+
+		:Example:
+
+			>>> BLECrypto.getTemporaryKey(123456).hex()
+			'0000000000000000000000000001e240'
+
+		'''
+		return pin.to_bytes(16,'big')
 
 	@classmethod
-	def crackTemporaryKey(cls,r,preq,pres,iat,initiatorAddress,rat,responderAddress,confirm):
+	def crackTemporaryKey(cls,r,preq,pres,iat,initiatorAddress,rat,responderAddress,confirm,progress=None):
 		'''
 		This class method allows to crack a temporary key, according to multiple parameters extracted during the pairing process. It returns the corresponding PIN code.
 
@@ -55,7 +86,9 @@ class BLECrypto:
 		:type responderAddress: str
 		:param confirm: confirm value
 		:type confirm: bytes
-		:return: corresponding PIN code
+		:param progress: function called periodically with the number of tested keys, the total number of keys, the number of keys per second and the estimated remaining time (in seconds)
+		:type progress: function
+		:return: corresponding PIN code (or None if no PIN code matches)
 		:rtype: int
 
 		:Example:
@@ -73,39 +106,10 @@ class BLECrypto:
 
 		.. warning::
 
-			This method uses multi processes in order to optimize the time consumption of the required operation.
+			This method uses multi processes in order to optimize the time consumption of the required operation (see ``BLETemporaryKeyCracker``).
 
 		'''
-		iAddr = b''.join([bytes.fromhex(i) for i in initiatorAddress.split(":")])
-		rAddr = b''.join([bytes.fromhex(i) for i in responderAddress.split(":")])
-		with Manager() as manager:
-			L = manager.list()
-			processes = []
-			n = cpu_count()
-			step = int(1000000 / n)
-			for i in range(n):
-				p = Process(target=cls._findKey, args=(
-									L,
-									i*step,
-									(i+1)*step,
-									r,
-									pres,
-									preq,
-									iat,
-									iAddr,
-									rat,
-									rAddr,
-									confirm
-									)
-						)
-				p.start()
-				processes.append(p)
-
-			while list(L) == []:
-				time.sleep(0.01)
-			for p in processes:
-				p.terminate()
-			return L[0]
+		return BLETemporaryKeyCracker.getInstance().crack([(r,preq,pres,iat,initiatorAddress,rat,responderAddress,confirm)],progress)[0]
 
 	@classmethod
 	def generateRandom(cls,size=16):
@@ -280,6 +284,108 @@ class BLECrypto:
 
 
 
+class BLETemporaryKeyCracker:
+	'''
+	This class implements the engine used to crack the temporary keys of Bluetooth Low Energy Legacy Pairings.
+
+	It keeps a pool of processes alive between two cracking operations. The space of PIN codes is splitted in chunks distributed to the processes,
+	and every process stops exploring a capture as soon as its PIN code has been found by any process.
+	Multiple captures can be provided at once, their chunks are interleaved in order to crack them concurrently.
+	The results are stored in objects shared with the processes, so the concurrent calls of ``crack`` (e.g. from several threads) are serialized.
+
+	:Example:
+
+		>>> cracker = BLETemporaryKeyCracker.getInstance()
+		>>> cracker.crack([(random,pairingRequest,pairingResponse,initiatorAddressType,initiatorAddress,responderAddressType,responderAddress,confirm)])
+		[0]
+
+	'''
+	instance = None
+	instanceLock = Lock()
+	maxCaptures = 64
+	numberOfPins = 1000000
+
+	@classmethod
+	def getInstance(cls):
+		'''
+		This class method returns the shared instance of the cracking engine (the instance is created if needed).
+
+		:return: instance of this class
+		:rtype: BLETemporaryKeyCracker
+
+		'''
+		with cls.instanceLock:
+			if cls.instance is None:
+				cls.instance = cls()
+		return cls.instance
+
+	def __init__(self,processes=None,chunkSize=20000):
+		self.processes = processes if processes is not None else cpu_count()
+		self.chunkSize = chunkSize
+		self.pool = None
+		self.lock = Lock()
+		self.results = Array("i",BLETemporaryKeyCracker.maxCaptures,lock=False)
+		self.testedKeys = Value("q",0)
+
+	def _getPool(self):
+		if self.pool is None:
+			self.pool = Pool(self.processes,initializer=_initCrackingProcess,initargs=(self.results,self.testedKeys))
+			atexit.register(self.close)
+		return self.pool
+
+	def close(self):
+		'''
+		This method terminates the processes of the cracking engine.
+		'''
+		if self.pool is not None:
+			self.pool.terminate()
+			self.pool = None
+
+	def _generateTasks(self,captures):
+		tasks = []
+		for index,(r,preq,pres,iat,initiatorAddress,rat,responderAddress,confirm) in enumerate(captures):
+			iAddr = b''.join([bytes.fromhex(i) for i in initiatorAddress.split(":")])
+			rAddr = b''.join([bytes.fromhex(i) for i in responderAddress.split(":")])
+			a = BLECrypto.xor128(pres + preq + rat + iat,r)
+			p2 = b"\x00\x00\x00\x00" + iAddr + rAddr
+			tasks.append([(index,pMin,min(pMin+self.chunkSize,BLETemporaryKeyCracker.numberOfPins),a,p2,confirm) for pMin in range(0,BLETemporaryKeyCracker.numberOfPins,self.chunkSize)])
+		# The chunks of every capture are interleaved
+		return [task for chunks in zip(*tasks) for task in chunks]
+
+	def crack(self,captures,progress=None,progressInterval=0.5):
+		'''
+		This method cracks the temporary keys of the provided captures, and returns the corresponding PIN codes.
+		A capture is a tuple composed of (random value, pairing request's payload, pairing response's payload, initiator address type, initiator address, responder address type, responder address, confirm value), as described in ``BLECrypto.crackTemporaryKey``.
+
+		:param captures: list of captures to crack
+		:type captures: list of tuple
+		:param progress: function called periodically with the number of tested keys, the total number of keys, the number of keys per second and the estimated remaining time (in seconds)
+		:type progress: function
+		:param progressInterval: minimal interval between two calls of the progress function (in seconds)
+		:type progressInterval: float
+		:return: list of PIN codes (None if no PIN code matches the corresponding capture)
+		:rtype: list of int
+
+		'''
+		pins = []
+		with self.lock:
+			for i in range(0,len(captures),BLETemporaryKeyCracker.maxCaptures):
+				batch = captures[i:i+BLETemporaryKeyCracker.maxCaptures]
+				for index in range(len(batch)):
+					self.results[index] = -1
+				self.testedKeys.value = 0
+				total = BLETemporaryKeyCracker.numberOfPins * len(batch)
+				startTime = lastProgress = time.time()
+				for _ in self._getPool().imap_unordered(_crackTemporaryKeyChunk,self._generateTasks(batch)):
+					now = time.time()
+					if progress is not None and now - lastProgress >= progressInterval:
+						lastProgress = now
+						tested = self.testedKeys.value
+						keysPerSecond = tested / (now - startTime)
+						progress(tested,total,keysPerSecond,(total - tested) / keysPerSecond if keysPerSecond > 0 else None)
+				pins += [self.results[index] if self.results[index] >= 0 else None for index in range(len(batch))]
+		return pins
+
 class BLELinkLayerCrypto(object):
 	'''
 	This class provides an API allowing to manipulate the Link Layer Cryptographic functions used by Bluetooth Low Energy.
@@ -288,32 +394,119 @@ class BLELinkLayerCrypto(object):
 
 		This class is used by the receiver ``BLEReceiver`` (``mirage.libs.ble.BLEReceiver``) and should not be used directly by an user. 
 
+	An instance of this class (a cryptographic context) is associated to each encrypted connection, identified by its access address (or its connection handle).
+	The contexts are created using the Long Term Key provided for this connection, or the default Long Term Key, allowing to decrypt several connections concurrently.
+	A context using the default Long Term Key is only created for a connection which has been established (CONNECT_REQ) or which starts the encryption (LL_ENC_REQ),
+	and it is removed when the connection is terminated (LL_TERMINATE_IND). At most ``maxContexts`` contexts using the default Long Term Key are kept (the oldest one is removed first).
+
+	If the counters' values are lost (e.g. missed packets), the candidate counters of both directions following the expected values are tested in one batch (see ``tryToDecrypt``).
+
 	'''
 	instance = None
+	defaultLTK = None
+	contexts = {}
+	maxContexts = 64
 
 	@classmethod
-	def provideLTK(cls,ltk):
+	def provideLTK(cls,ltk,identifier=None):
 		'''
-		This class method initializes a singleton's instance of the current class.
-		It allows to provide a Long Term Key.
+		This class method allows to provide a Long Term Key.
+		If an identifier is provided, a new context is associated to the corresponding connection, otherwise the provided key becomes the default Long Term Key
+		and the contexts previously created using the default key are removed.
 
 		:param ltk: Long Term Key
 		:type ltk: bytes
+		:param identifier: access address or connection handle of the connection (None for the default Long Term Key)
+		:type identifier: int
+
+		:Example:
+
+			>>> BLELinkLayerCrypto.provideLTK(bytes.fromhex("112233445566778899aabbccddeeff00"))
+			>>> BLELinkLayerCrypto.provideLTK(bytes.fromhex("00112233445566778899aabbccddeeff"),identifier=0x50654a8c)
+
+		'''
+		if identifier is None:
+			cls.defaultLTK = ltk
+			cls.instance = cls(ltk=ltk)
+			cls.contexts = {key:context for key,context in cls.contexts.items() if not context.default}
+		else:
+			cls.contexts[identifier] = cls(ltk=ltk)
+
+	@classmethod
+	def getInstance(cls,identifier=None):
+		'''
+		This class method returns the context of the connection corresponding to the provided identifier.
+		If no identifier is provided, the context created when the default Long Term Key has been provided is returned.
+
+		:param identifier: access address or connection handle of the connection
+		:type identifier: int
+		:return: context of the connection (or None if no context is associated to this connection)
+		:rtype: BLELinkLayerCrypto
+
+		:Example:
+
+			>>> BLELinkLayerCrypto.getInstance(0x50654a8c).ready
+			False
+
 		'''
-		cls.instance = cls(ltk=ltk)
+		if identifier is None:
+			return cls.instance
+		return cls.contexts.get(identifier)
 
 	@classmethod
-	def getInstance(cls):
+	def createContext(cls,identifier):
 		'''
-		This class method returns the singleton's instance of the current class.
+		This class method returns the context of the connection corresponding to the provided identifier.
+		If no context is associated to this connection, a new context is created using the default Long Term Key (if it has been provided).
+		It is called when a connection is established (CONNECT_REQ) or when the encryption is started (LL_ENC_REQ).
 
-		:return: instance of this class
+		:param identifier: access address or connection handle of the connection
+		:type identifier: int
+		:return: context of the connection (or None if no Long Term Key is available)
 		:rtype: BLELinkLayerCrypto
 
+		:Example:
+
+			>>> BLELinkLayerCrypto.createContext(0x50654a8c).ready
+			False
+
 		'''
-		return cls.instance
+		context = cls.contexts.get(identifier)
+		if context is None and cls.defaultLTK is not None:
+			defaultContexts = [key for key,other in cls.contexts.items() if other.default]
+			for key in defaultContexts[:max(0,len(defaultContexts) - cls.maxContexts + 1)]:
+				del cls.contexts[key]
+			context = cls.contexts[identifier] = cls(ltk=cls.defaultLTK)
+			context.default = True
+		return context
+
+	@classmethod
+	def removeContext(cls,identifier):
+		'''
+		This class method removes the context of the connection corresponding to the provided identifier.
+		It is called when the connection is terminated (LL_TERMINATE_IND).
+
+		:param identifier: access address or connection handle of the connection
+		:type identifier: int
+
+		:Example:
+
+			>>> BLELinkLayerCrypto.removeContext(0x50654a8c)
 
-	def __init__(self,ltk):
+		'''
+		cls.contexts.pop(identifier,None)
+
+	@classmethod
+	def getContexts(cls):
+		'''
+		This class method returns the contexts associated to the connections.
+
+		:return: dictionary associating the identifier of each connection to its context
+		:rtype: dict
+		'''
+		return cls.contexts
+
+	def __init__(self,ltk,window=30):
 		self.ltk = ltk[::-1]
 		self.masterSkd = None
 		self.slaveSkd = None
@@ -325,6 +518,15 @@ class BLELinkLayerCrypto(object):
 		self.ready = False
 		self.masterCounter = 0
 		self.slaveCounter = 0
+		self.default = False
+		self.window = window
+		self.ecb = None
+		self.nonceSuffixes = None
+		self.decryptedPackets = 0
+		self.failedPackets = 0
+		self.recoveries = 0
+		self.maxGap = 0
+		self.testedCounters = 0
 
 	def displayDetails(self):
 		'''
@@ -395,6 +597,8 @@ class BLELinkLayerCrypto(object):
 		successIv = self.generateIv()
 		if successSkd and successIv:
 			self.sessionKey = BLECrypto.e(self.ltk,self.skd)
+			self.ecb = AES.new(self.sessionKey,AES.MODE_ECB)
+			self.nonceSuffixes = {True:b"\x00" + self.iv,False:b"\x80" + self.iv}
 			self.ready = True
 			self.masterCounter = self.slaveCounter = 0
 			io.success("Session key successfully generated !")
@@ -439,9 +643,40 @@ class BLELinkLayerCrypto(object):
 			mic = cipher.digest()
 			return payload[:2] + ciphertext + mic
 
+	def _decryptCandidates(self,payload,candidates):
+		# AES-CCM (L=2, M=4, one byte of additional data) computed for every candidate nonce at once:
+		# the blocks of the candidates are concatenated, so each step of CTR and CBC-MAC is a single ECB call.
+		count = len(candidates)
+		ciphertext = payload[2:-4]
+		length = len(ciphertext)
+		blocks = (length + 15) // 16
+		nonces = [_counter.pack(counter) + self.nonceSuffixes[masterToSlave] for counter,masterToSlave in candidates]
+		keystream = self.ecb.encrypt(b"".join(b"\x01" + nonce + i.to_bytes(2,'big') for i in range(blocks + 1) for nonce in nonces))
+		size = 16 * count
+		padded = ciphertext + bytes(16 * blocks - length)
+		mac = self.ecb.encrypt(b"".join(b"\x49" + nonce + length.to_bytes(2,'big') for nonce in nonces))
+		mac = self.ecb.encrypt((int.from_bytes(mac,'big') ^ int.from_bytes(bytes([0,1,payload[0] & 0xe3] + [0]*13) * count,'big')).to_bytes(size,'big'))
+		plaintexts = []
+		for i in range(blocks):
+			plain = int.from_bytes(padded[16*i:16*(i+1)] * count,'big') ^ int.from_bytes(keystream[size*(i+1):size*(i+2)],'big')
+			if i == blocks - 1 and length % 16 != 0:
+				plain &= int.from_bytes((b"\xff" * (length % 16) + bytes(16 - length % 16)) * count,'big')
+			plain = plain.to_bytes(size,'big')
+			plaintexts.append(plain)
+			mac = self.ecb.encrypt((int.from_bytes(mac,'big') ^ int.from_bytes(plain,'big')).to_bytes(size,'big'))
+		mic = payload[-4:]
+		self.testedCounters += count
+		for index in range(count):
+			position = 16 * index
+			if bytes(a ^ b for a,b in zip(mac[position:position+4],keystream[position:position+4])) == mic:
+				plaintext = b"".join(plain[position:position+16] for plain in plaintexts)[:length]
+				return (payload[:2] + plaintext,index)
+		return (None,None)
+
 	def tryToDecrypt(self,payload):
 		'''
 		This function tries to decrypt a payload. It tries to guess the direction (master to slave or slave to master) and the right counters' values.
+		The expected counters of both directions are tested first, then the ``window`` following counters of both directions are tested in one batch.
 
 		:param payload: payload to decrypt
 		:type payload: bytes
@@ -451,42 +686,52 @@ class BLELinkLayerCrypto(object):
 		.. note:: 
 			If the operation fails, the decrypted payload field of the tuple is replaced by None
 		'''
-		plain,masterToSlave = self.decrypt(payload,masterToSlave=True)
+		if not self.ready or len(payload) < 6:
+			self.failedPackets += 1
+			return (None,False)
+		candidates = [(self.masterCounter,True),(self.slaveCounter,False)]
+		plain,index = self._decryptCandidates(payload,candidates)
+		if index is None:
+			io.info("We have missed something, trying to recover counters' values ...")
+			candidates = []
+			for gap in range(1,self.window + 1):
+				candidates += [(self.masterCounter + gap,True),(self.slaveCounter + gap,False)]
+			plain,index = self._decryptCandidates(payload,candidates)
+			if index is None:
+				self.failedPackets += 1
+				return (None,False)
+			self.recoveries += 1
+			self.maxGap = max(self.maxGap,index // 2 + 1)
+			io.success(("Master" if candidates[index][1] else "Slave")+" counter recovered !")
+		counter,masterToSlave = candidates[index]
 		if masterToSlave:
-			self.incrementMasterCounter()	
-			return (plain,True)		
+			self.masterCounter = counter + 1
 		else:
-			plain,slaveToMaster = self.decrypt(payload,masterToSlave=False)
-			if slaveToMaster:
-				self.incrementSlaveCounter()
-				return (plain,True)
-		
-		if not masterToSlave and not slaveToMaster:
-			masterCounter = self.masterCounter
-			slaveCounter = self.slaveCounter
-			found = False
-			iteration = 0	
-			io.info("We have missed something, trying to recover counters' values ...")
-			while not found and iteration < 30:
-				iteration += 1
-				self.incrementMasterCounter()
-				plain,masterToSlave = self.decrypt(payload,masterToSlave=True)
-				if masterToSlave:
-					io.success("Master counter recovered !")
-					found = True
-					self.slaveCounter = slaveCounter
-					self.incrementMasterCounter()						
-				else:
-					self.incrementSlaveCounter()
-					plain,slaveToMaster = self.decrypt(payload,masterToSlave=False)
-					if slaveToMaster:
-						io.success("Slave counter recovered !")
-						found = True
-						self.masterCounter = masterCounter
-						self.incrementSlaveCounter()
-		
-			return (plain,True) if found else (None, False)			
-		
+			self.slaveCounter = counter + 1
+		self.decryptedPackets += 1
+		return (plain,True)
+
+	def getStatistics(self):
+		'''
+		This method returns the statistics of the context.
+
+		:return: dictionary indicating the number of decrypted packets, the number of packets that could not be decrypted, the number of counters' recoveries, the largest gap recovered and the number of tested counters
+		:rtype: dict
+
+		:Example:
+
+			>>> BLELinkLayerCrypto.getInstance(0x50654a8c).getStatistics()
+			{'decryptedPackets': 1520, 'failedPackets': 2, 'recoveries': 14, 'maxGap': 3, 'testedCounters': 4760}
+
+		'''
+		return {
+			"decryptedPackets":self.decryptedPackets,
+			"failedPackets":self.failedPackets,
+			"recoveries":self.recoveries,
+			"maxGap":self.maxGap,
+			"testedCounters":self.testedCounters
+		}
+
 	def decrypt(self,payload,masterToSlave=True):
 		'''
 		This method decrypts the provided payload, according to the direction provided.
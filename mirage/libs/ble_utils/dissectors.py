@@ -307,30 +307,20 @@ class AuthReqFlag(Dissector):
 		AuthReq Flag(0x5,bonding:yes|mitm:yes|secureConnections:no|keypress:no|ct2:no)
 
 	'''
-	def _bytes2bits(self,data):
-		return "".join(["{:08b}".format(i) for i in bytes(data)])
-
-	def _bits2bytes(self,bits):
-		return bytes([int(j+((8-len(j))*"0"),2) for j in [bits[i:i + 8] for i in range(0, len(bits), 8)]])
+	_flags = (("mitm",0x04),("secureConnections",0x08),("keypress",0x10),("ct2",0x20))
 
 	def dissect(self):
-		data = self._bytes2bits(self.data)
-		self.content = {"bonding":data[6:] == "01",
-				"mitm":data[5] == "1",
-				"secureConnections":data[4] == "1",
-				"keypress":data[3] == "1",
-				"ct2":data[2] == "1"
-				}
+		flag = self.data[0]
+		self.content = {"bonding":flag & 0x03 == 0x01}
+		for name,bit in self._flags:
+			self.content[name] = flag & bit != 0
 
 	def build(self):
-		bits = ""
-		bits += "00"
-		bits += "1" if "ct2" in self.content and self.content["ct2"] else "0"
-		bits += "1" if "keypress" in self.content and  self.content["keypress"] else "0"
-		bits += "1" if "secureConnections" in self.content and self.content["secureConnections"] else "0"
-		bits += "1" if "mitm" in self.content and self.content["mitm"] else "0"
-		bits += "01"if "bonding" in self.content and self.content["bonding"] else "00"
-		self.data = self._bits2bytes(bits)
+		flag = 0x01 if "bonding" in self.content and self.content["bonding"] else 0x00
+		for name,bit in self._flags:
+			if name in self.content and self.content[name]:
+				flag |= bit
+		self.data = bytes([flag])
 
 
 	def __contains__(self, key):
@@ -372,27 +362,18 @@ class KeyDistributionFlag(Dissector):
 
 
 	'''
-	def _bytes2bits(self,data):
-		return "".join(["{:08b}".format(i) for i in bytes(data)])
-
-	def _bits2bytes(self,bits):
-		return bytes([int(j+((8-len(j))*"0"),2) for j in [bits[i:i + 8] for i in range(0, len(bits), 8)]])
+	_flags = (("encKey",0x01),("idKey",0x02),("signKey",0x04),("linkKey",0x08))
 
 	def dissect(self):
-		data = self._bytes2bits(self.data)
-		self.content = {"encKey":data[7] == "1",
-				"idKey": data[6] == "1",
-				"signKey": data[5] == "1",
-				"linkKey":data[4] == "1"}
+		flag = self.data[0]
+		self.content = {name:flag & bit != 0 for name,bit in self._flags}
 
 	def build(self):
-		bits = ""
-		bits += "0000"
-		bits += "1" if "linkKey" in self.content and self.content["linkKey"] else "0"
-		bits += "1" if "signKey" in self.content and  self.content["signKey"] else "0"
-		bits += "1" if "idKey" in self.content and  self.content["idKey"] else "0"
-		bits += "1" if "encKey" in self.content and  self.content["encKey"] else "0"
-		self.data = self._bits2bytes(bits)
+		flag = 0x00
+		for name,bit in self._flags:
+			if name in self.content and self.content[name]:
+				flag |= bit
+		self.data = bytes([flag])
 
 
 	def __contains__(self, key):
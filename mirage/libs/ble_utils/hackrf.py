@@ -91,6 +91,7 @@ class BLEHackRFDevice(wireless.SDRDevice):
 		self.intervalMin = 200
 		self.intervalMax = 210
 		self.experimentalDemodulatorEnabled = False
+		self.blockDemodulatorEnabled = False
 		super().__init__(interface=interface)
 
 	def isUp(self):
@@ -143,6 +144,11 @@ class BLEHackRFDevice(wireless.SDRDevice):
 			return None
 
 	def _getDemodulator(self):
+		if self.blockDemodulatorEnabled:
+			return demodulators.BlockFSK2Demodulator(
+						preamble="01101011011111011001000101110001",
+						size=8*40,
+						samplesPerSymbol=2)
 		return (demodulators.FSK2Demodulator(
 						preamble="01101011011111011001000101110001",
 						size=8*40,
@@ -153,6 +159,16 @@ class BLEHackRFDevice(wireless.SDRDevice):
 						size=8*40,
 						samplesPerSymbol=2) )
 
+	def setBlockDemodulator(self,enable=True):
+		self.blockDemodulatorEnabled = enable
+		if self.receivePipeline is not None:
+			started = self.receivePipeline.isStarted()
+			if started:
+				self.receivePipeline.stop()
+			self.receivePipeline.updateDemodulator(self._getDemodulator())
+			if started:
+				self.receivePipeline.start()
+
 	def setExperimentalDemodulator(self,enable=True):
 		self.experimentalDemodulatorEnabled = enable
 		if enable and self.receivePipeline is not None:
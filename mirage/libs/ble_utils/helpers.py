@@ -65,6 +65,23 @@ def channelToFrequency(channel):
 def _swapBits(value):
 	return (value * 0x0202020202 & 0x010884422010) % 1023
 
+def _reverseBits(value,size):
+	return int("{:0{}b}".format(value,size)[::-1],2)
+
+def _generateCrc24Table():
+	# Reflected version of the BLE CRC polynomial (x^24 + x^10 + x^9 + x^6 + x^4 + x^3 + x + 1)
+	polynomial = _reverseBits(0x00065b,24)
+	table = []
+	for i in range(256):
+		crc = i
+		for _ in range(8):
+			crc = (crc >> 1) ^ polynomial if crc & 1 else crc >> 1
+		table.append(crc)
+	return table
+
+# The data bits are processed LSB first: the table is used with a reflected CRC register, which doesn't depend on the initialization value
+_CRC24_TABLE = _generateCrc24Table()
+
 def crc24(data, length, init=0x555555):
 	'''
 	This function calculates the 24 bits CRC corresponding to the data provided.
@@ -84,34 +101,30 @@ def crc24(data, length, init=0x555555):
 		>>> crc24(data=data,length=len(data)).hex()
 		'545d96'
 	'''
-	ret = [(init >> 16) & 0xff, (init >> 8) & 0xff, init & 0xff]
-
+	crc = _reverseBits(init & 0xFFFFFF,24)
+	table = _CRC24_TABLE
 	for d in data[:length]:
-		for v in range(8):
-			t = (ret[0] >> 7) & 1;
-
-			ret[0] <<= 1
-			if ret[1] & 0x80:
-				ret[0] |= 1
+		crc = (crc >> 8) ^ table[(crc ^ d) & 0xFF]
+	return crc.to_bytes(3,'little')
 
-			ret[1] <<= 1
-			if ret[2] & 0x80:
-				ret[1] |= 1
-
-			ret[2] <<= 1
-
-			if d & 1 != t:
-				ret[2] ^= 0x5b
-				ret[1] ^= 0x06
+def crc24_many(datas, init=0x555555):
+	'''
+	This function calculates the 24 bits CRC of multiple payloads sharing the same initialization value (e.g. candidate frames of a given connection).
 
-			d >>= 1
+	:param datas: list of payloads
+	:type datas: list of bytes
+	:param init: initialization value
+	:type init: int
+	:return: list of 24 bits crc values
+	:rtype: list of bytes
 
-	ret[0] = _swapBits((ret[0] & 0xFF))
-	ret[1] = _swapBits((ret[1] & 0xFF))
-	ret[2] = _swapBits((ret[2] & 0xFF))
+	:Example:
 
-	return bytes(ret)
+		>>> crc24_many([bytes.fromhex("0215110006000461ca0ce41b1e430559ac74e382667051"),b"\x01\x00"])
+		[b'T]\x96', b'\xa9\xe4\x8f']
 
+	'''
+	return [crc24(data,len(data),init) for data in datas]
 
 def isAccessAddressValid(aa):
 	'''
@@ -185,17 +198,7 @@ def rssiToDbm(rssi):
 		return 0
 
 
-def dewhiten(data,channel):
-	'''
-	This function allows to dewhiten a given raw data according to the channel value.
-
-	:param data: raw data to dewhiten
-	:type data: bytes
-	:param channel: channel number
-	:type channel: int
-	:return: dewhitened data
-	:rtype: bytes
-	'''
+def _generateWhiteningKeystream(channel,length):
 	def _swap_bits(b):
 		o = 0
 		i = 0
@@ -203,14 +206,56 @@ def dewhiten(data,channel):
 			o = o << 1
 			o |= 1 if (b & (1<<i)) else 0
 		return o
-	buffer = b""
+	keystream = b""
 	lfsr = _swap_bits(channel) | 2
-	for i in range(len(data)):
-		c = _swap_bits(data[i])
+	for i in range(length):
+		c = 0
 		for j in range(7,-1,-1):
 			if lfsr & 0x80:
 				lfsr ^= 0x11
 				c ^= (1<<j)
 			lfsr <<= 1
-		buffer+=bytes([_swap_bits(c)])
-	return buffer
+		keystream+=bytes([_swap_bits(c)])
+	return keystream
+
+# Whitening keystreams, generated once per channel (long enough for the largest BLE PDU and its CRC)
+_WHITENING_KEYSTREAMS = {}
+_WHITENING_KEYSTREAM_LENGTH = 2+255+3
+
+def _getWhiteningKeystream(channel,length):
+	keystream = _WHITENING_KEYSTREAMS.get(channel)
+	if keystream is None or len(keystream) < length:
+		keystream = _generateWhiteningKeystream(channel,max(length,_WHITENING_KEYSTREAM_LENGTH))
+		_WHITENING_KEYSTREAMS[channel] = keystream
+	return keystream
+
+def dewhiten(data,channel):
+	'''
+	This function allows to dewhiten a given raw data according to the channel value.
+
+	:param data: raw data to dewhiten
+	:type data: bytes
+	:param channel: channel number
+	:type channel: int
+	:return: dewhitened data
+	:rtype: bytes
+	'''
+	length = len(data)
+	if length == 0:
+		return b""
+	keystream = _getWhiteningKeystream(channel,length)
+	return (int.from_bytes(data,'big') ^ int.from_bytes(keystream[:length],'big')).to_bytes(length,'big')
+
+def dewhiten_many(datas,channel):
+	'''
+	This function allows to dewhiten multiple raw data received on the same channel.
+
+	:param datas: list of raw data to dewhiten
+	:type datas: list of bytes
+	:param channel: channel number
+	:type channel: int
+	:return: list of dewhitened data
+	:rtype: list of bytes
+	'''
+	keystream = _getWhiteningKeystream(channel,max([len(data) for data in datas]+[0]))
+	return [(int.from_bytes(data,'big') ^ int.from_bytes(keystream[:len(data)],'big')).to_bytes(len(data),'big') for data in datas]
@@ -5,6 +5,7 @@ from queue import Queue
 import time
 from mirage.libs.ble_utils.constants import *
 from mirage.libs.ble_utils.scapy_nrfsniffer_layers import *
+from mirage.libs.wireless_utils.serialTransport import SerialTransport,SLIPFramer
 from mirage.libs import io,utils,wireless
 
 class NRFSnifferDevice(wireless.Device):
@@ -54,6 +55,7 @@ class NRFSnifferDevice(wireless.Device):
 	sharedMethods = [
 			"getFirmwareVersion",
 			"getDeviceIndex",
+			"getTransportStatistics",
 			"setCRCChecking",
 
 			"setChannel", 
@@ -356,6 +358,7 @@ class NRFSnifferDevice(wireless.Device):
 
 	def close(self):
 		self.lock.acquire()
+		self.transport.stop()
 		self.nrfsniffer.close()
 		self.nrfsniffer = None
 		self.lock.release()
@@ -371,7 +374,14 @@ class NRFSnifferDevice(wireless.Device):
 			self._flush()
 			self.isListening = False
 			self.crcEnabled = True
-			self.receptionBuffer = b""
+			self.transport = SerialTransport(self.nrfsniffer,SLIPFramer(
+								start=SLIP_START,
+								end=SLIP_END,
+								escape=SLIP_ESC,
+								escapes={SLIP_ESC_START:SLIP_START,SLIP_ESC_END:SLIP_END,SLIP_ESC_ESC:SLIP_ESC},
+								validate=lambda frame:len(frame) >= 6 and len(frame) == frame[0] + frame[1]
+								))
+			self.transport.start()
 			self.commandResponses = Queue()
 			self.packetCounter = 1
 			self.synchronized = False
@@ -438,38 +448,32 @@ class NRFSnifferDevice(wireless.Device):
 		pkt.packet_counter = self.packetCounter
 		self.packetCounter += 1
 		encodedPkt = raw(pkt)
-		self.nrfsniffer.write(encodedPkt)
+		self.transport.send(encodedPkt)
 
-	def _recv(self):
-		self.lock.acquire()
-		if self.nrfsniffer is not None and self.nrfsniffer.in_waiting:	
-			self.receptionBuffer += self.nrfsniffer.read()
-		self.lock.release()
+	def _recv(self,timeout=0.1):
+		frame = self.transport.recv(timeout=timeout)
+		if frame is not None:
+			return NRFSniffer_Hdr(frame)
+		return None
 
-		if len(self.receptionBuffer) > 0:
-			try:
-				start = self.receptionBuffer.index(SLIP_START)
-				self.receptionBuffer = self.receptionBuffer[start:]
-
-			except ValueError:
-				self.receptionBuffer = b""
-
-			if len(self.receptionBuffer) >= 8 and self.receptionBuffer[-1] == SLIP_END:
-				sizeOfHeader = self.receptionBuffer[1]
-				sizeOfPayload = self.receptionBuffer[2]
-				if len(self.receptionBuffer[1:-1]) == sizeOfHeader + sizeOfPayload:
-					packetData = self.receptionBuffer[1:-1]
-					packetData = packetData.replace(bytes([SLIP_ESC,SLIP_ESC_ESC]),bytes([SLIP_ESC]))
-					packetData = packetData.replace(bytes([SLIP_ESC,SLIP_ESC_START]),bytes([SLIP_START]))
-					packetData = packetData.replace(bytes([SLIP_ESC,SLIP_ESC_END]),bytes([SLIP_END]))
-					packet = NRFSniffer_Hdr(packetData)
-					self.receptionBuffer = b""
-					return packet
-				else:
-					self.receptionBuffer = b""
-					return None
+	def getTransportStatistics(self):
+		'''
+		This method returns the statistics of the serial transport used to communicate with the NRFSniffer device.
 
-		return None
+		:return: dictionary indicating the throughput, the number of received, processed and dropped frames and the latencies (see ``mirage.libs.wireless_utils.serialTransport.SerialTransport.getStatistics``)
+		:rtype: dict
+
+		:Example:
+
+			>>> device.getTransportStatistics()["framesPerSecond"]
+			452.3
+
+		.. note::
+
+			This method is a **shared method** and can be called from the corresponding Emitters / Receivers.
+
+		'''
+		return self.transport.getStatistics()
 
 	def _setAccessAddress(self,accessAddress=None):
 		self.accessAddress = accessAddress
@@ -759,6 +763,4 @@ class NRFSnifferDevice(wireless.Device):
 				self.commandResponses.put(pkt)
 				return None
 
-		else:
-			utils.wait(seconds=0.0001)
 
@@ -63,7 +63,7 @@ class BLEPCAPDevice(wireless.PCAPDevice):
 	DLT = 256
 	SCAPY_LAYER = BTLE_RF
 
-	sharedMethods = [
+	sharedMethods = wireless.PCAPDevice.sharedMethods + [
 				"sniffNewConnections",
 				"sniffAdvertisements",
 				"getAccessAddress",
@@ -71,8 +71,7 @@ class BLEPCAPDevice(wireless.PCAPDevice):
 				"getChannelMap",
 				"getHopInterval",
 				"getHopIncrement",
-				"isSynchronized",
-				"getMode"
+				"isSynchronized"
 			]
 	def init(self):
 		self.capabilities = ["SNIFFING_ADVERTISEMENTS", "SNIFFING_NEW_CONNECTION"]
@@ -7,6 +7,7 @@ from base64 import b64encode, b64decode
 from binascii import Error as BAError
 from mirage.libs.ble_utils.constants import *
 from mirage.libs.ble_utils.scapy_sniffle_layers import *
+from mirage.libs.wireless_utils.serialTransport import SerialTransport,LineFramer
 from mirage.libs import io,utils,wireless
 
 class SniffleDevice(wireless.Device):
@@ -56,6 +57,7 @@ class SniffleDevice(wireless.Device):
 	sharedMethods = [
 			"getFirmwareVersion",
 			"getDeviceIndex",
+			"getTransportStatistics",
 			"setCRCChecking",
 
 			"setChannel",
@@ -164,9 +166,7 @@ class SniffleDevice(wireless.Device):
 		size = (len(bytes(cmd)) + 3) // 3
 		uartCommand = b64encode(bytes([size]) + bytes(cmd))
 
-		self.lock.acquire()
-		self.sniffle.write(uartCommand+b"\r\n")
-		self.lock.release()
+		self.transport.send(uartCommand+b"\r\n")
 
 
 	def _setPauseWhenDone(self, enabled=False):
@@ -174,7 +174,7 @@ class SniffleDevice(wireless.Device):
 		self._sendCommand(command)
 
 	def _initCommand(self):
-		self.sniffle.write(b'@@@@@@@@\r\n')
+		self.transport.send(b'@@@@@@@@\r\n')
 
 	def _setConfiguration(self,channel = 37, accessAddress = 0x8E89BED6, phyMode = "1M",  crcInit=0x555555):
 		self.channel = channel
@@ -598,6 +598,7 @@ class SniffleDevice(wireless.Device):
 
 	def close(self):
 		self.lock.acquire()
+		self.transport.stop()
 		self.sniffle.close()
 		self.sniffle = None
 		self.lock.release()
@@ -691,20 +692,33 @@ class SniffleDevice(wireless.Device):
 
 
 
-	def _recv(self):
-		self.lock.acquire()
-		if self.sniffle is not None:
-			try:
-				self.receptionBuffer = self.sniffle.readline()
-			except:
-				self.receptionBuffer = b""
-		self.lock.release()
-		if self.receptionBuffer[-1:] == b"\n":
+	def _recv(self,timeout=0.1):
+		frame = self.transport.recv(timeout=timeout)
+		if frame is not None:
 			try:
-				data = b64decode(self.receptionBuffer.rstrip())
-				return SniffleResponse(data)
+				return SniffleResponse(frame)
 			except:
 				return None
+		return None
+
+	def getTransportStatistics(self):
+		'''
+		This method returns the statistics of the serial transport used to communicate with the Sniffle device.
+
+		:return: dictionary indicating the throughput, the number of received, processed and dropped frames and the latencies (see ``mirage.libs.wireless_utils.serialTransport.SerialTransport.getStatistics``)
+		:rtype: dict
+
+		:Example:
+
+			>>> device.getTransportStatistics()["framesPerSecond"]
+			452.3
+
+		.. note::
+
+			This method is a **shared method** and can be called from the corresponding Emitters / Receivers.
+
+		'''
+		return self.transport.getStatistics()
 
 	def recv(self):
 		self._enterListening()
@@ -1035,9 +1049,10 @@ class SniffleDevice(wireless.Device):
 			self.capabilities = ["SNIFFING_ADVERTISEMENTS", "SNIFFING_NEW_CONNECTION","SCANNING","ADVERTISING","COMMUNICATING_AS_MASTER","INITIATING_CONNECTION"]
 			self.lastTarget = "FF:FF:FF:FF:FF:FF"
 			self.lock = Lock()
+			self.transport = SerialTransport(self.sniffle,LineFramer(decoder=b64decode))
+			self.transport.start()
 			self.isListening = False
 			self.crcEnabled = True
-			self.receptionBuffer = b""
 			self.packetCounter = 1
 			self.synchronized = False
 			self.scanMode = False
@@ -99,7 +99,25 @@ def _int2bin(s):
 class AssignedNumbers:
 	'''
 	This class provides some helpers to get some specific values used by the Bluetooth and Bluetooth Low Energy protocols.
+	The reverse indexes used by these helpers are built once, the first time one of them is called.
 	'''
+	_numbers = None
+	_names = None
+	_utis = None
+	_companies = None
+
+	@classmethod
+	def _buildIndexes(cls):
+		numbers,names,utis,companies = {},{},{},{}
+		for k,v in ASSIGNED_NUMBERS.items():
+			numbers.setdefault(int(k),v)
+			names.setdefault(v['name'],int(k))
+			utis.setdefault(v['uniform_type_identifier'],int(k))
+		for k,v in COMPANY_ID.items():
+			companies.setdefault(int(k),v)
+		cls._names,cls._utis,cls._companies = names,utis,companies
+		cls._numbers = numbers
+
 	@classmethod
 	def getStringsbyFlags(cls,flags):
 		'''
@@ -136,10 +154,9 @@ class AssignedNumbers:
 			'Seers Technology Co., Ltd.'
 
 		'''
-		for k,v in COMPANY_ID.items():
-			if int(k) == int(number):
-				return v
-		return None
+		if cls._numbers is None:
+			cls._buildIndexes()
+		return cls._companies.get(int(number))
 	@classmethod
 	def getNumberByName(cls,name):
 		'''
@@ -158,10 +175,9 @@ class AssignedNumbers:
 			6159
 
 		'''
-		for k,v in ASSIGNED_NUMBERS.items():
-			if v['name']==name:
-				return int(k)
-		return None
+		if cls._numbers is None:
+			cls._buildIndexes()
+		return cls._names.get(name)
 	@classmethod
 	def getUTIByName(cls,name):
 		'''
@@ -180,10 +196,10 @@ class AssignedNumbers:
 			'org.bluetooth.service.battery_service'
 
 		'''
-		for k,v in ASSIGNED_NUMBERS.items():
-			if v['name']==name:
-				return v['uniform_type_identifier']
-		return None
+		if cls._numbers is None:
+			cls._buildIndexes()
+		number = cls._names.get(name)
+		return cls._numbers[number]['uniform_type_identifier'] if number is not None else None
 	@classmethod
 	def getNameByNumber(cls,number):
 		'''
@@ -202,10 +218,10 @@ class AssignedNumbers:
 			'Battery Service'
 
 		'''
-		for k,v in ASSIGNED_NUMBERS.items():
-			if int(k)==number:
-				return v['name']
-		return None
+		if cls._numbers is None:
+			cls._buildIndexes()
+		entry = cls._numbers.get(number)
+		return entry['name'] if entry is not None else None
 	@classmethod
 	def getUTIByNumber(cls,number):
 		'''
@@ -224,10 +240,10 @@ class AssignedNumbers:
 			'org.bluetooth.service.battery_service'
 
 		'''
-		for k,v in ASSIGNED_NUMBERS.items():
-			if int(k)==number:
-				return v['uniform_type_identifier']
-		return None
+		if cls._numbers is None:
+			cls._buildIndexes()
+		entry = cls._numbers.get(number)
+		return entry['uniform_type_identifier'] if entry is not None else None
 	@classmethod
 	def getNumberByUTI(cls,uti):
 		'''
@@ -246,10 +262,9 @@ class AssignedNumbers:
 			6159
 
 		'''
-		for k,v in ASSIGNED_NUMBERS.items():
-			if v['uniform_type_identifier']==uti:
-				return int(k)
-		return None
+		if cls._numbers is None:
+			cls._buildIndexes()
+		return cls._utis.get(uti)
 	@classmethod
 	def getNameByUTI(cls,uti):
 		'''
@@ -268,10 +283,10 @@ class AssignedNumbers:
 			'Battery Service'
 
 		'''
-		for k,v in ASSIGNED_NUMBERS.items():
-			if v['uniform_type_identifier']==uti:
-				return v['name']
-		return None
+		if cls._numbers is None:
+			cls._buildIndexes()
+		number = cls._utis.get(uti)
+		return cls._numbers[number]['name'] if number is not None else None
 	@classmethod
 	def getPermissionsByNumber(cls,number):
 		'''
@@ -292,6 +307,8 @@ class AssignedNumbers:
 			['Write Without Response', 'Read']
 
 		'''
+		if 0 <= number < len(PERMISSIONS_BY_NUMBER):
+			return list(PERMISSIONS_BY_NUMBER[number])
 		permissions,flag = [],_int2bin(number)
 		for i in range(8):
 			if flag[i]=="1":
@@ -319,14 +336,10 @@ class AssignedNumbers:
 
 
 		'''
-		flag = list("00000000")
+		number = 0
 		for permission in permissions:
-			try:
-				index = PERMISSIONS.index(permission)
-				flag[index] = "1"
-			except:
-				continue
-		return int("".join(flag),2)
+			number |= PERMISSIONS_BITS.get(permission,0)
+		return number
 
 ADV_FLAGS = {
 	"limited_disc_mode":"LE Limited Discoverable Mode" ,
@@ -348,6 +361,12 @@ PERMISSIONS = [
 	    		"Broadcast"
     		]
 
+# Bit of each permission (the first permission of PERMISSIONS is the most significant bit)
+PERMISSIONS_BITS = {permission:1 << (7-index) for index,permission in reversed(list(enumerate(PERMISSIONS)))}
+
+# Decoded permissions of every ATT permissions number
+PERMISSIONS_BY_NUMBER = [tuple(PERMISSIONS[i] for i in range(8) if number & (1 << (7-i))) for number in range(256)]
+
 ASSIGNED_NUMBERS = {
     "6144": {
         "name": "Generic Access",
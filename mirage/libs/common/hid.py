@@ -1,11 +1,45 @@
 from mirage.libs import io
+from mirage.libs.mosart_utils.keyboard_codes import MosartKeyboardCodes
 
 class HIDMapping:
 	'''
 	This class provides some helpers functions to manipulate the HID protocol.
 	'''
+	indexes = {}
+
 	def __init__(self,locale="fr"):
 		self.locale = locale
+		self.keys,self.hidCodes = HIDMapping.getIndexes(locale)
+
+	@classmethod
+	def getIndexes(cls,locale="fr"):
+		'''
+		This class method returns the indexes of the provided locale, built once and shared by every instance.
+		The first index associates each key to its HID code and modifiers (the keys of the locale take precedence over the generic keys),
+		the second one associates each (HID code, modifiers) tuple to the corresponding key (the first matching key of the locale, then of the generic keys).
+
+		:param locale: string indicating the locale (language layout)
+		:type locale: str
+		:return: tuple composed of the key index and the HID code index
+		:rtype: tuple of dict
+
+		:Example:
+
+			>>> keys,hidCodes = HIDMapping.getIndexes("fr")
+			>>> keys["a"]
+			(20, 0)
+			>>> hidCodes[(20,0)]
+			'a'
+
+		'''
+		if locale not in cls.indexes:
+			keys,hidCodes = {},{}
+			for table in (mapping[locale],hid_map):
+				for key,(hid,mod) in table.items():
+					keys.setdefault(key,(hid,mod))
+					hidCodes.setdefault((hid,mod),key)
+			cls.indexes[locale] = (keys,hidCodes)
+		return cls.indexes[locale]
 
 	def getHIDCodeFromKey(self,key="",alt = False,ctrl=False,shift=False,gui=False):
 		'''
@@ -33,15 +67,15 @@ class HIDMapping:
 			(23, 5)
 
 		'''
-		if key in mapping[self.locale]:
-			hid,mod  = mapping[self.locale][key]
-		elif key in hid_map:
-			hid, mod = hid_map[key]
-		else:
-			hid,mod = 0, 0
-		modifiers = {"ALT":alt,"CTRL":ctrl,"SHIFT":shift,"GUI":gui}
-		for modifier,ok in modifiers.items():
-			mod += (hid_map[modifier][1] if ok else 0)
+		hid,mod = self.keys.get(key,(0,0))
+		if alt:
+			mod += ALT
+		if ctrl:
+			mod += CTRL
+		if shift:
+			mod += SHIFT
+		if gui:
+			mod += GUI
 		return (hid,mod)
 	
 	def getKeyFromHIDCode(self,hid=0,modifiers=0): # TODO: handle error cases
@@ -64,13 +98,115 @@ class HIDMapping:
 			't'
 
 		'''
-		for key,value in mapping[self.locale].items():
-			if value == [hid,modifiers]:
-				return key
-		for key,value in hid_map.items():
-			if value == [hid,modifiers]:
-				return key
-		return None
+		return self.hidCodes.get((hid,modifiers))
+
+class HIDCompiler:
+	'''
+	This class allows to compile a text or a DuckyScript script into a sequence of precomputed HID reports, according to the protocol in use.
+	Every keystroke is compiled once (the compiled keystrokes are cached), the injection modules can then convert the generated sequence into frames without computing the HID codes key by key.
+
+	The following protocols are supported :
+	  * **logitech** : Logitech Unifying unencrypted keystroke payload (7 bytes)
+	  * **mosart** : Mosart keystroke payload (action state and action code)
+	  * **hid_over_gatt** : HID over GATT keystroke report (8 bytes)
+
+	A compiled sequence is a list of steps :
+	  * ``("keystroke",pressed,released)`` : a keystroke, ``pressed`` and ``released`` being the lists of reports to transmit in order to press and release the key
+	  * ``("delay",duration)`` : a delay, ``duration`` being the duration provided by the text or the script
+
+	:param locale: string indicating the locale (language layout)
+	:type locale: str
+	:param protocol: string indicating the protocol ("logitech", "mosart" or "hid_over_gatt")
+	:type protocol: str
+
+	:Example:
+
+		>>> HIDCompiler(locale="fr",protocol="logitech").compileText("a")
+		[('keystroke', [b'\x00\x14\x00\x00\x00\x00\x00'], [b'\x00\x00\x00\x00\x00\x00\x00'])]
+		>>> HIDCompiler(locale="fr",protocol="mosart").compileKey("A")
+		('keystroke', [b'\x81\x81', b'\x81\x10'], [b'\x81\x10', b'\x81\x81'])
+		>>> HIDCompiler(locale="us",protocol="hid_over_gatt").compileScript(DuckyScriptParser(content="DELAY 100\nSTRING a"))
+		[('delay', 100), ('keystroke', [b'\x00\x00\x04\x00\x00\x00\x00\x00'], [b'\x00\x00\x00\x00\x00\x00\x00\x00'])]
+
+	'''
+	def __init__(self,locale="fr",protocol="logitech"):
+		if protocol not in ("logitech","mosart","hid_over_gatt"):
+			raise ValueError("unknown protocol "+str(protocol))
+		self.locale = locale
+		self.protocol = protocol
+		self.mapping = HIDMapping(locale=locale)
+		self.keystrokes = {}
+
+	def _buildReports(self,hid,modifiers):
+		if self.protocol == "logitech":
+			return [bytes([modifiers,hid,0,0,0,0,0])],[b"\x00"*7]
+		elif self.protocol == "hid_over_gatt":
+			return [bytes([0,modifiers,hid,0,0,0,0,0])],[b"\x00"*8]
+		else:
+			keyReport = self._buildMosartReport(hid,0)
+			modifiersReport = self._buildMosartReport(0,modifiers)
+			if modifiers == 0:
+				return [keyReport],[keyReport,modifiersReport]
+			return [modifiersReport,keyReport],[keyReport,modifiersReport]
+
+	def _buildMosartReport(self,hid,modifiers):
+		state = 0x01 if hid == 0 and modifiers == 0 else 0x81
+		code = MosartKeyboardCodes.getMosartKeyboardCodeFromHIDCode(hid,modifiers)
+		return bytes([state,code if code is not None else 0])
+
+	def compileKey(self,key="",ctrl=False,alt=False,gui=False,shift=False):
+		'''
+		This method compiles a single keystroke.
+		The character "\\n" is compiled as the "ENTER" key.
+
+		:param key: string indicating the key
+		:type key: str
+		:param ctrl: boolean indicating if the ctrl key is pressed
+		:type ctrl: bool
+		:param alt: boolean indicating if the alt key is pressed
+		:type alt: bool
+		:param gui: boolean indicating if the gui key is pressed
+		:type gui: bool
+		:param shift: boolean indicating if the shift key is pressed
+		:type shift: bool
+		:return: compiled keystroke
+		:rtype: tuple
+		'''
+		if key == "\n":
+			key = "ENTER"
+		identifier = (key,ctrl,alt,gui,shift)
+		if identifier not in self.keystrokes:
+			hid,modifiers = self.mapping.getHIDCodeFromKey(key=key,ctrl=ctrl,alt=alt,gui=gui,shift=shift)
+			pressed,released = self._buildReports(hid,modifiers)
+			self.keystrokes[identifier] = ("keystroke",pressed,released)
+		return self.keystrokes[identifier]
+
+	def compileText(self,string=""):
+		'''
+		This method compiles a text.
+
+		:param string: text to compile
+		:type string: str
+		:return: compiled sequence
+		:rtype: list of tuple
+		'''
+		return [self.compileKey(key=letter) for letter in string]
+
+	def compileScript(self,parser):
+		'''
+		This method compiles a DuckyScript script.
+
+		:param parser: parser of the script to compile
+		:type parser: ``mirage.libs.common.parsers.DuckyScriptParser``
+		:return: compiled sequence
+		:rtype: list of tuple
+		'''
+		return parser.generatePackets(
+			textFunction=lambda string: self.compileText(string=string),
+			keyFunction=lambda **keystroke: [self.compileKey(**keystroke)],
+			sleepFunction=lambda duration: [("delay",duration)],
+			initFunction=lambda: []
+		)
 
 hid_map = {
 	'':           [0, 0],
@@ -115,6 +251,8 @@ hid_map = {
 	'LEFT':       [80, 0]
 }
 
+CTRL,SHIFT,ALT,GUI = hid_map['CTRL'][1],hid_map['SHIFT'][1],hid_map['ALT'][1],hid_map['GUI'][1]
+
 
 mapping = {}
 
@@ -2,6 +2,7 @@ from mirage.libs.common.sdr.sources import SDRSource
 from mirage.libs.common.sdr.decoders import SDRDecoder
 from mirage.libs import utils,io
 import queue,threading,math
+import numpy
 
 '''
 This component implements multiple Software Defined Radio demodulators allowing to demodulate an IQ stream to recover packet's data.
@@ -58,7 +59,7 @@ class SDRDemodulator:
 		:param demodulatedData: demodulated data
 		:type demodulatedData: bytes
 		:param iqSamples: IQ samples linked to the demodulated data
-		:type iqSamples: list of complex
+		:type iqSamples: numpy array of complex64
 
 		'''
 		for d in self.decoders:
@@ -71,7 +72,7 @@ class SDRDemodulator:
 		This method returns the next demodulated and decoded element from the output queue.
 
 		:return: tuple of demodulated data and the correspond IQ samples
-		:rtype: (bytes, list of complex)
+		:rtype: (bytes, numpy array of complex64)
 
 		'''
 		if not self.output.empty():
@@ -131,34 +132,46 @@ class FSK2Demodulator(SDRDemodulator):
 		step = 0
 
 		if self.source.running:
-			while i >= len(self.source.iqStream) and self.running:
+			iqBuffer = self.source.iqBuffer
+			while i >= iqBuffer.available() and self.running:
 				utils.wait(seconds=0.001)
+			iqStream = iqBuffer.peek()
 			while self.running:
-
-				if  i < len(self.source.iqStream):
-					i0 = self.source.iqStream[i-1].real
-					q0 = self.source.iqStream[i-1].imag
-					i1 = self.source.iqStream[i].real
-					q1 = self.source.iqStream[i].imag
-
-					self.demodBuffer[step] += "1" if math.atan2(i0*q1 - q0*i1,i0*i1+q0*q1) > 0 else "0"
-					if len(self.demodBuffer[step]) >= len(self.preamble):
-						if self.preamble != self.demodBuffer[step][:len(self.preamble)]:
-							self.demodBuffer[step] = self.demodBuffer[step][1:]
-						else:
-							if len(self.demodBuffer[step]) == self.size:
-								demodulatedBlock = self.demodBuffer[step]
-								iqBlock = self.source.iqStream[(i-1)-((self.size-1)*self.numberOfBuffers)-self.samplesBefore:i+self.samplesAfter]
-								self.generateOutput(demodulatedBlock,iqBlock)
-								self.source.iqStream = self.source.iqStream[i+1:]
-								i = 1
-								self.count += 1
-								for j in range(self.numberOfBuffers):
-									self.demodBuffer[j] = ""
+				if i >= len(iqStream):
+					# Releases the samples which can't be part of the IQ block of the next packet
+					history = self.size*self.numberOfBuffers + self.samplesBefore
+					if i > history:
+						iqBuffer.commit(i - history)
+						i = history
+					iqStream = iqBuffer.peek()
+					if i >= len(iqStream):
+						utils.wait(seconds=0.0001)
+						continue
+
+				i0 = iqStream[i-1].real
+				q0 = iqStream[i-1].imag
+				i1 = iqStream[i].real
+				q1 = iqStream[i].imag
+
+				self.demodBuffer[step] += "1" if math.atan2(i0*q1 - q0*i1,i0*i1+q0*q1) > 0 else "0"
+				if len(self.demodBuffer[step]) >= len(self.preamble):
+					if self.preamble != self.demodBuffer[step][:len(self.preamble)]:
+						self.demodBuffer[step] = self.demodBuffer[step][1:]
+					else:
+						if len(self.demodBuffer[step]) == self.size:
+							demodulatedBlock = self.demodBuffer[step]
+							iqBlock = iqStream[max(0,(i-1)-((self.size-1)*self.numberOfBuffers)-self.samplesBefore):i+self.samplesAfter].copy()
+							self.generateOutput(demodulatedBlock,iqBlock)
+							iqBuffer.commit(i+1)
+							iqStream = iqBuffer.peek()
+							i = 1
+							self.count += 1
+							for j in range(self.numberOfBuffers):
+								self.demodBuffer[j] = ""
 
 
-						step = (step + 1) % self.numberOfBuffers
-						i += 1
+					step = (step + 1) % self.numberOfBuffers
+					i += 1
 
 		else:
 			self.running = False
@@ -195,76 +208,165 @@ class FasterFSK2Demodulator(SDRDemodulator):
 		demodulating = False
 		demodulatingCount = 0
 		if self.source.running:
-			while i >= len(self.source.iqStream) and self.running:
+			iqBuffer = self.source.iqBuffer
+			while i >= iqBuffer.available() and self.running:
 				utils.wait(seconds=0.00001)
+			iqStream = iqBuffer.peek()
 
 			while self.running:
-				if i < len(self.source.iqStream):
-
-					if not demodulating:
-							increment = (self.size*self.numberOfBuffers) // 2
-							if self.noiseThresold is None:
-								values = []
-								for j in range(increment,self.source.blockLength // 2,increment):
-									values += [self.source.iqStream[j].imag*self.source.iqStream[j].imag+self.source.iqStream[j].real*self.source.iqStream[j].real]
+				if i >= len(iqStream):
+					if not demodulating and i > self.samplesBefore:
+						# Releases the samples which have already been analyzed by the amplitude filter
+						iqBuffer.commit(i - self.samplesBefore)
+						i = self.samplesBefore
+					iqStream = iqBuffer.peek()
+					if i >= len(iqStream):
+						utils.wait(seconds=0.00001)
+						continue
+
+				if not demodulating:
+						increment = (self.size*self.numberOfBuffers) // 2
+						if self.noiseThresold is None:
+							values = []
+							for j in range(increment,min(self.source.blockLength // 2,len(iqStream)),increment):
+								values += [iqStream[j].imag*iqStream[j].imag+iqStream[j].real*iqStream[j].real]
+							if len(values) == 0:
+								utils.wait(seconds=0.00001)
+								iqStream = iqBuffer.peek()
+								continue
+							self.noiseThresold = sum(values)/len(values)
+							#io.info("<Experimental Demodulator> Noise thresold: "+str(self.noiseThresold))
 
-								self.noiseThresold = sum(values)/len(values)
-								#io.info("<Experimental Demodulator> Noise thresold: "+str(self.noiseThresold))
 
+						else:
+							amplitude = iqStream[i].real*iqStream[i].real+iqStream[i].imag*iqStream[i].imag
+							if len(self.noiseState) == 10:
+								if self.noiseState.count(False) > self.noiseState.count(True):
+									self.noiseLevel += 0.25
+									self.noiseState = []
+
+							if amplitude > self.noiseThresold*self.noiseLevel:
+								if i - increment > 1:
+									demodulatingCount = self.size * self.numberOfBuffers * 2
+									demodulating = True
+									i -= increment
+									iqBuffer.commit(max(0,i-self.samplesBefore))
+									iqStream = iqBuffer.peek()
+									i = min(i,self.samplesBefore)
+								else:
+									i += increment
 
 							else:
-								amplitude = self.source.iqStream[i].real*self.source.iqStream[i].real+self.source.iqStream[i].imag*self.source.iqStream[i].imag
-								if len(self.noiseState) == 10:
-									if self.noiseState.count(False) > self.noiseState.count(True):
-										self.noiseLevel += 0.25
-										self.noiseState = []
-
-								if amplitude > self.noiseThresold*self.noiseLevel:
-									if i - increment > 1:
-										demodulatingCount = self.size * self.numberOfBuffers * 2
-										demodulating = True
-										i -= increment
-										self.source.iqStream = self.source.iqStream[i-self.samplesBefore:] # test !!!
-										i = self.samplesBefore
-									else:
-										i += increment
+								i += increment
+				else:
 
-								else:
-									i += increment
-					else:
+					i0 = iqStream[i-1].real
+					q0 = iqStream[i-1].imag
+					i1 = iqStream[i].real
+					q1 = iqStream[i].imag
 
-						i0 = self.source.iqStream[i-1].real
-						q0 = self.source.iqStream[i-1].imag
-						i1 = self.source.iqStream[i].real
-						q1 = self.source.iqStream[i].imag
+					self.demodBuffer[step] += "1" if math.atan2(i0*q1 - q0*i1,i0*i1+q0*q1) > 0 else "0"# (i0*q1 - i1*q0)
 
-						self.demodBuffer[step] += "1" if math.atan2(i0*q1 - q0*i1,i0*i1+q0*q1) > 0 else "0"# (i0*q1 - i1*q0)
+					if len(self.demodBuffer[step]) >= len(self.preamble):
+						if self.preamble != self.demodBuffer[step][:len(self.preamble)]:
+							self.demodBuffer[step] = self.demodBuffer[step][1:]
+						else:
+							if len(self.demodBuffer[step]) == self.size:
+								demodulatedBlock = self.demodBuffer[step]
+								iqBlock = iqStream[max(0,(i-1)-((self.size-1)*self.numberOfBuffers)-self.samplesBefore):i+self.samplesAfter].copy()
+								self.generateOutput(demodulatedBlock,iqBlock)
+								iqBuffer.commit(i+1)
+								iqStream = iqBuffer.peek()
+								i = 1
+								self.count += 1
+								self.noiseState.append(True)
 
-						if len(self.demodBuffer[step]) >= len(self.preamble):
-							if self.preamble != self.demodBuffer[step][:len(self.preamble)]:
-								self.demodBuffer[step] = self.demodBuffer[step][1:]
-							else:
-								if len(self.demodBuffer[step]) == self.size:
-									demodulatedBlock = self.demodBuffer[step]
-									iqBlock = self.source.iqStream[(i-1)-((self.size-1)*self.numberOfBuffers)-self.samplesBefore:i+self.samplesAfter]
-									self.generateOutput(demodulatedBlock,iqBlock)
-									self.source.iqStream = self.source.iqStream[i+1:]
-									i = 1
-									self.count += 1
-									self.noiseState.append(True)
-
-									for j in range(self.numberOfBuffers):
-										self.demodBuffer[j] = ""
-									demodulating = False
-
-						step = (step + 1) % self.numberOfBuffers
-						i += 1
-						demodulatingCount -= 1
-						if demodulatingCount <= 0:
-							self.noiseState.append(False)
-							for j in range(self.numberOfBuffers):
-								self.demodBuffer[j] = ""
-							demodulating = False
+								for j in range(self.numberOfBuffers):
+									self.demodBuffer[j] = ""
+								demodulating = False
+
+					step = (step + 1) % self.numberOfBuffers
+					i += 1
+					demodulatingCount -= 1
+					if demodulatingCount <= 0:
+						self.noiseState.append(False)
+						for j in range(self.numberOfBuffers):
+							self.demodBuffer[j] = ""
+						demodulating = False
+			self.running = False
+		else:
+			self.running = False
+
+class BlockFSK2Demodulator(SDRDemodulator):
+	'''
+	This demodulator allows to demodulate a 2-Frequency Shift Keying (2-FSK) stream, by processing the IQ samples by blocks.
+	Every block of samples is demodulated at once using a quadrature discriminator, then the preamble is searched in every phase (if ``samplesPerSymbol > 1``) using a packed integer sliding match.
+	The preamble can't be longer than 64 bits.
+
+	It provides the same outputs as ``FSK2Demodulator``, but it is fast enough to keep up with a 2 Msps stream.
+	'''
+	def __init__(self,samplesPerSymbol=1,samplesBefore=60 , samplesAfter=60,size=8*40,preamble = "01101011011111011001000101110001",blockSize=2**16):
+		super().__init__()
+		self.samplesPerSymbol = samplesPerSymbol
+		self.samplesBefore = samplesBefore
+		self.samplesAfter = samplesAfter
+		self.size = size
+		self.preamble = preamble
+		self.blockSize = blockSize
+
+	def _searchPreamble(self,bits):
+		'''
+		This method returns the indexes of the bits array matching the preamble, in every phase.
+		The bits of each window are packed into an integer, allowing to compare it with the packed preamble.
+		'''
+		preambleLength = len(self.preamble)
+		positions = len(bits) - (preambleLength-1)*self.samplesPerSymbol
+		if positions <= 0:
+			return numpy.empty(0,dtype=numpy.int64),0
+		packedWindows = numpy.zeros(positions,dtype=numpy.uint64)
+		for j in range(preambleLength):
+			packedWindows <<= numpy.uint64(1)
+			packedWindows |= bits[j*self.samplesPerSymbol:j*self.samplesPerSymbol+positions]
+		return numpy.flatnonzero(packedWindows == numpy.uint64(int(self.preamble,2))),positions
+
+	def run(self):
+		if self.source.running:
+			iqBuffer = self.source.iqBuffer
+			# Number of samples between the first bit of a frame and the end of its IQ block
+			frameLength = (self.size-1)*self.samplesPerSymbol + 2 + self.samplesAfter
+			blockSize = max(self.blockSize,2*(frameLength+self.samplesBefore))
+			start = 0
+			while self.running:
+				iqStream = iqBuffer.peek(count=start+blockSize)
+				if len(iqStream) - start < frameLength:
+					utils.wait(seconds=0.0001)
+					continue
+
+				block = iqStream[start:]
+				bits = (numpy.angle(block[1:]*numpy.conj(block[:-1])) > 0).astype(numpy.uint64)
+				candidates,positions = self._searchPreamble(bits)
+
+				nextStart = start + positions
+				lastBit = -1
+				for candidate in candidates:
+					if candidate <= lastBit:
+						continue
+					if candidate + frameLength > len(block):
+						nextStart = start + candidate
+						break
+					lastBit = candidate + (self.size-1)*self.samplesPerSymbol
+					frameBits = bits[candidate:lastBit+1:self.samplesPerSymbol].astype(numpy.uint8)
+					demodulatedBlock = (frameBits + ord("0")).tobytes().decode("ascii")
+					firstSample = max(0,start + candidate - self.samplesBefore)
+					iqBlock = iqStream[firstSample:start+lastBit+1+self.samplesAfter].copy()
+					self.generateOutput(demodulatedBlock,iqBlock)
+					self.count += 1
+					nextStart = max(nextStart,start + lastBit + 1)
+
+				# Keeps the samples needed to build the IQ block of the next frame
+				released = max(0,nextStart - self.samplesBefore)
+				iqBuffer.commit(released)
+				start = nextStart - released
 			self.running = False
 		else:
 			self.running = False
@@ -1,6 +1,6 @@
 from mirage.libs.common.sdr.sinks import SDRSink
 from mirage.libs.common.sdr.encoders import SDREncoder
-import math,queue,threading
+import math,queue,threading,time
 import numpy as np
 
 
@@ -11,14 +11,16 @@ This component implements multiple Software Defined Radio modulators allowing to
 
 class SDRModulator:
 	'''
-	This class implements a Sofware Defined Radio modulator: every specific modulator has to inherit from this class and implement the ``run`` method.
+	This class implements a Sofware Defined Radio modulator: every specific modulator has to inherit from this class and implement the ``modulate`` method.
 	When the modulator is started, it processes the packets transmitted using setInput, performs the operations needed to modulate the data and transmits the IQ stream to the associated ``SDRSink``.
+	The time spent to modulate each frame is measured and can be retrieved using ``getModulationTime``.
 	'''
 	def __init__(self):
 		self.sink = None
 		self.count = 0
 		self.encoders = []
 		self.running = False
+		self.modulationTime = None
 		self.input = queue.Queue()
 
 	def setSink(self,sink):
@@ -76,6 +78,34 @@ class SDRModulator:
 		'''
 		self.input.put(self.generateInput(data))
 
+	def getModulationTime(self):
+		'''
+		This method returns the time spent to modulate the last transmitted frame.
+
+		:return: modulation time of the last frame (in seconds), or None if no frame has been transmitted
+		:rtype: float
+
+		:Example:
+
+			>>> modulator.getModulationTime()
+			0.000183
+
+		'''
+		return self.modulationTime
+
+	def modulate(self,data):
+		'''
+		This method modulates a binary string and returns the corresponding IQ samples.
+		Every specific modulator has to implement this method.
+
+		:param data: binary string to modulate
+		:type data: str
+		:return: IQ samples
+		:rtype: numpy array of complex64
+
+		'''
+		return np.zeros(0,dtype=np.complex64)
+
 	def start(self):
 		'''
 		This method starts the modulator.
@@ -104,7 +134,16 @@ class SDRModulator:
 		self.running = False
 
 	def run(self):
-		pass
+		if self.sink.running:
+			while self.running:
+				if not self.input.empty():
+					data = self.input.get()
+					startTime = time.perf_counter()
+					iqSamples = self.modulate(data)
+					self.modulationTime = time.perf_counter() - startTime
+					self.sink.transmit(iqSamples)
+		else:
+			self.running = False
 
 class OQPSKModulator(SDRModulator):
 	'''
@@ -176,39 +215,33 @@ class OQPSKModulator(SDRModulator):
 		:param pulseType: pulse type ("square" or "sinus")
 		:type pulseType: str
 		:return: pulse
-		:rtype: list of int
+		:rtype: numpy array of float32
 
 		'''
-		table=[]
 		if pulseType == "sinus":
-			for i in range(samplesPerSymbol):
-				table.append(math.sin((i*math.pi)/samplesPerSymbol))
+			return np.sin(np.arange(samplesPerSymbol)*math.pi/samplesPerSymbol).astype(np.float32)
 		else:
-			table = [1.0 for i in range(samplesPerSymbol)]
-		return table
+			return np.ones(samplesPerSymbol,dtype=np.float32)
 
-	def run(self):
-		if self.sink.running:
-			while self.running:
-				if not self.input.empty():
-					data = self.input.get()
-					iChannel = []
-					qChannel = [0.0 for i in range(self.samplesPerSymbol//2)]
-					for i in range(len(data)):
-						if i%2 == 0:
-							iChannel += [(t if data[i] == "1" else -t) for t in self.pulse]
-						else:
-							qChannel += [(t if data[i] == "1" else -t) for t in self.pulse]
-					iChannel += [0.0] + [0.0 for i in range(len(qChannel)-len(iChannel))]
-					qChannel += [0.0]
-
-					iqSamples = []
-					for i in range(len(iChannel)):
-						iqSamples.append(iChannel[i]+1j*qChannel[i])
+	def modulate(self,data):
+		'''
+		This method modulates a binary string using the Offset-Quadrature Phase Shift Keying modulation.
+		The even bits are transmitted on the I channel, the odd bits are transmitted on the Q channel with an offset of half a symbol.
 
-					self.sink.transmit(iqSamples)
-		else:
-			self.running = False
+		:param data: binary string to modulate
+		:type data: str
+		:return: IQ samples
+		:rtype: numpy array of complex64
+
+		'''
+		symbols = 2*(np.frombuffer(data.encode("ascii"),dtype=np.uint8) == ord("1")).astype(np.float32) - 1
+		iChannel = (symbols[0::2,None] * self.pulse).ravel()
+		qChannel = (symbols[1::2,None] * self.pulse).ravel()
+		offset = self.samplesPerSymbol//2
+		iqSamples = np.zeros(max(len(iChannel),offset+len(qChannel))+1,dtype=np.complex64)
+		iqSamples.real[:len(iChannel)] = iChannel
+		iqSamples.imag[offset:offset+len(qChannel)] = qChannel
+		return iqSamples
 
 class GFSKModulator(SDRModulator):
 	'''
@@ -306,31 +339,29 @@ class GFSKModulator(SDRModulator):
 		This method generates the gaussian filter according to the provided parameters.
 		'''
 
-		self.pulse = self._generateGaussian(1.0,self.samplesPerSymbol, self.bt, self.samplesPerSymbol)
+		self.pulse = np.array(self._generateGaussian(1.0,self.samplesPerSymbol, self.bt, self.samplesPerSymbol),dtype=np.float32)
 
 
 
-	def run(self):
-		if self.sink.running:
-			while self.running:
-				if not self.input.empty():
-					data = self.input.get()
-					inp = []
-					# Generating NRZ signal
-					for bit in data:
-						inp += [1.0 if bit=="1" else -1.0 for i in range(self.samplesPerSymbol)]
-
-					# Applying gaussian filter
-					outputGaussianFilter = np.convolve(inp, self.pulse)
-
-					# Generating IQ samples
-					output = []
-					tmp = 0
-					output.append(math.cos(tmp)+1j*math.sin(tmp))
-					for i in range(1,len(outputGaussianFilter)):
-						tmp = tmp+math.pi*self.modulationIndex*outputGaussianFilter[i-1]/float(self.samplesPerSymbol)
-						output.append(math.cos(tmp)+1j*math.sin(tmp))
-					print("Transmitting IQ")
-					self.sink.transmit(output)
-		else:
-			self.running = False
+	def modulate(self,data):
+		'''
+		This method modulates a binary string using the Gaussian Frequency Shift Keying modulation.
+
+		:param data: binary string to modulate
+		:type data: str
+		:return: IQ samples
+		:rtype: numpy array of complex64
+
+		'''
+		# Generating NRZ signal
+		bits = np.frombuffer(data.encode("ascii"),dtype=np.uint8) == ord("1")
+		nrz = np.repeat(2*bits.astype(np.float32) - 1, self.samplesPerSymbol)
+
+		# Applying gaussian filter
+		outputGaussianFilter = np.convolve(nrz, self.pulse)
+
+		# Generating IQ samples
+		phase = np.empty(len(outputGaussianFilter),dtype=np.float64)
+		phase[0] = 0.0
+		np.cumsum(outputGaussianFilter[:-1]*(math.pi*self.modulationIndex/float(self.samplesPerSymbol)),out=phase[1:])
+		return np.exp(1j*phase).astype(np.complex64)
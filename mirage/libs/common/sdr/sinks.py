@@ -2,7 +2,7 @@ from ctypes import *
 from mirage.libs.common.sdr.hackrf_definitions import *
 from mirage.libs.common.sdr.hardware import *
 from mirage.libs.common.sdr.pipeline import SDRPipeline
-import queue,struct,threading,numpy
+import queue,threading,numpy
 
 '''
 This component implements the supported Software Defined Radio Sinks (e.g. TX).
@@ -22,8 +22,10 @@ class SDRSink:
 		  * ``isStreaming()`` : this method returns a boolean indicating if streaming is enabled
 		  * ``close()`` : this method closes the sink
 
+	The frames to transmit are converted once (see ``prepareFrame``) and stored in a bounded queue: if the queue is full, the frame is dropped and the ``droppedFrames`` counter is incremented.
+
 	'''
-	def __init__(self,interface):
+	def __init__(self,interface,queueSize=64):
 		self.interface = interface
 		self.running = False
 		self.frequency = None
@@ -31,7 +33,9 @@ class SDRSink:
 		self.txGain = None
 		self.blockLength = None
 		self.sampleRate = None
-		self.transmitQueue = queue.Queue()
+		self.droppedFrames = 0
+		self.idleTransfers = 0
+		self.transmitQueue = queue.Queue(maxsize=queueSize)
 
 	def setBandwidth(self,bandwidth):
 		self.bandwidth = bandwidth
@@ -55,13 +59,54 @@ class SDRSink:
 		self.running = False
 
 	def nextData(self):
-		if self.transmitQueue.empty():
-			return []
-		else:
-			return self.transmitQueue.get()
+		try:
+			return self.transmitQueue.get_nowait()
+		except queue.Empty:
+			return None
+
+	def prepareFrame(self,iqSamples):
+		'''
+		This method converts the IQ samples of a frame into the format expected by the Software Defined Radio.
+		It is called once per frame by ``transmit``, the default implementation returns the samples unmodified.
+
+		:param iqSamples: IQ samples to convert
+		:type iqSamples: numpy array of complex64
+		:return: converted frame
+
+		'''
+		return iqSamples
 
 	def transmit(self,iqSamples):
-		self.transmitQueue.put(iqSamples)
+		'''
+		This method adds a frame to the transmit queue.
+
+		:param iqSamples: IQ samples to transmit
+		:type iqSamples: numpy array of complex64
+		:return: boolean indicating if the frame has been queued (False if the queue is full)
+		:rtype: bool
+
+		'''
+		try:
+			self.transmitQueue.put_nowait(self.prepareFrame(iqSamples))
+			return True
+		except queue.Full:
+			self.droppedFrames += 1
+			return False
+
+	def getStatistics(self):
+		'''
+		This method returns the statistics of the transmit queue.
+
+		:return: dictionary indicating the number of queued frames, dropped frames and idle transfers (transfers filled with zeros because no frame was available)
+		:rtype: dict
+
+		:Example:
+
+			>>> sink.getStatistics()
+			{'queued': 0, 'dropped': 0, 'idleTransfers': 1542}
+
+		'''
+		return {"queued":self.transmitQueue.qsize(),"dropped":self.droppedFrames,"idleTransfers":self.idleTransfers}
 
 	def close(self):
 		if self.running:
@@ -84,12 +129,13 @@ class HackRFSink(HackRFSDR,SDRSink):
 		if HackRFSink.numberOfSinks == 0 and HackRFSink.initialized:
 			HackRFSDR.closeAPI()
 
-	def __init__(self,interface):
+	def __init__(self,interface,queueSize=64):
 		self.alreadyStarted = False
 		HackRFSDR.__init__(self,interface=interface)
-		SDRSink.__init__(self,interface=interface)
+		SDRSink.__init__(self,interface=interface,queueSize=queueSize)
 		self.tLock = threading.Lock()
-		self.currentData = []
+		self.currentData = None
+		self.currentOffset = 0
 		if self.ready:
 			HackRFSink.numberOfSinks+=1
 
@@ -124,39 +170,46 @@ class HackRFSink(HackRFSDR,SDRSink):
 		return self.txGain
 
 
+	def prepareFrame(self,iqSamples):
+		'''
+		This method converts the IQ samples of a frame into interleaved signed 8 bits values, as expected by the HackRF.
+
+		:param iqSamples: IQ samples to convert
+		:type iqSamples: numpy array of complex64
+		:return: interleaved I and Q values
+		:rtype: numpy array of int8
+
+		'''
+		values = numpy.asarray(iqSamples,dtype=numpy.complex64).view(numpy.float32) * 127
+		return numpy.clip(values,-128,127).astype(numpy.int8)
+
 	def _transmitCallback(self,hackrf_transfer):
 		'''
 		This method implements the transmission callback used by the sink to transmit IQ to the HackRF.
 		It is not intended to be used directly, see ``startStreaming`` and ``stopStreaming`` methods to start and stop the streaming process.
+
+		The frames are prepared by ``transmit``, this callback only copies the next slice of the current frame in the transfer buffer.
+		A transfer never contains data from two different frames: the tail of the last transfer of a frame is filled with zeros.
+		If no frame is available, the transfer is filled with zeros and the ``idleTransfers`` counter is incremented (the HackRF keeps requesting transfers while no frame is transmitted).
 		'''
-		# PROBLEM : MULTIPLE PACKETS ARE TRANSMITTED SOMETIMES ...
 		length = hackrf_transfer.contents.valid_length
 		self.blockLength = length // 2
-		array_type = (c_byte*length)
-		values = (array_type)()
-		if len(self.currentData) == 0:
+		buffer = cast(hackrf_transfer.contents.buffer, c_void_p).value
+		if self.currentData is None:
 			self.currentData = self.nextData()
-		if len(self.currentData) == 0:
-			for i in range(length):
-				values[i] = 0
-		elif len(self.currentData) <= self.blockLength:
-			start = self.blockLength - len(self.currentData)
-			for i in range(2*start):
-				values[i] = 0
-			for i in range(len(self.currentData)):
-				values[2*start+2*i] = struct.pack('b',int(self.currentData[i].real*127))[0]
-				values[2*start+2*i+1] = struct.pack('b',int(self.currentData[i].imag*127))[0]
-			for i in range(2*start+2*len(self.currentData),len(values)):
-				values[i] = 0
-			self.currentData = []
-		else:
-			data = self.currentData[:self.blockLength]
-			self.currentData = self.currentData[self.blockLength+1:]
-			for i in range(len(data)):
-				values[2*i] = struct.pack('b',int(data[i].real*127))[0]
-				values[2*i+1] = struct.pack('b',int(data[i].imag*127))[0]
+			self.currentOffset = 0
 		self.tLock.acquire()
-		memmove(hackrf_transfer.contents.buffer, byref(values), length)
+		if self.currentData is None:
+			self.idleTransfers += 1
+			memset(buffer, 0, length)
+		else:
+			size = min(length, len(self.currentData) - self.currentOffset)
+			memmove(buffer, self.currentData.ctypes.data + self.currentOffset, size)
+			if size < length:
+				memset(buffer + size, 0, length - size)
+			self.currentOffset += size
+			if self.currentOffset >= len(self.currentData):
+				self.currentData = None
 		self.tLock.release()
 		return 0
 
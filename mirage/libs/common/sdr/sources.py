@@ -10,6 +10,111 @@ import os,threading,numpy
 This component implements the supported Software Defined Radio Sources (e.g. RX).
 '''
 
+class IQRingBuffer:
+	'''
+	This class implements a preallocated ring buffer of complex64 IQ samples, shared between a ``SDRSource`` (producer) and a ``SDRDemodulator`` (consumer).
+
+	The samples are stored twice (in a buffer of size ``2*capacity``), allowing to expose any window of unread samples as a contiguous numpy view without copying it.
+	The producer appends samples using ``write``, the consumer reads them using ``peek`` and releases them using ``commit``.
+	If the consumer is too slow, the samples that don't fit in the buffer are dropped and the overflow counters are incremented.
+
+	:Example:
+
+		>>> ring = IQRingBuffer(capacity=4)
+		>>> ring.write(numpy.array([1+1j,2+2j,3+3j],dtype=numpy.complex64))
+		3
+		>>> ring.peek()
+		array([1.+1.j, 2.+2.j, 3.+3.j], dtype=complex64)
+		>>> ring.commit(2)
+		>>> ring.available()
+		1
+
+	'''
+	def __init__(self,capacity=2**20):
+		self.capacity = capacity
+		self.buffer = numpy.zeros(2*capacity,dtype=numpy.complex64)
+		self.clear()
+
+	def clear(self):
+		'''
+		This method resets the cursors and the overflow counters of the ring buffer.
+		'''
+		self.readCursor = 0
+		self.writeCursor = 0
+		self.overflows = 0
+		self.droppedSamples = 0
+
+	def available(self):
+		'''
+		This method returns the number of samples written by the producer and not yet committed by the consumer.
+
+		:return: number of unread samples
+		:rtype: int
+
+		'''
+		return self.writeCursor - self.readCursor
+
+	def write(self,samples):
+		'''
+		This method appends some samples to the ring buffer.
+		If the buffer is full, the samples that don't fit are dropped and the overflow counters are updated.
+
+		:param samples: samples to append
+		:type samples: numpy array of complex64
+		:return: number of samples written
+		:rtype: int
+
+		'''
+		free = self.capacity - (self.writeCursor - self.readCursor)
+		count = len(samples)
+		if count > free:
+			self.overflows += 1
+			self.droppedSamples += count - free
+			count = free
+		if count > 0:
+			start = self.writeCursor % self.capacity
+			first = min(count, self.capacity - start)
+			self.buffer[start:start+first] = samples[:first]
+			self.buffer[start+self.capacity:start+self.capacity+first] = samples[:first]
+			if first < count:
+				self.buffer[:count-first] = samples[first:count]
+				self.buffer[self.capacity:self.capacity+count-first] = samples[first:count]
+			self.writeCursor += count
+		return count
+
+	def peek(self,count=None,offset=0):
+		'''
+		This method returns a contiguous view of the unread samples, without consuming them.
+
+		:param count: maximal number of samples to return (every unread sample if not provided)
+		:type count: int
+		:param offset: number of unread samples to skip
+		:type offset: int
+		:return: view of the unread samples
+		:rtype: numpy array of complex64
+
+		.. warning::
+
+			The returned array is a view of the ring buffer: it remains valid until the corresponding samples are committed.
+
+		'''
+		available = self.available() - offset
+		if count is None or count > available:
+			count = max(0,available)
+		start = (self.readCursor + offset) % self.capacity
+		return self.buffer[start:start+count]
+
+	def commit(self,count):
+		'''
+		This method releases the provided number of samples, allowing the producer to overwrite them.
+
+		:param count: number of samples to release
+		:type count: int
+
+		'''
+		self.readCursor += max(0,min(count,self.available()))
+
+
 class SDRSource:
 	'''
 	This class defines a standard Software Defined Radio source.
@@ -22,9 +127,11 @@ class SDRSource:
 		  * ``isStreaming()`` : this method returns a boolean indicating if streaming is enabled
 		  * ``close()`` : this method closes the sink
 
+	The received IQ samples are stored in a ``IQRingBuffer`` (``iqBuffer`` attribute), consumed by the associated ``SDRDemodulator``.
+
 	'''
 
-	def __init__(self,interface):
+	def __init__(self,interface,bufferSize=2**20):
 		self.interface = interface
 		self.running = False
 		self.frequency = None
@@ -32,7 +139,32 @@ class SDRSource:
 		self.gain = None
 		self.blockLength = None
 		self.sampleRate = None
-		self.iqStream = []
+		self.iqBuffer = IQRingBuffer(capacity=bufferSize)
+
+	def setBufferSize(self,bufferSize):
+		'''
+		This method sets the capacity (in samples) of the IQ ring buffer. It can only be modified when the streaming is stopped.
+
+		:param bufferSize: capacity of the ring buffer
+		:type bufferSize: int
+		:return: boolean indicating if the operation was successful
+		:rtype: bool
+
+		'''
+		if not self.running:
+			self.iqBuffer = IQRingBuffer(capacity=bufferSize)
+			return True
+		return False
+
+	def getOverflows(self):
+		'''
+		This method returns the number of overflows of the IQ ring buffer since the streaming has been started.
+
+		:return: tuple composed of the number of overflows and the number of dropped samples
+		:rtype: (int, int)
+
+		'''
+		return (self.iqBuffer.overflows, self.iqBuffer.droppedSamples)
 
 	def setBandwidth(self,bandwidth):
 		self.bandwidth = bandwidth
@@ -76,10 +208,10 @@ class HackRFSource(HackRFSDR,SDRSource):
 		if HackRFSource.numberOfSources == 0 and HackRFSource.initialized:
 			HackRFSDR.closeAPI()
 
-	def __init__(self,interface):
+	def __init__(self,interface,bufferSize=2**20):
 		self.alreadyStarted = False
 		HackRFSDR.__init__(self,interface=interface)
-		SDRSource.__init__(self,interface=interface)
+		SDRSource.__init__(self,interface=interface,bufferSize=bufferSize)
 		self.callback = hackrflibcallback(self._receiveCallback)
 
 		if self.ready:
@@ -97,8 +229,8 @@ class HackRFSource(HackRFSDR,SDRSource):
 		self.blockLength = length // 2
 		arrayType = (c_byte*length)
 		values = cast(hackrf_transfer.contents.buffer, POINTER(arrayType)).contents
-		#if len(self.iqStream) < 10*length:
-		self.iqStream+=[(values[i]/128.0+1j*values[i+1]/128.0) for i in range(0,len(values)-1,2)]
+		samples = (numpy.frombuffer(values,dtype=numpy.int8,count=2*self.blockLength).astype(numpy.float32) / 128.0).view(numpy.complex64)
+		self.iqBuffer.write(samples)
 		return 0
 
 
@@ -116,7 +248,7 @@ class HackRFSource(HackRFSDR,SDRSource):
 
 		'''
 		if self.checkParameters() and not self.running:
-			self.iqStream = []
+			self.iqBuffer.clear()
 			if self.alreadyStarted:
 				self.restart()
 			self.lock.acquire()
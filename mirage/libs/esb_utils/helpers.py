@@ -110,30 +110,58 @@ def bitwiseXor(a,b):
 	return result
 
 
+def crc16(data,bitLength=None,offset=0,crc=0xFFFF):
+	'''
+	This function calculates the CRC-16-CCITT (polynomial 0x1021) used by Enhanced ShockBurst, on an arbitrary number of bits.
+
+	:param data: data to use
+	:type data: bytes
+	:param bitLength: number of bits to take into account (every bit following offset if not provided)
+	:type bitLength: int
+	:param offset: index of the first bit to take into account (0 is the most significant bit of the first byte)
+	:type offset: int
+	:param crc: initial value of the CRC
+	:type crc: int
+	:return: calculated CRC
+	:rtype: int
+
+	:Example:
+
+		>>> hex(crc16(bytes.fromhex('e846f92fa429006100007f57ff80004900'),bitLength=16*8+1))
+		'0x9ed4'
+
+	'''
+	total = 8*len(data)
+	if bitLength is None:
+		bitLength = total - offset
+	value = int.from_bytes(data,'big')
+	for i in range(offset,offset+bitLength):
+		if ((crc >> 15) ^ (value >> (total - 1 - i))) & 1:
+			crc = ((crc << 1) & 0xFFFF) ^ 0x1021
+		else:
+			crc = (crc << 1) & 0xFFFF
+	return crc
+
 def calcCrcByte(crc,byte,bits):
 	'''
 	This function calculates the temporary value generated by an iteration of CRC calculation.
-	
+
 	:param crc: previous temporary value of CRC
 	:type crc: bytes
 	:param byte: byte to use in the current iteration
 	:type byte: bytes
 	:param bits: number of bits of the byte to take into account in the calculation
 	:type bits: int
-	
+
 	'''
-	polynome = bytes2bits(b'\x10\x21')
-	crc_ba = bytes2bits(crc)
-	byte_ba = bytes2bits(bytes([byte]))
-	crc_ba = bitwiseXor(crc_ba,byte_ba + "00000000")
+	crc = int.from_bytes(crc,'big') ^ (byte << 8)
 	while bits>0:
 		bits-=1
-		if crc_ba[0:1] == '1':
-			crc_ba = crc_ba[1:]+'0'				
-			crc_ba = bitwiseXor(crc_ba,polynome)
+		if crc & 0x8000:
+			crc = ((crc << 1) & 0xFFFF) ^ 0x1021
 		else:
-			crc_ba = crc_ba[1:]+'0'
-	return bits2bytes(crc_ba)
+			crc = (crc << 1) & 0xFFFF
+	return crc.to_bytes(2,'big')
 
 def calcCrc(packet):
 	'''
@@ -155,3 +183,111 @@ def calcCrc(packet):
 		crc = calcCrcByte(crc,x,8)
 	crc = calcCrcByte(crc, packet[-1],1)
 	return crc
+
+class ESBFrameLocator:
+	'''
+	This class allows to locate an Enhanced ShockBurst frame in a raw sequence of bytes (e.g. received in generic promiscuous mode), starting with the preamble.
+	The frame's length is unknown: for every possible address length, the payload length field gives a candidate frame length.
+	The CRC is advanced one bit at a time, and compared with the following 16 bits when a candidate length is reached.
+
+	:Example:
+
+		>>> locator = ESBFrameLocator()
+		>>> locator.locate(bytes.fromhex('aae846f92fa4200030800003fabffc2c9380'))
+		(121, 5)
+		>>> locator.extract(bytes.fromhex('aae846f92fa4200030800003fabffc2c93801f0e42')).hex()
+		'aae846f92fa4200030800003fabffc2c9380'
+
+	'''
+	def __init__(self,preambleSize=8,pcfSize=9,crcSize=16,payloadLengthSize=6,addressLengths=(3,4,5)):
+		self.preambleSize = preambleSize
+		self.pcfSize = pcfSize
+		self.crcSize = crcSize
+		self.payloadLengthSize = payloadLengthSize
+		self.addressLengths = addressLengths
+		self.lastFrame = (None,(None,None))
+
+	def crc(self,data,bitLength=None):
+		'''
+		This method calculates the CRC of a frame (without preamble and CRC).
+
+		:param data: raw bytes of the frame (without preamble and CRC)
+		:type data: bytes
+		:param bitLength: number of bits of the frame (every bit if not provided)
+		:type bitLength: int
+		:return: calculated CRC
+		:rtype: bytes
+
+		'''
+		return crc16(data,bitLength).to_bytes(2,'big')
+
+	def getCandidates(self,data):
+		'''
+		This method returns the candidate frame lengths (index of the first bit of the CRC) for every possible address length.
+
+		:param data: raw bytes starting with the preamble
+		:type data: bytes
+		:return: dictionary associating the candidate frame lengths (in bits) to the corresponding address length
+		:rtype: dict
+
+		'''
+		total = 8*len(data)
+		value = int.from_bytes(data,'big')
+		candidates = {}
+		for addressLength in self.addressLengths:
+			pcfStart = self.preambleSize + 8*addressLength
+			if pcfStart + self.payloadLengthSize <= total:
+				payloadLength = (value >> (total - pcfStart - self.payloadLengthSize)) & ((1 << self.payloadLengthSize) - 1)
+				frameLength = pcfStart + self.pcfSize + 8*payloadLength
+				if frameLength + self.crcSize <= total and frameLength not in candidates:
+					candidates[frameLength] = addressLength
+		return candidates
+
+	def locate(self,data):
+		'''
+		This method locates the frame contained in the provided raw bytes.
+
+		:param data: raw bytes starting with the preamble
+		:type data: bytes
+		:return: tuple composed of the frame length (index of the first bit of the CRC) and the address length, or (None, None) if no valid CRC has been found
+		:rtype: tuple of (int, int)
+
+		'''
+		lastData,lastResult = self.lastFrame
+		if data == lastData:
+			return lastResult
+		candidates = self.getCandidates(data)
+		if len(candidates) == 0:
+			return (None, None)
+		total = 8*len(data)
+		value = int.from_bytes(data,'big')
+		crcMask = (1 << self.crcSize) - 1
+		crc = 0xFFFF
+		for i in range(self.preambleSize,max(candidates)):
+			if ((crc >> 15) ^ (value >> (total - 1 - i))) & 1:
+				crc = ((crc << 1) & 0xFFFF) ^ 0x1021
+			else:
+				crc = (crc << 1) & 0xFFFF
+			if i + 1 in candidates and crc == (value >> (total - i - 1 - self.crcSize)) & crcMask:
+				return (i + 1, candidates[i + 1])
+		return (None, None)
+
+	def extract(self,data):
+		'''
+		This method locates the frame contained in the provided raw bytes, and returns the bytes of the frame (from the preamble to the CRC).
+		If no valid CRC has been found, the provided raw bytes are returned unmodified.
+		The result is kept, allowing the next call of ``locate`` on the returned frame to avoid a new search.
+
+		:param data: raw bytes starting with the preamble
+		:type data: bytes
+		:return: bytes of the frame
+		:rtype: bytes
+
+		'''
+		result = self.locate(data)
+		frameLength,addressLength = result
+		if frameLength is None:
+			return data
+		frame = data[:(frameLength + self.crcSize + 7) // 8]
+		self.lastFrame = (frame,result)
+		return frame
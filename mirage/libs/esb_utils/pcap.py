@@ -34,7 +34,7 @@ class ESBPCAPDevice(wireless.PCAPDevice):
 	DLT = 148
 	SCAPY_LAYER = ESB_Hdr
 
-	sharedMethods = ["enterSnifferMode","enterPromiscuousMode","scan","getChannel","setChannel","getMode","generateStream"]
+	sharedMethods = wireless.PCAPDevice.sharedMethods + ["enterSnifferMode","enterPromiscuousMode","scan","getChannel","setChannel","generateStream"]
 
 	def init(self):
 		super().init()
@@ -458,7 +458,7 @@ class ESBRFStormDevice(wireless.Device):
 		elif self.mode == ESBOperationMode.SNIFFER and receivedData[0] == 0 and receivedData != b"\xFF":
 			return ESB_Hdr(address=self.address)/ESB_Payload_Hdr(receivedData[1:])
 		elif self.mode == ESBOperationMode.GENERIC_PROMISCUOUS and len(receivedData) > 0:
-			return ESB_Hdr(receivedData)
+			return ESB_Hdr(ESB_FRAME_LOCATOR.extract(receivedData))
 		else:
 			if self.mode == ESBOperationMode.SNIFFER and not self.ackReceiveQueue.empty():
 				return ESB_Hdr(address=self.ackReceiveQueue.get())/ESB_Payload_Hdr()/ESB_Ack_Response()
@@ -38,28 +38,12 @@ class ESB_Hdr(Packet):
 			XShortField("crc",None)
 		]
 
-	def pre_dissect(self,s):		
+	def pre_dissect(self,s):
 		bitstring = bytes2bits(s)
-		crc = None
-		crcFound = False
-		i = ESB_Hdr.ESB_PREAMBLE_SIZE+1
-		# We try to guess the packet size by looking for a valid CRC
-		while i < len(bitstring) - 16:
-			if bytes2bits(calcCrc(bits2bytes(bitstring[ESB_Hdr.ESB_PREAMBLE_SIZE:i]))) == bitstring[i:i+ESB_Hdr.ESB_CRC_SIZE]:
-				crcFound = True
-				break
-			i += 1
-
-		# We try to guess the address size by checking if :
+		# We try to guess the packet size and the address size by looking for a valid CRC :
 		# ESB_PREAMBLE_SIZE + 8*addr_size + ESB_PCF_SIZE + payload_size = 8*packet_size - ESB_CRC_SIZE
-		
-		addrLenFound = False
-		for addrLen in range(3,6):
-			payLen = bits2bytes("00"+bitstring[ESB_Hdr.ESB_PREAMBLE_SIZE+addrLen*8:ESB_Hdr.ESB_PREAMBLE_SIZE+addrLen*8+ESB_Hdr.ESB_PAYLEN_SIZE])[0]
-			if ESB_Hdr.ESB_PREAMBLE_SIZE+addrLen*8+ESB_Hdr.ESB_PCF_SIZE+payLen*8 == i:
-				addrLenFound = True
-				break
-
+		i,addrLen = ESB_FRAME_LOCATOR.locate(s)
+		crcFound = addrLenFound = i is not None
 
 		preamble = bitstring[:ESB_Hdr.ESB_PREAMBLE_SIZE]
 		if crcFound and addrLenFound:
@@ -93,12 +77,19 @@ class ESB_Hdr(Packet):
 		payload = bytes2bits(pay)
 		packet = bits2bytes(preamble + address + header + payload)
 		if self.crc is None:
-			crc = calcCrc(packet[1:])
+			crc = ESB_FRAME_LOCATOR.crc(packet[1:],len(address + header + payload))
 		else:
 			crc = p[-2:]
 		crc = bytes2bits(crc)
 		return bits2bytes(preamble + address + header + payload + crc)
 
+# Frame locator used to guess the size of the received frames
+ESB_FRAME_LOCATOR = ESBFrameLocator(
+				preambleSize=ESB_Hdr.ESB_PREAMBLE_SIZE,
+				pcfSize=ESB_Hdr.ESB_PCF_SIZE,
+				crcSize=ESB_Hdr.ESB_CRC_SIZE,
+				payloadLengthSize=ESB_Hdr.ESB_PAYLEN_SIZE
+				)
 
 class ESB_Payload_Hdr(Packet):
 	name = "ESB Payload"
@@ -1,10 +1,6 @@
 import sys
 from enum import IntEnum
 from terminaltables import SingleTable
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 
 '''
 This submodule provides some useful functions allowing to interact with the users.
@@ -316,6 +312,11 @@ class MiceVisualizer:
 		self.lineColor = lineColor
 		self.leftClickColor = leftClickColor
 		self.rightClickColor = rightClickColor
+		# matplotlib is only imported when a visualization is generated, as it noticeably slows down the startup
+		import matplotlib
+		matplotlib.use('Agg')
+		import matplotlib.pyplot as plt
+		self.plt = plt
 		self.fig, self.ax = plt.subplots()
 		self.line, = self.ax.plot([], [], lw=2,color=self.lineColor)
 		if showStart:
@@ -358,10 +359,10 @@ class MiceVisualizer:
 		color = "orange"
 		if lc:
 			color = self.leftClickColor
-			plt.scatter(posx,posy,c=color)
+			self.plt.scatter(posx,posy,c=color)
 		if rc:
 			color = self.rightClickColor
-			plt.scatter(posx,posy,c=color)
+			self.plt.scatter(posx,posy,c=color)
 		self.line.set_data(self.xdata, self.ydata)
 		if posx >= xmax:
 			self.ax.set_xlim(xmin, 2*xmax)
@@ -380,6 +381,7 @@ class MiceVisualizer:
 		'''
 		This method generates the output GIF file, according to the provided parameters.
 		'''
+		import matplotlib.animation as animation
 		ani = animation.FuncAnimation(self.fig, self._update, self._generateData, blit=False,repeat=False, interval=10,init_func=self._init,save_count=len(self.datas))
 		ani.save(self.outputFile, dpi=80, writer='imagemagick')
 
@@ -8,16 +8,18 @@ class MosartKeyboardCodes:
 		As a result, the corresponding mapping may contains some mistakes or missing data.
 
 	'''
+	hidCodes = None
+
 	@classmethod
 	def getMosartKeyboardCodeFromHIDCode(cls,hidCode,modifiers):
 		'''
 		This method returns the Mosart keybaord
 		'''
-		value = [hidCode,modifiers]
-		for k,v in MosartKeyboardCodes.mosartKeyboardCodes.items():
-			if v == value:
-				return k
-		return None
+		if cls.hidCodes is None:
+			cls.hidCodes = {}
+			for code,(hid,mod) in cls.mosartKeyboardCodes.items():
+				cls.hidCodes.setdefault((hid,mod),code)
+		return cls.hidCodes.get((hidCode,modifiers))
 
 	@classmethod
 	def getHIDCodeFromMosartKeyboardCode(cls,code):
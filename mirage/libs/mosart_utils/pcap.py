@@ -33,7 +33,7 @@ class MosartPCAPDevice(wireless.PCAPDevice):
 	DLT = 149
 	SCAPY_LAYER = Mosart_Hdr
 
-	sharedMethods = ["enterSnifferMode","enterPromiscuousMode","disableDonglePackets","enableDonglePackets","getChannel","setChannel","getMode","generateStream"]
+	sharedMethods = wireless.PCAPDevice.sharedMethods + ["enterSnifferMode","enterPromiscuousMode","disableDonglePackets","enableDonglePackets","getChannel","setChannel","generateStream"]
 
 	def init(self):
 		super().init()
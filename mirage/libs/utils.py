@@ -1,53 +1,197 @@
-import psutil,time,os,sys,string,random,imp
+import psutil,time,os,sys,string,random,imp,json,ast
 from os.path import expanduser,exists
 
+class ModulesRegistry:
+	'''
+	This class provides a lazy registry of Mirage's modules (or scenarios), built from the python files stored in a list of directories.
+	The files are indexed by name without being imported : a module is imported (using ``imp.load_source``) the first time it is requested.
+
+	The informations describing a module (name, type, technology, description, dependencies and args) are statically extracted from the
+	``init`` method of its class, and cached in a JSON manifest keyed by the modification time and the size of the file. If a file can't be
+	analyzed statically, it is imported and the module is instantiated in order to call its ``info`` method, and the result is cached.
+
+	It can be used as a read-only dictionary (e.g. ``name in registry``, ``registry[name]``), the values being the imported python modules.
+
+	:param directories: list of directories containing the python files
+	:type directories: list of str
+	:param manifestFile: path of the JSON manifest (optional, no manifest is used if None)
+	:type manifestFile: str
+
+	:Example:
+
+	>>> registry = utils.ModulesRegistry(["/home/user/.mirage/modules"],"/home/user/.mirage/modules.manifest")
+	>>> registry.getInfo("ble_info")["technology"]
+	'ble'
+	>>> registry["ble_info"]
+	<module 'ble_info' from '/home/user/mirage/mirage/modules/ble_info.py'>
+
+	'''
+	infoAttributes = ("type","technology","description","dependencies","args","dynamicArgs")
+
+	def __init__(self, directories, manifestFile=None):
+		self.manifestFile = manifestFile
+		self.manifest = None
+		self.manifestUpdated = False
+		self.paths = {}
+		self.loaded = {}
+		for directory in directories:
+			if not os.path.isdir(directory):
+				continue
+			for filename in sorted(os.listdir(directory)):
+				path = directory+"/"+filename
+				if filename[-3:] == ".py" and filename != "__init__.py" and os.path.isfile(path):
+					self.paths[filename[:-3]] = path
+
+	def __contains__(self,name):
+		return name in self.paths
+
+	def __iter__(self):
+		return iter(self.paths)
+
+	def __len__(self):
+		return len(self.paths)
+
+	def __getitem__(self,name):
+		if name not in self.loaded:
+			self.loaded[name] = imp.load_source(name,self.paths[name])
+		return self.loaded[name]
+
+	def keys(self):
+		return self.paths.keys()
+
+	def values(self):
+		return [self[name] for name in self.paths]
+
+	def items(self):
+		return [(name,self[name]) for name in self.paths]
+
+	def getClass(self,name):
+		'''
+		This method imports the python file corresponding to the provided name and returns the class with the same name.
+
+		:param name: name of the module
+		:type name: str
+		:return: class of the module (or None if not found)
+		:rtype: class
+		'''
+		if name not in self.paths:
+			return None
+		return getattr(self[name],name,None)
+
+	def _loadManifest(self):
+		if self.manifest is None:
+			self.manifest = {}
+			if self.manifestFile is not None and os.path.isfile(self.manifestFile):
+				try:
+					with open(self.manifestFile,"r") as f:
+						self.manifest = json.load(f)
+				except (OSError,ValueError):
+					self.manifest = {}
+		return self.manifest
+
+	def saveManifest(self):
+		'''
+		This method writes the manifest if some entries have been updated since it has been loaded.
+		'''
+		if self.manifestFile is None or not self.manifestUpdated:
+			return
+		try:
+			with open(self.manifestFile+".tmp","w") as f:
+				json.dump(self.manifest,f)
+			os.replace(self.manifestFile+".tmp",self.manifestFile)
+			self.manifestUpdated = False
+		except OSError:
+			pass
+
+	def _extractInfo(self,name):
+		with open(self.paths[name],"r") as f:
+			tree = ast.parse(f.read())
+		info = {"name":name,"type":"unknown","technology":"generic","description":"","dependencies":[],"args":{},"dynamicArgs":False}
+		for node in tree.body:
+			if isinstance(node,ast.ClassDef) and node.name == name:
+				for method in node.body:
+					if isinstance(method,ast.FunctionDef) and method.name == "init":
+						for statement in method.body:
+							if isinstance(statement,(ast.Expr,ast.Pass)):
+								continue
+							if not isinstance(statement,ast.Assign):
+								return None
+							for target in statement.targets:
+								if (
+									isinstance(target,ast.Attribute) and
+									isinstance(target.value,ast.Name) and
+									target.value.id == "self" and
+									target.attr in self.infoAttributes
+								):
+									info[target.attr] = ast.literal_eval(statement.value)
+						return info
+		return None
+
+	def _instantiateInfo(self,name):
+		moduleClass = self.getClass(name)
+		instance = moduleClass()
+		info = instance.info()
+		info["args"] = dict(instance.args)
+		info["dynamicArgs"] = instance.dynamicArgs
+		return info
+
+	def getInfo(self,name):
+		'''
+		This method returns the informations describing a module without importing it, if possible.
+
+		:param name: name of the module
+		:type name: str
+		:return: dictionary containing the keys "name", "type", "technology", "description", "dependencies", "args" and "dynamicArgs" (or None if not found)
+		:rtype: dict
+		'''
+		if name not in self.paths:
+			return None
+		path = self.paths[name]
+		stat = os.stat(path)
+		manifest = self._loadManifest()
+		entry = manifest.get(path)
+		if entry is not None and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+			return entry["info"]
+		try:
+			info = self._extractInfo(name)
+		except (SyntaxError,ValueError):
+			info = None
+		if info is None:
+			info = self._instantiateInfo(name)
+		manifest[path] = {"mtime":stat.st_mtime,"size":stat.st_size,"info":info}
+		self.manifestUpdated = True
+		return info
+
+
 def generateModulesDictionary(moduleDir, moduleUserDir):
 	'''
-	This function generates a dictionary of Mirage modules, by including files stored in ``moduleDir`` and ``moduleUserDir``.
+	This function generates a lazy registry of Mirage modules, by indexing files stored in ``moduleDir`` and ``moduleUserDir``.
+	The modules' informations are cached in the manifest ``modules.manifest``, stored in the home directory.
 	
 	:param moduleDir: path of Mirage's modules directory
 	:type moduleDir: str
 	:param moduleUserDir: path of Mirage's user modules directory
 	:type moduleUserDir: str
-	:return: dictionary of Mirage's modules
-	:rtype: dict of str: module
+	:return: registry of Mirage's modules
+	:rtype: mirage.libs.utils.ModulesRegistry
 
 	'''
-	modules = {}
-
-	for module in os.listdir(moduleDir):
-		if os.path.isfile(moduleDir+"/"+module) and module[-3:] == ".py" and module != "__init__.py":
-			modules[module[:-3]] = imp.load_source(module[:-3],moduleDir + "/"+module)
-		
-	for module in os.listdir(moduleUserDir):
-		if os.path.isfile(moduleUserDir+"/"+module) and module[-3:] == ".py" and module != "__init__.py":
-			modules[module[:-3]] = imp.load_source(module[:-3],moduleUserDir + "/"+module)
-
-	return modules
+	return ModulesRegistry([moduleDir, moduleUserDir], getHomeDir()+"/modules.manifest")
 
 
 def generateScenariosDictionary(scenariosDir, scenariosUserDir):
 	'''
-	This function generates a dictionary of Mirage scenarios, by including files stored in ``scenariosDir`` and ``scenariosUserDir``.
+	This function generates a lazy registry of Mirage scenarios, by indexing files stored in ``scenariosDir`` and ``scenariosUserDir``.
 	
 	:param scenariosDir: path of Mirage's scenarios directory
 	:type scenariosDir: str
 	:param scenariosUserDir: path of Mirage's user scenarios directory
 	:type scenariosUserDir: str
-	:return: dictionary of Mirage's scenarios
-	:rtype: dict of str: module
+	:return: registry of Mirage's scenarios
+	:rtype: mirage.libs.utils.ModulesRegistry
 
 	'''
-	scenarios = {}
-	for scenario in os.listdir(scenariosDir):
-		if os.path.isfile(scenariosDir+"/"+scenario) and scenario[-3:] == ".py" and scenario != "__init__.py":
-			scenarios[scenario[:-3]]=imp.load_source(scenario[:-3],scenariosDir + "/"+scenario)
-		
-	for scenario in os.listdir(scenariosUserDir):
-		if os.path.isfile(scenariosUserDir+"/"+scenario) and scenario[-3:] == ".py" and scenario != "__init__.py":
-			scenarios[scenario[:-3]]=imp.load_source(scenario[:-3],scenariosUserDir + "/"+scenario)
-
-	return scenarios
+	return ModulesRegistry([scenariosDir, scenariosUserDir])
 
 def initializeHomeDir():
 	'''
@@ -110,7 +254,7 @@ def getTempDir():
 	from mirage.core import app # No other choice : circular import
 	return app.App.Instance.tempDir
 
-def addTask(function, name='', args=[],kwargs={}):
+def addTask(function, name='', args=[],kwargs={},pooled=False):
 	'''
 	This function allows to quickly add a new background task.
 	
@@ -122,6 +266,8 @@ def addTask(function, name='', args=[],kwargs={}):
 	:type args: list
 	:param kwargs: dictionary of named arguments
 	:type kwargs: dict
+	:param pooled: boolean indicating if the task must be executed by a worker of the pool (designed for the short-lived tasks)
+	:type pooled: bool
 	:return: real name of the task (may be suffixed / see ``core.taskManager.addTask``)
 	:rtype: str
 
@@ -136,7 +282,7 @@ def addTask(function, name='', args=[],kwargs={}):
 
 	'''
 	from mirage.core import app
-	return app.App.Instance.taskManager.addTask(function,name, args=args, kwargs=kwargs)
+	return app.App.Instance.taskManager.addTask(function,name, args=args, kwargs=kwargs, pooled=pooled)
 
 def startTask(name):
 	'''
@@ -3,9 +3,10 @@ from mirage.libs import utils,wireless
 import mirage.libs.io as mio
 from mirage.libs.wifi_utils.packets import *
 from mirage.libs.wifi_utils.constants import *
+from mirage.libs.wifi_utils.dot11 import parseManagementFrame,buildManagementFilter
 from threading import Lock
 from scapy.all import *
-import os,socket,fcntl,array,struct
+import os,socket,fcntl,array,struct,ctypes
 class WifiDevice(wireless.Device):
 	'''
 	This device allows to communicate with a WiFi Device.
@@ -36,11 +37,18 @@ class WifiDevice(wireless.Device):
 		"setMonitorMode",
 		"getAddress",
 		"getMode",
-		"setMode"
+		"setMode",
+		"setFastMode",
+		"getCaptureStatistics"
 	]
 
 	def init(self):
 		self.wlock = Lock()
+		self.rawSocket = None
+		self.linkType = ARPHRD_IEEE80211_RADIOTAP
+		self.fastMode = False
+		self.receivedFrames = 0
+		self.droppedFrames = 0
 		if self.isUp():	
 			self.channel = None
 			self.frequency = None
@@ -199,15 +207,108 @@ class WifiDevice(wireless.Device):
 	def send(self,data):
 		sendp(data,iface=self.interface, verbose=0)
 
+	def _openRawSocket(self):
+		self.rawSocket = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+		self.rawSocket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RAW_SOCKET_BUFFER_SIZE)
+		self.rawSocket.bind((self.interface, ETH_P_ALL))
+		self.rawSocket.settimeout(0.1)
+		self.linkType = self.rawSocket.getsockname()[3]
+
+	def recv(self):
+		'''
+		This method receives a raw frame from the interface (using a ``AF_PACKET`` socket).
+		The frame is returned without being dissected : it is converted by ``mirage.libs.wifi.WifiReceiver``.
+
+		:return: raw frame (or None if no frame has been received)
+		:rtype: bytes
+		'''
+		if self.rawSocket is None:
+			self._openRawSocket()
+		try:
+			return self.rawSocket.recv(RAW_FRAME_SIZE)
+		except socket.timeout:
+			return None
+
+	def close(self):
+		if self.rawSocket is not None:
+			self.rawSocket.close()
+			self.rawSocket = None
+
 	def listen(self,callback=None):
 		'''
-		This method replaces the recv method, in order to reuse scapy's receiver optimization.
-		It's the reason why the _task method will also be redefined in ``mirage.libs.wifi.WifiReceiver``.
+		This method sniffs the frames using scapy, and calls the provided callback for every dissected frame.
 	
 		:param callback: reception callback
 		:type callback: function
 		'''
 		sniff(iface=self.interface,prn=callback,store=0)
+
+	def setFastMode(self,enable=True,subtypes=None):
+		'''
+		This method allows to enable or disable the fast reception mode.
+		In this mode, a BPF filter is attached to the socket of the device in order to drop every frame except the management frames in the kernel,
+		and the received frames are converted directly from their bytes, without being dissected by scapy
+		(the scapy frame is only dissected if the ``packet`` attribute of a Mirage packet is accessed).
+
+		:param enable: boolean indicating if the fast mode should be enabled or disabled
+		:type enable: bool
+		:param subtypes: list of management subtypes to receive (None means every management frame)
+		:type subtypes: list of int
+		:return: boolean indicating if the operation was successful
+		:rtype: bool
+
+		:Example:
+
+			>>> device.setFastMode(enable=True,subtypes=[4,5,8]) # Probe Requests, Probe Responses and Beacons
+			True
+			>>> device.setFastMode(enable=False)
+			True
+
+		.. note::
+
+			This method is a **shared method** and can be called from the corresponding Emitters / Receivers.
+
+		'''
+		if self.rawSocket is None:
+			self._openRawSocket()
+		try:
+			if enable:
+				if self.linkType != ARPHRD_IEEE80211_RADIOTAP:
+					mio.fail("Fast mode is only available in monitor mode")
+					return False
+				program = buildManagementFilter(subtypes)
+				instructions = ctypes.create_string_buffer(b"".join([struct.pack("HBBI",*i) for i in program]))
+				self.rawSocket.setsockopt(socket.SOL_SOCKET,SO_ATTACH_FILTER,struct.pack("HP",len(program),ctypes.addressof(instructions)))
+			elif self.fastMode:
+				self.rawSocket.setsockopt(socket.SOL_SOCKET,SO_DETACH_FILTER,0)
+		except OSError:
+			mio.fail("Interface can't attach the filter")
+			return False
+		self.fastMode = enable
+		return True
+
+	def getCaptureStatistics(self):
+		'''
+		This method returns the statistics of the socket used by the device to receive the frames.
+
+		:return: dictionary indicating the number of frames received (after filtering) and dropped by the kernel
+		:rtype: dict
+
+		:Example:
+
+			>>> device.getCaptureStatistics()
+			{'receivedFrames': 104224, 'droppedFrames': 0}
+
+		.. note::
+
+			This method is a **shared method** and can be called from the corresponding Emitters / Receivers.
+
+		'''
+		if self.rawSocket is not None:
+			received,dropped = struct.unpack("II",self.rawSocket.getsockopt(SOL_PACKET,PACKET_STATISTICS,8))
+			self.receivedFrames += received
+			self.droppedFrames += dropped
+		return {"receivedFrames":self.receivedFrames,"droppedFrames":self.droppedFrames}
 	
 	def getFrequency(self):
 		'''
@@ -438,14 +539,11 @@ class WifiReceiver(wireless.Receiver):
 	def __init__(self,interface="wlp2s0",monitorMode=True):
 		super().__init__(interface=interface,packetType=WifiPacket, deviceType=WifiDevice)
 
-
-	def _task(self):
-		'''
-		This method is redefined in order to reuse the scapy's receiver optimization.
-		'''
-		self.device.listen(callback=self._add)
-
 	def convert(self,packet):
+		if isinstance(packet,bytes):
+			if self.device.fastMode:
+				return parseManagementFrame(packet)
+			packet = conf.l2types.num2layer.get(self.device.linkType,conf.default_l2)(packet)
 		def getDot11ElmtInfos(p):
 			ssid,channel = None,None
 			crypto=set()
@@ -31,3 +31,13 @@ SIOCSIFFLAGS = 0x8914  # Set flags
 # Wifi interface constants
 IFUP = 0x1 # interface: up
 IFNAMESIZE = 16 # interface name size
+
+# Raw socket constants
+ETH_P_ALL = 0x0003 # every protocol
+ARPHRD_IEEE80211_RADIOTAP = 803 # link type: 802.11 frames with a radiotap header
+SO_ATTACH_FILTER = 26 # attach a BPF program
+SO_DETACH_FILTER = 27 # detach the BPF program
+SOL_PACKET = 263 # packet socket level
+PACKET_STATISTICS = 6 # get the packet socket statistics
+RAW_FRAME_SIZE = 65536 # maximal size of a received frame
+RAW_SOCKET_BUFFER_SIZE = 4*1024*1024 # size of the receive buffer
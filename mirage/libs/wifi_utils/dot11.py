@@ -0,0 +1,180 @@
+import struct
+from mirage.libs.wifi_utils.packets import *
+
+'''
+This submodule provides a lightweight parser for the 802.11 management frames captured with a radiotap header.
+The radiotap header, the 802.11 header and the information elements are parsed in place (using ``struct`` and ``memoryview``)
+and the corresponding Mirage packets are built directly : the scapy frame is only dissected if the ``packet`` attribute is accessed.
+
+It also provides the classic BPF program attached to the raw socket of a WiFi device, allowing to drop the other frames in the kernel.
+'''
+
+# Radiotap header (version, padding, length, first present word)
+_radiotap = struct.Struct("<BBHI")
+_word = struct.Struct("<I")
+_reason = struct.Struct("<H")
+
+# Length of the fixed fields preceding the information elements, indexed by management subtype
+FIXED_FIELDS = {
+	0:4, # Association Request
+	1:6, # Association Response
+	2:10, # Reassociation Request
+	3:6, # Reassociation Response
+	4:0, # Probe Request
+	5:12, # Probe Response
+	8:12 # Beacon
+}
+
+# Prefix of the WPA vendor specific element (Microsoft OUI, type 1, version 1)
+WPA_PREFIX = b"\x00P\xf2\x01\x01\x00"
+
+def buildManagementFilter(subtypes=None,snapLength=0x40000):
+	'''
+	This function builds a classic BPF program accepting the 802.11 management frames (captured with a radiotap header).
+	The program reads the length of the radiotap header, then checks the type (and the subtype) in the frame control field.
+
+	:param subtypes: list of management subtypes to accept (None means every management frame)
+	:type subtypes: list of int
+	:param snapLength: maximal number of bytes kept for an accepted frame
+	:type snapLength: int
+	:return: list of BPF instructions (code, jt, jf, k)
+	:rtype: list of tuple
+
+	:Example:
+
+		>>> buildManagementFilter(subtypes=[4,5,8])
+		[(48, 0, 0, 3), (100, 0, 0, 8), (7, 0, 0, 0), (48, 0, 0, 2), (76, 0, 0, 0), (7, 0, 0, 0), (80, 0, 0, 0), (84, 0, 0, 252), (21, 3, 0, 64), (21, 2, 0, 80), (21, 1, 0, 128), (6, 0, 0, 0), (6, 0, 0, 262144)]
+
+	'''
+	program = [
+		(0x30,0,0,3), # ldb [3]
+		(0x64,0,0,8), # lsh #8
+		(0x07,0,0,0), # tax
+		(0x30,0,0,2), # ldb [2]
+		(0x4c,0,0,0), # or x (A = radiotap length)
+		(0x07,0,0,0), # tax
+		(0x50,0,0,0)  # ldb [x+0] (first byte of the frame control field)
+	]
+	if subtypes is None:
+		program += [
+			(0x54,0,0,0x0c), # and #0x0c (type)
+			(0x15,0,1,0x00)  # jeq #0 (management)
+		]
+		program += [
+			(0x06,0,0,snapLength), # accept
+			(0x06,0,0,0) # drop
+		]
+	else:
+		program.append((0x54,0,0,0xfc)) # and #0xfc (subtype and type)
+		for i,subtype in enumerate(subtypes):
+			program.append((0x15,len(subtypes)-i,0,(subtype & 0x0f) << 4))
+		program += [
+			(0x06,0,0,0), # drop
+			(0x06,0,0,snapLength) # accept
+		]
+	return program
+
+def _hasFCS(view,length):
+	present = _radiotap.unpack_from(view,0)[3]
+	if not present & 0x02:
+		return False
+	offset,word = 4,present
+	while word & 0x80000000:
+		offset += 4
+		if offset + 4 > length:
+			return False
+		word = _word.unpack_from(view,offset)[0]
+	offset += 4
+	if present & 0x01: # TSFT field (8 bytes, aligned on 8 bytes)
+		offset = ((offset + 7) & ~7) + 8
+	return offset < length and view[offset] & 0x10 != 0
+
+def parseManagementFrame(frame):
+	'''
+	This function converts a frame captured with a radiotap header into a Mirage WiFi Packet, without dissecting it using scapy.
+	The conversion follows ``mirage.libs.wifi.WifiReceiver.convert`` :
+
+		* the Beacons, Probe Requests, Probe Responses, Disassociations and Deauthentications are converted into the corresponding packets
+		* the other frames are converted into generic ``WifiPacket``
+		* the SSID, the channel and the cypher mode are extracted from the information elements
+
+	The cypher mode is "WPA2" if a RSN element is included, "WPA" if a WPA vendor element is included, otherwise "WEP" or "OPN" according to the privacy bit of the capabilities.
+	The body of a protected frame is not parsed (the reason of a protected Disassociation or Deauthentication is None).
+
+	The raw frame is stored in the ``raw`` attribute of the packet, the scapy frame is dissected on demand.
+
+	:param frame: frame (including the radiotap header)
+	:type frame: bytes
+	:return: Mirage WiFi Packet
+	:rtype: mirage.libs.wifi_utils.packets.WifiPacket
+
+	:Example:
+
+		>>> packet = parseManagementFrame(bytes.fromhex("000008000000000080000000ffffffffffff001122334455001122334455000000000000000000006400010000046d69726103010b"))
+		>>> packet.SSID, packet.srcMac, packet.channel, packet.cypher
+		('mira', '00:11:22:33:44:55', 11, 'OPN')
+
+	'''
+	with memoryview(frame) as view:
+		size = len(view)
+		length = _radiotap.unpack_from(view,0)[2] if size >= 8 else size
+		end = size - 4 if length < size and _hasFCS(view,length) else size
+		# Frames which are not management frames (or too short to be management frames) are converted into generic packets
+		if end - length < 24 or view[length] & 0x0c != 0:
+			p = WifiPacket()
+			p.raw = bytes(frame)
+			return p
+
+		control,flags = view[length],view[length+1]
+		subtype = control >> 4
+		dest = view[length+4:length+10].hex(":").upper()
+		src = view[length+10:length+16].hex(":").upper()
+		emit = view[length+16:length+22].hex(":").upper()
+		body = length + 24
+		protected = flags & 0x40 != 0
+
+		if subtype == 8:
+			p = WifiBeacon(srcMac=src,destMac=dest,emitMac=emit)
+		elif subtype == 5:
+			p = WifiProbeResponse(srcMac=src,destMac=dest,emitMac=emit)
+		elif subtype == 4:
+			p = WifiProbeRequest(srcMac=src,destMac=dest,emitMac=emit)
+		elif subtype == 10 or subtype == 12:
+			reason = _reason.unpack_from(view,body)[0] if not protected and end - body >= 2 else None
+			if subtype == 10:
+				p = WifiDisas(srcMac=src,destMac=dest,emitMac=emit,reason=reason)
+			else:
+				p = WifiDeauth(srcMac=src,destMac=dest,emitMac=emit,reason=reason)
+		else:
+			p = WifiPacket()
+
+		if not protected and subtype in FIXED_FIELDS:
+			offset = body + FIXED_FIELDS[subtype]
+			if offset < end:
+				ssid,channel = None,None
+				wpa,wpa2 = False,False
+				while end - offset >= 2:
+					elementId,infoLength = view[offset],view[offset+1]
+					info = view[offset+2:min(offset+2+infoLength,end)]
+					if elementId == 0:
+						ssid = str(info,"utf-8",errors="replace")
+					elif elementId == 3:
+						channel = info[0] if len(info) == 1 else None
+					elif elementId == 48:
+						wpa2 = True
+					elif elementId == 221 and info[:6] == WPA_PREFIX:
+						wpa = True
+					offset += 2 + infoLength
+				p.SSID = ssid
+				p.channel = channel if channel is not None else 1
+				if hasattr(p,"cypher"):
+					if wpa2:
+						p.cypher = "WPA2"
+					elif wpa:
+						p.cypher = "WPA"
+					elif subtype in (5,8) and end - body >= 12 and view[body+10] & 0x10:
+						p.cypher = "WEP"
+					else:
+						p.cypher = "OPN"
+	p.raw = bytes(frame)
+	return p
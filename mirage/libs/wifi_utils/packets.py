@@ -1,4 +1,5 @@
 from mirage.libs import wireless
+from scapy.layers.dot11 import RadioTap
 
 class WifiPacket(wireless.Packet):
 	'''
@@ -16,8 +17,13 @@ class WifiPacket(wireless.Packet):
 	:type type: int
 	:param subType: subtype of the current frame
 	:type subType: int
+
+	.. note::
+
+		If the packet has been built from a raw frame (``raw`` attribute), the scapy frame (``packet`` attribute) is only dissected when it is accessed.
 	'''
 	def __init__(self, channel = None, destMac = '', srcMac = '', emitMac = '', type = 0, subType = 0):
+		self.raw = None
 		super().__init__()
 		self.destMac = destMac
 		self.srcMac = srcMac
@@ -27,6 +33,16 @@ class WifiPacket(wireless.Packet):
 		self.channel = channel
 		self.name = "Wifi - Unknown Packet"
 
+	@property
+	def packet(self):
+		if self._packet is None and self.raw is not None:
+			self._packet = RadioTap(self.raw)
+		return self._packet
+
+	@packet.setter
+	def packet(self,packet):
+		self._packet = packet
+
 class WifiBeacon(WifiPacket):
 	'''
 	Mirage WiFi Packet - Beacon (Management frame)
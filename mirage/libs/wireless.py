@@ -21,9 +21,11 @@ class Emitter(PacketQueue):
 	  * `packetType` : indicating the child class of Packet for the technology implemented by the Emitter
 	  * `deviceType` : indicating the child class of Device to instanciate
 
-	A `_task` method is implemented by default. It gets a Mirage Packet from the queue, calls the convert method on it and calls the send method of a Device on the result. If you want to customize this behaviour, you can overload this method.
+	A `_task` method is implemented by default. It waits for some Mirage Packets in the queue (up to `batchSize` packets are processed per wake up), calls the convert method on them and calls the send method of a Device on the results. If you want to customize this behaviour, you can overload this method.
 
 	'''
+	batchSize = 64
+
 	def __init__(self,interface,packetType=Packet, deviceType=Device):
 		self.interface = interface
 		self.packetType = packetType
@@ -83,10 +85,24 @@ class Emitter(PacketQueue):
 		'''
 		return self.convert(data)
 
+	def _interrupt(self):
+		self.queue.put(PacketQueue.STOP)
+		return True
+
 	def _task(self):
-		if not self.isEmpty():
+		# Blocks until some packets are available, then processes every queued packet (up to batchSize)
+		batch = [self.queue.get()]
+		try:
+			while len(batch) < self.batchSize:
+				batch.append(self.queue.get_nowait())
+		except Empty:
+			pass
+
+		for item in batch:
+			if item is PacketQueue.STOP: # the packets following the interruption are still processed
+				continue
+			insertionTime,packet = item
 			self.transmitting = True
-			packet = self.queue.get()
 			if isinstance(packet,WaitPacket):
 				data = bytes("WAIT:"+str(packet.time),"ascii")
 			else:
@@ -94,9 +110,10 @@ class Emitter(PacketQueue):
 
 			if data is not None:
 				self._send(data)
-			self.transmitting = not self.isEmpty()
-		else:
-			time.sleep(0.005)
+				self._processed(insertionTime)
+			else:
+				self.droppedPackets += 1
+		self.transmitting = not self.isEmpty()
 
 
 	def send(self,*packets):
@@ -112,8 +129,10 @@ class Emitter(PacketQueue):
 			>>> emitter.send(packet1)
 
 		'''
+		if len(packets) > 0:
+			self.transmitting = True
 		for packet in packets:
-			self.queue.put(packet)
+			self._put(packet)
 
 	def sendp(self,*packets):
 		'''
@@ -157,16 +176,18 @@ class Receiver(PacketQueue):
 	A `_task` method is implemented by default. It calls the recv method of a Device, converts the result (if it is not None) to a Mirage Packet and adds it to the queue. If you want to customize this behaviour, you can overload this method.
 
 	'''
-	def __init__(self,interface,packetType=Packet, deviceType=Device):
+	def __init__(self,interface,packetType=Packet, deviceType=Device, queueSize=0):
 		self.interface = interface
 		self.packetType = packetType
 		self.deviceType = deviceType
 		self.device = self.deviceType.get(self.interface)
 		self.callbacks = []
+		self.callbacksIndex = {}
+		self.callbacksById = {}
 		self.receiving = False
 		self.callbacksQueue = Queue()
 		self.callbacksActiveListening = False
-		super().__init__(waitEmpty=False, autoStart=True)
+		super().__init__(waitEmpty=False, autoStart=True, queueSize=queueSize)
 
 	def updateSDRConfig(self,sdrConfig):
 		'''
@@ -201,7 +222,7 @@ class Receiver(PacketQueue):
 			packet = self.convert(data)
 			self._executeCallbacks(packet)
 			if packet is not None:
-				self.queue.put(packet)
+				self._put(packet,block=False)
 
 	def isReceiving(self):
 		'''
@@ -299,7 +320,9 @@ class Receiver(PacketQueue):
 		'''
 		def get():
 			try:
-				return self.queue.get(timeout=timeout)
+				insertionTime,packet = self.queue.get(timeout=timeout)
+				self._processed(insertionTime)
+				return packet
 			except Empty:
 				return None
 
@@ -356,16 +379,30 @@ class Receiver(PacketQueue):
 			>>> receiver.onEvent("BLEReadRequest",callback=onReadRequest, args=["Romain"])
 
 		'''
-		self.callbacks.append(Callback(event=event, function=callback, args=args, kwargs=kwargs, background=background))
+		newCallback = Callback(event=event, function=callback, args=args, kwargs=kwargs, background=background, packetType=self.packetType)
+		self.callbacks.append(newCallback)
+		self.callbacksById[newCallback.id] = newCallback
+		self.callbacksIndex = {}
+
+	def _getCallbacks(self,packetType):
+		# The callbacks able to be triggered are selected once per packet class (including its parent classes)
+		callbacksIndex = self.callbacksIndex
+		callbacks = callbacksIndex.get(packetType)
+		if callbacks is None:
+			callbacks = [callback for callback in self.callbacks if callback.matches(packetType)]
+			callbacksIndex[packetType] = callbacks
+		return callbacks
 
 	def _executeCallbacks(self,packet):
-		for callback in self.callbacks:
+		if packet is None:
+			return
+		for callback in self._getCallbacks(type(packet)):
 			callback.update(packet)
 			if callback.runnable:
 				if callback.background:
 					callback.run(packet)
 				else:
-					self.callbacksQueue.put((self.callbacks.index(callback),packet))
+					self.callbacksQueue.put((callback.id,packet))
 
 	def stopListeningCallbacks(self):
 		'''
@@ -377,6 +414,7 @@ class Receiver(PacketQueue):
 
 		'''
 		self.callbacksActiveListening = False
+		self.callbacksQueue.put((None,None))
 
 	def listenCallbacks(self):
 		'''
@@ -389,15 +427,18 @@ class Receiver(PacketQueue):
 		'''
 		self.callbacksActiveListening = True
 		while self.callbacksActiveListening:
-			if not self.callbacksQueue.empty():
-				index,packet = self.callbacksQueue.get()
-				self.callbacks[index].run(packet)
+			callbackId,packet = self.callbacksQueue.get()
+			callback = self.callbacksById.get(callbackId)
+			if callback is not None:
+				callback.run(packet)
 
 	def removeCallbacks(self):
 		'''
 		Remove the callbacks attached to the Receiver.
 		'''
 		self.callbacks = []
+		self.callbacksById = {}
+		self.callbacksIndex = {}
 
 	def stop(self):
 		'''
@@ -1,4 +1,4 @@
-import importlib
+import importlib,itertools
 
 class Callback:
 	'''
@@ -21,8 +21,14 @@ class Callback:
 	  * args : unnamed arguments of the function
 	  * kwargs : named arguments of the function
 	  * background : boolean indicating if the function is launched in a background thread or in foreground
+	  * packetType : class of the packets received (if provided, the event is resolved as a class of its module once, instead of every time a packet is received)
+
+	Every callback is identified by a unique and stable identifier (attribute ``id``).
 	'''
-	def __init__(self,event="*",function=None, args=[], kwargs={},background=True):
+	_ids = itertools.count()
+
+	def __init__(self,event="*",function=None, args=[], kwargs={},background=True,packetType=None):
+		self.id = next(Callback._ids)
 		if event == "*" or event.isdigit():
 			n = int(event) if event.isdigit() else 1
 			self.eventType = "npackets" # this callback is triggered every n packets received
@@ -31,12 +37,44 @@ class Callback:
 		else:
 			self.eventType = "instanceof" # this callback is triggered if the received packet type is event
 			self.instance = event
+			self.packetClass = None
+			if packetType is not None:
+				self.resolve(packetType)
 		self.parameters = {"args":args,"kwargs":kwargs}
 		self.function = function
 		self.background = background
 		self.runnable = False
 
 
+	def resolve(self, packetType):
+		'''
+		This method resolves the event of an "instanceof" callback as a class, by looking for it in the module of the provided packet class.
+
+		:param packetType: class of a packet
+		:type packetType: class
+		:return: boolean indicating if the event has been resolved
+		:rtype: bool
+		'''
+		packetClass = getattr(importlib.import_module(packetType.__module__), self.instance, None)
+		if isinstance(packetClass, type):
+			self.packetClass = packetClass
+		return self.packetClass is not None
+
+	def matches(self, packetType):
+		'''
+		This method indicates if the callback can be triggered by a packet of the provided class.
+
+		:param packetType: class of a packet
+		:type packetType: class
+		:return: boolean indicating if the callback can be triggered by this kind of packet
+		:rtype: bool
+		'''
+		if self.eventType == "npackets":
+			return True
+		if self.packetClass is None and not self.resolve(packetType):
+			return False
+		return issubclass(packetType, self.packetClass)
+
 	def update(self, packet):
 		'''
 		This method allows to update the callback's internal state by providing the current packet.
@@ -50,9 +88,7 @@ class Callback:
 					self.count = self.every
 					self.runnable = True
 			elif self.eventType == "instanceof":
-				m = importlib.import_module(packet.__module__)
-				if isinstance(packet, getattr(m, self.instance)):
-					self.runnable = True
+				self.runnable = self.matches(type(packet))
 
 
 	def run(self,packet):
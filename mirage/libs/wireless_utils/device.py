@@ -141,6 +141,7 @@ class SDRDevice(Device):
 	  * ``buildReceivePipeline(interface)`` : this method allows to build the receive pipeline
 	  * ``buildTransmitPieline(interface)`` : this method allows to build the transmit pipeline
 	  * ``setExperimentalDemodulator(enable)`` (optional) : this optional method allow to modify the receive pipeline to use an experimental demodulator (if any)
+	  * ``setBlockDemodulator(enable)`` (optional) : this optional method allow to modify the receive pipeline to use a block-based demodulator (if any)
 
 	Keep in mind that the child class must also implements the methods of a classic ``Device``.
 
@@ -153,7 +154,8 @@ class SDRDevice(Device):
 		"TX_GAIN":(["sink"],"setTXGain",int),
 		"BANDWIDTH":(["source","sink"],"setBandwidth",int),
 		"SAMPLE_RATE":(["source","sink"],"setSampleRate",int),
-		"EXPERIMENTAL_DEMODULATOR":(["device"],"setExperimentalDemodulator",booleanArg)
+		"EXPERIMENTAL_DEMODULATOR":(["device"],"setExperimentalDemodulator",booleanArg),
+		"BLOCK_DEMODULATOR":(["device"],"setBlockDemodulator",booleanArg)
 	}
 
 	def __init__(self,interface,sdrConfig={},sdrMode="HALF_DUPLEX"):
@@ -205,6 +207,7 @@ class SDRDevice(Device):
 		  * **BANDWIDTH**: Bandwidth (integer value)
 		  * **SAMPLE_RATE**: Sample Rate (integer value)
 		  * **EXPERIMENTAL_DEMODULATOR**: Use the experimental demodulator if available (boolean value)
+		  * **BLOCK_DEMODULATOR**: Use the block-based demodulator if available (boolean value)
 
 		:param sdrConfig: dictionary describing the SDR parameters name and their value as string
 		:type sdrConfig: dict
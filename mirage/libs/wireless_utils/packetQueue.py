@@ -1,5 +1,5 @@
 import time,threading
-from queue import Queue
+from queue import Queue,Full
 from mirage.libs.utils import exitMirage
 
 class StoppableThread(threading.Thread):
@@ -35,12 +35,22 @@ class PacketQueue:
 	Some parameters may be passed to the constructor :
 	  * waitEmpty : it indicates if the queue should wait for an empty queue before stopping
 	  * autoStart : it indicates if the queue shoud start immediatly after the instanciation of the class
+	  * queueSize : maximum number of packets stored in the queue (0 means unlimited), the packets received when the queue is full are dropped
+
+	The items of the queue are stored with their insertion time, allowing to provide some statistics (see ``getStatistics``).
 	'''
-	def __init__(self, waitEmpty = False, autoStart = True):
+	# Item inserted in the queue in order to wake up a watchdog blocked on it when the queue is stopped
+	STOP = object()
+
+	def __init__(self, waitEmpty = False, autoStart = True, queueSize = 0):
 		self.waitEmpty = waitEmpty
 		self.autoStart = autoStart
-		self.queue = Queue()
+		self.queue = Queue(maxsize=queueSize)
 		self.isStarted = False
+		self.processedPackets = 0
+		self.droppedPackets = 0
+		self.totalLatency = 0.0
+		self.maxLatency = 0.0
 		if self.isDeviceUp():
 			self.device.subscribe(self)
 			self.daemonThread = None
@@ -67,6 +77,7 @@ class PacketQueue:
 		if self.daemonThread is None:
 			self._createDaemonThread()
 		if not self.isStarted:
+			self._removeInterrupts()
 			self.daemonThread.start()
 		self.isStarted = True
 
@@ -80,6 +91,10 @@ class PacketQueue:
 				while not self.isEmpty():
 					time.sleep(0.05) # necessary ?
 			self.daemonThread.stop()
+			if self._interrupt() and self.daemonThread is not threading.current_thread():
+				# Lets the watchdog consume the interruption item before removing it (if it is still in the queue)
+				self.daemonThread.join(0.5)
+			self._removeInterrupts()
 			self.daemonThread = None
 			self.isStarted = False
 
@@ -112,6 +127,53 @@ class PacketQueue:
 		while not self.isEmpty():
 			self.queue.get(False)
 
+	def getStatistics(self):
+		'''
+		This method returns the statistics of the queue.
+
+		:return: dictionary indicating the number of queued packets, the number of processed packets, the number of dropped packets and the average and maximal latencies (in seconds) between the insertion of a packet and its processing
+		:rtype: dict
+
+		:Example:
+
+			>>> emitter.getStatistics()
+			{'queued': 0, 'processed': 152, 'dropped': 0, 'averageLatency': 0.00012, 'maxLatency': 0.0009}
+
+		'''
+		return {
+			"queued":self.queue.qsize(),
+			"processed":self.processedPackets,
+			"dropped":self.droppedPackets,
+			"averageLatency":self.totalLatency / self.processedPackets if self.processedPackets > 0 else 0.0,
+			"maxLatency":self.maxLatency
+		}
+
+	def _put(self,data,block=True):
+		try:
+			self.queue.put((time.time(),data),block=block)
+			return True
+		except Full:
+			self.droppedPackets += 1
+			return False
+
+	def _processed(self,insertionTime):
+		latency = time.time() - insertionTime
+		self.processedPackets += 1
+		self.totalLatency += latency
+		if latency > self.maxLatency:
+			self.maxLatency = latency
+
+	def _interrupt(self):
+		return False
+
+	def _removeInterrupts(self):
+		with self.queue.mutex:
+			items = [item for item in self.queue.queue if item is not PacketQueue.STOP]
+			if len(items) != len(self.queue.queue):
+				self.queue.queue.clear()
+				self.queue.queue.extend(items)
+				self.queue.not_full.notify_all()
+
 	def _task(self):
 		pass
 
@@ -1,8 +1,449 @@
 from mirage.libs import io,utils
 from mirage.libs.wireless_utils.device import Device
 from os.path import isfile
-from struct import unpack,pack
-import time
+from struct import unpack,unpack_from,pack
+from array import array
+from bisect import bisect_left
+from threading import Event,Lock
+from collections import deque
+from mirage.libs.wireless_utils.packetQueue import StoppableThread
+import time,mmap,os,errno
+
+class PCAPIndex:
+	'''
+	This class provides an index of the records stored in a PCAP file : it contains the offset and the timestamp of every record.
+	The index is built by scanning the records' headers of the memory mapped file, and can be stored in a sidecar file (``<filename>.idx``),
+	which is reused as long as the size and the modification time of the PCAP file are unchanged.
+
+	:param data: content of the PCAP file (e.g. ``mmap.mmap`` instance)
+	:type data: bytes-like object
+
+	:Example:
+
+		>>> index = PCAPIndex(data)
+		>>> len(index)
+		1337
+		>>> index.offsets[0],index.timestamps[0]
+		(24, 1577836800.25)
+
+	'''
+	MAGIC = b"MIRAGEIDX1"
+
+	def __init__(self,data=None):
+		self.offsets = array("Q")
+		self.timestamps = array("d")
+		if data is not None:
+			self.build(data)
+
+	def __len__(self):
+		return len(self.offsets)
+
+	def build(self,data,start=24):
+		'''
+		This method builds the index by scanning the records' headers.
+		A truncated record at the end of the file is not indexed.
+
+		:param data: content of the PCAP file
+		:type data: bytes-like object
+		:param start: offset of the first record
+		:type start: int
+		'''
+		offsets,timestamps = array("Q"),array("d")
+		offset,size = start,len(data)
+		while offset + 16 <= size:
+			ts_sec, ts_usec, length = unpack_from('<III',data,offset)
+			if offset + 16 + length > size:
+				break
+			offsets.append(offset)
+			timestamps.append(ts_sec + ts_usec/1000000)
+			offset += 16 + length
+		self.offsets,self.timestamps = offsets,timestamps
+
+	def find(self,timestamp):
+		'''
+		This method returns the number of the first record whose timestamp is greater or equal to the provided timestamp.
+
+		:param timestamp: timestamp
+		:type timestamp: float
+		:return: number of the record
+		:rtype: int
+		'''
+		return bisect_left(self.timestamps,timestamp)
+
+	def save(self,filename,size,mtime):
+		'''
+		This method stores the index in a sidecar file.
+
+		:param filename: sidecar filename
+		:type filename: str
+		:param size: size of the indexed PCAP file
+		:type size: int
+		:param mtime: modification time of the indexed PCAP file
+		:type mtime: float
+		:return: boolean indicating if the operation was successful
+		:rtype: bool
+		'''
+		try:
+			with open(filename,"wb") as f:
+				f.write(self.MAGIC + pack('<QdQ',size,mtime,len(self.offsets)))
+				self.offsets.tofile(f)
+				self.timestamps.tofile(f)
+			return True
+		except (IOError,OSError):
+			return False
+
+	@classmethod
+	def load(cls,filename,size,mtime):
+		'''
+		This class method loads an index from a sidecar file, if it matches the provided size and modification time.
+
+		:param filename: sidecar filename
+		:type filename: str
+		:param size: size of the indexed PCAP file
+		:type size: int
+		:param mtime: modification time of the indexed PCAP file
+		:type mtime: float
+		:return: index (or None if the sidecar file is missing or outdated)
+		:rtype: mirage.libs.wireless_utils.pcapDevice.PCAPIndex
+		'''
+		try:
+			with open(filename,"rb") as f:
+				header = f.read(len(cls.MAGIC) + 24)
+				if header[:len(cls.MAGIC)] != cls.MAGIC:
+					return None
+				indexedSize,indexedMtime,count = unpack('<QdQ',header[len(cls.MAGIC):])
+				if indexedSize != size or indexedMtime != mtime:
+					return None
+				index = cls()
+				index.offsets.fromfile(f,count)
+				index.timestamps.fromfile(f,count)
+				return index
+		except (IOError,OSError,EOFError,ValueError):
+			return None
+
+class PCAPRecords:
+	'''
+	This class provides a lazy sequence of the packets stored in a PCAP file, as tuples of (timestamp, packet).
+	The packets are encapsulated (using the ``buildPacket`` method of the PCAP Device) only when they are accessed.
+
+	:param device: PCAP Device in reading mode
+	:type device: mirage.libs.wireless_utils.pcapDevice.PCAPDevice
+
+	:Example:
+
+		>>> packets = device.getAllPackets()
+		>>> len(packets)
+		1337
+		>>> timestamp,packet = packets[42]
+
+	'''
+	def __init__(self,device):
+		self.device = device
+		self.numbers = range(device.getPacketCount())
+
+	def __len__(self):
+		return len(self.numbers)
+
+	def __getitem__(self,number):
+		if isinstance(number,slice):
+			records = PCAPRecords.__new__(PCAPRecords)
+			records.device,records.numbers = self.device,self.numbers[number]
+			return records
+		timestamp,packet = self.device.getRawPacket(self.numbers[number])
+		return (timestamp,self.device.buildPacket(bytes(packet),timestamp))
+
+	def __iter__(self):
+		for number in self.numbers:
+			timestamp,packet = self.device.getRawPacket(number)
+			yield (timestamp,self.device.buildPacket(bytes(packet),timestamp))
+
+class PCAPWriter:
+	'''
+	This class provides a buffered and asynchronous PCAP writer.
+	The records are stored in a bounded queue (the records provided when the queue is full are dropped and counted),
+	and a background thread, waking up every ``pollInterval`` seconds, coalesces them into large buffered writes. The buffer is written when it exceeds ``bufferSize`` bytes
+	or when ``flushInterval`` seconds elapsed since the last write.
+
+	The output can be rotated according to its size and / or its duration : if the filename contains a format specifier (e.g. ``capture-%03d.pcap``),
+	it is used to generate the successive filenames, otherwise a counter is appended to the filename (e.g. ``capture-001.pcap``).
+	The files are created when the first record is written (or when the writer is closed), so the writer can be configured before.
+
+	If ``pcapng`` is True, the records are written using the PCAPNG format, with one Interface Description Block per interface.
+
+	If an error occurs while writing the output (e.g. disk full), it is reported using ``io.fail`` and provided by ``getStatistics`` :
+	the writer stops, and the records which have not been written are counted as dropped.
+
+	:param filename: output filename (or filename pattern)
+	:type filename: str
+	:param dlt: DLT of the default interface
+	:type dlt: int
+	:param interfaceName: name of the default interface (PCAPNG only)
+	:type interfaceName: str
+	:param pcapng: boolean indicating if the PCAPNG format is used
+	:type pcapng: bool
+	:param maxSize: maximal size of a file (in bytes), None if the output is not rotated according to its size
+	:type maxSize: int
+	:param maxTime: maximal duration of a file (in seconds), None if the output is not rotated according to its duration
+	:type maxTime: float
+	:param bufferSize: size of the write buffer (in bytes)
+	:type bufferSize: int
+	:param flushInterval: maximal time (in seconds) between two writes
+	:type flushInterval: float
+	:param queueSize: maximal number of records stored in the queue
+	:type queueSize: int
+	:param pollInterval: time (in seconds) waited by the background thread when the queue is empty
+	:type pollInterval: float
+
+	:Example:
+
+		>>> writer = PCAPWriter("capture-%03d.pcap",dlt=256,maxSize=100*1024*1024)
+		>>> writer.put(bytes.fromhex("25d6be898e0006112233445566"),timestamp=time.time())
+		True
+		>>> writer.close()
+		>>> writer.getStatistics()
+		{'written': 1, 'dropped': 0, 'queued': 0, 'bytes': 69, 'files': ['capture-000.pcap'], 'error': None}
+
+	'''
+	def __init__(self,filename,dlt,interfaceName=None,pcapng=False,maxSize=None,maxTime=None,bufferSize=1024*1024,flushInterval=1.0,queueSize=65536,pollInterval=0.01):
+		self.filename = filename
+		self.interfaces = [(dlt,interfaceName)]
+		self.pcapng = pcapng
+		self.maxSize = maxSize
+		self.maxTime = maxTime
+		self.bufferSize = bufferSize
+		self.flushInterval = flushInterval
+		self.pollInterval = pollInterval
+		self.queueSize = queueSize
+		self.queue = deque()
+		self.lock = Lock()
+		self.buffer = bytearray()
+		self.file = None
+		self.fileNumber = 0
+		self.fileSize = 0
+		self.fileStart = None
+		self.lastFlush = time.time()
+		self.files = []
+		self.bufferedRecords = 0
+		self.writtenRecords = 0
+		self.droppedRecords = 0
+		self.writtenBytes = 0
+		self.error = None
+		self.closed = False
+		self.thread = StoppableThread(target=self._task)
+		self.thread.start()
+
+	def addInterface(self,dlt,interfaceName=None):
+		'''
+		This method adds an interface, allowing to write records using another DLT (PCAPNG only).
+
+		:param dlt: DLT of the interface
+		:type dlt: int
+		:param interfaceName: name of the interface
+		:type interfaceName: str
+		:return: identifier of the interface
+		:rtype: int
+		'''
+		with self.lock:
+			self.interfaces.append((dlt,interfaceName))
+			if self.file is not None and self.pcapng:
+				self.buffer += self._interfaceBlock(dlt,interfaceName)
+		return len(self.interfaces) - 1
+
+	def configure(self,pcapng=None,maxSize=None,maxTime=None,rotate=True):
+		'''
+		This method modifies the format and the rotation parameters of the writer.
+		If a file has already been created, the new format is used from the next file.
+		The parameters which are not provided keep their current value.
+
+		:param pcapng: boolean indicating if the PCAPNG format is used (None to keep the current format)
+		:type pcapng: bool
+		:param maxSize: maximal size of a file (in bytes), None to keep the current value
+		:type maxSize: int
+		:param maxTime: maximal duration of a file (in seconds), None to keep the current value
+		:type maxTime: float
+		:param rotate: boolean indicating if the output is rotated (False removes the current maximal size and duration)
+		:type rotate: bool
+		'''
+		with self.lock:
+			if pcapng is not None and pcapng != self.pcapng:
+				self.pcapng = pcapng
+				if self.file is not None:
+					self._rotate()
+			if not rotate:
+				self.maxSize = None
+				self.maxTime = None
+			if maxSize is not None:
+				self.maxSize = maxSize
+			if maxTime is not None:
+				self.maxTime = maxTime
+
+	def put(self,data,timestamp=None,interface=0):
+		'''
+		This method adds a record to the queue.
+
+		:param data: packet to write
+		:type data: bytes
+		:param timestamp: timestamp of the packet (current time if None)
+		:type timestamp: float
+		:param interface: identifier of the interface (PCAPNG only)
+		:type interface: int
+		:return: boolean indicating if the record has been queued (False if it has been dropped)
+		:rtype: bool
+		'''
+		if self.closed:
+			return False
+		if self.error is not None or len(self.queue) >= self.queueSize:
+			self.droppedRecords += 1
+			return False
+		self.queue.append((time.time() if timestamp is None else timestamp,bytes(data),interface))
+		return True
+
+	def _filename(self):
+		if "%" in self.filename:
+			return self.filename % self.fileNumber
+		if self.fileNumber == 0 and self.maxSize is None and self.maxTime is None:
+			return self.filename
+		base,extension = os.path.splitext(self.filename)
+		return "{}-{:03d}{}".format(base,self.fileNumber,extension)
+
+	def _interfaceBlock(self,dlt,interfaceName):
+		options = b""
+		if interfaceName is not None:
+			name = interfaceName.encode()
+			options += pack('<HH',2,len(name)) + name + b"\x00"*(-len(name) % 4)
+			options += pack('<HH',0,0)
+		length = 20 + len(options)
+		return pack('<IIHHI',1,length,dlt,0,65535) + options + pack('<I',length)
+
+	def _header(self):
+		if self.pcapng:
+			header = pack('<IIIHHqI',0x0A0D0D0A,28,0x1A2B3C4D,1,0,-1,28)
+			for dlt,interfaceName in self.interfaces:
+				header += self._interfaceBlock(dlt,interfaceName)
+			return header
+		return pack('<IHHIIII',0xa1b2c3d4,2,4,0,0,65535,self.interfaces[0][0])
+
+	def _record(self,timestamp,data,interface):
+		if self.pcapng:
+			microseconds = int(round(timestamp * 1000000))
+			padding = -len(data) % 4
+			length = 32 + len(data) + padding
+			return (pack('<IIIIIII',6,length,interface,microseconds >> 32,microseconds & 0xFFFFFFFF,len(data),len(data)) +
+				data + b"\x00"*padding + pack('<I',length))
+		ts_sec = int(timestamp)
+		ts_usec = int((timestamp - ts_sec)*1000000)
+		return pack('<IIII',ts_sec,ts_usec,len(data),len(data)) + data
+
+	def _open(self,timestamp):
+		filename = self._filename()
+		self.file = open(filename,"wb")
+		self.files.append(filename)
+		self.fileSize = 0
+		self.fileStart = timestamp
+		self.buffer += self._header()
+
+	def _flush(self):
+		if self.file is not None and self.buffer:
+			self.file.write(self.buffer)
+			self.file.flush()
+			self.writtenBytes += len(self.buffer)
+			self.fileSize += len(self.buffer)
+			self.buffer = bytearray()
+			self.writtenRecords += self.bufferedRecords
+			self.bufferedRecords = 0
+		self.lastFlush = time.time()
+
+	def _rotate(self):
+		self._flush()
+		self.file.close()
+		self.file = None
+		self.fileNumber += 1
+
+	def _write(self,timestamp,data,interface):
+		record = self._record(timestamp,data,interface)
+		if self.file is not None and (
+			(self.maxSize is not None and self.fileSize + len(self.buffer) + len(record) > self.maxSize) or
+			(self.maxTime is not None and timestamp - self.fileStart >= self.maxTime)
+		):
+			self._rotate()
+		if self.file is None:
+			self._open(timestamp)
+		self.buffer += record
+		self.bufferedRecords += 1
+
+	def _drain(self):
+		while self.queue:
+			self._write(*self.queue.popleft())
+			if len(self.buffer) >= self.bufferSize:
+				self._flush()
+
+	def _fail(self,error):
+		self.error = error
+		io.fail("Unable to write the PCAP file "+(self.files[-1] if self.files else self._filename())+" : "+str(error))
+		self.droppedRecords += self.bufferedRecords + len(self.queue)
+		self.bufferedRecords = 0
+		self.queue.clear()
+		self.buffer = bytearray()
+		if self.file is not None:
+			try:
+				self.file.close()
+			except (IOError,OSError):
+				pass
+			self.file = None
+		self.thread.stop()
+
+	def _task(self):
+		if not self.queue:
+			time.sleep(self.pollInterval)
+		with self.lock:
+			if self.error is not None:
+				return
+			# The exceptions would be silently ignored by the background thread
+			try:
+				self._drain()
+				if self.buffer and time.time() - self.lastFlush >= self.flushInterval:
+					self._flush()
+			except Exception as e:
+				self._fail(e)
+
+	def close(self):
+		'''
+		This method stops the background thread, writes the remaining records and closes the file.
+		'''
+		if self.closed:
+			return
+		self.closed = True
+		self.thread.stop()
+		self.thread.join()
+		with self.lock:
+			if self.error is not None:
+				return
+			try:
+				self._drain()
+				if self.file is None and not self.files:
+					self._open(time.time())
+				self._flush()
+				if self.file is not None:
+					self.file.close()
+					self.file = None
+			except Exception as e:
+				self._fail(e)
+
+	def getStatistics(self):
+		'''
+		This method returns the statistics of the writer.
+
+		:return: dictionary indicating the number of written, dropped and queued records, the number of written bytes, the list of created files and the error which stopped the writer (or None)
+		:rtype: dict
+		'''
+		return {
+			"written":self.writtenRecords,
+			"dropped":self.droppedRecords,
+			"queued":len(self.queue),
+			"bytes":self.writtenBytes,
+			"files":list(self.files),
+			"error":str(self.error) if self.error is not None else None
+		}
 
 class PCAPDevice(Device):
 	'''
@@ -18,11 +459,17 @@ class PCAPDevice(Device):
 
 	The ``send`` and ``recv`` methods uses the timestamp in order to write and read the pcap "in real time".
 	The ``putPacket``, ``getPacket`` and ``getAllPackets`` methods allow to manipulate directly the packets without taking into account the timestamp values.
+
+	In reading mode, the file is memory mapped and indexed (the index is stored in a sidecar file named ``<filename>.idx``) :
+	the packets can be accessed randomly (``getRawPacket``, ``seek``, ``seekTime``) and the replay speed of ``recv`` can be modified (``setReplaySpeed``).
+
+	In writing mode, the packets are written by a buffered and asynchronous writer (``mirage.libs.wireless_utils.pcapDevice.PCAPWriter``) :
+	the output can be rotated or written using the PCAPNG format (``configureWriter``).
 	'''
 	DLT = 0
 	SCAPY_LAYER = None
 
-	sharedMethods = ["putPacket", "getPacket", "getAllPackets","startReading","stopReading","getMode"] 
+	sharedMethods = ["putPacket", "getPacket", "getAllPackets","startReading","stopReading","getMode","getPacketCount","getRawPacket","seek","seekTime","setReplaySpeed","configureWriter","getWriterStatistics"]
 
 	def __init__(self,interface):
 		super().__init__(interface=interface)
@@ -33,6 +480,13 @@ class PCAPDevice(Device):
 		self.initialTimestamp = None
 		self.beginningTimestamp = None
 		self.mode = None
+		self.data = None
+		self.index = None
+		self.offset = 24
+		self.position = 0
+		self.replaySpeed = 1.0
+		self.readingEvent = Event()
+		self.writer = None
 		if interface[-5:] == ".pcap":
 			self.openFile()
 
@@ -45,13 +499,21 @@ class PCAPDevice(Device):
 			try:
 				self.mode = "read"
 				self.file = open(self.filename,"rb")
+				if os.fstat(self.file.fileno()).st_size > 0:
+					self.data = mmap.mmap(self.file.fileno(),0,access=mmap.ACCESS_READ)
+				else:
+					self.data = b""
+				self.index = None
+				self.offset = 24
+				self.position = 0
 
 			except IOError as e:
 				if e.errno == errno.EACCES:
 					io.fail("You don't have permissions to access this file !")
 		else:
 			self.mode = "write"
-			self.file = open(self.filename,"wb")
+			self.file = None
+
 	def getMode(self):
 		'''
 		This method returns the mode used by this PCAP Device.
@@ -76,42 +538,79 @@ class PCAPDevice(Device):
 		This method starts the reading mode.
 		'''
 		self.reading = True
+		self.readingEvent.set()
 
 	def stopReading(self):
 		'''
 		This method stops the reading mode.
 		'''
 		self.reading = False
+		self.readingEvent.clear()
 
 	def _readHeader(self):
 		try:
-			header = self.file.read(24)
-			magic,*others,dlt =  unpack('<IHHIIII',header)
+			magic,*others,dlt =  unpack_from('<IHHIIII',self.data,0)
 			return (magic,dlt, True)
 		except Exception as e:
 			print(e)
 			return (-1,-1, False)
 
 	def _addHeader(self):
-		dlt = self.DLT
-		magic = 0xa1b2c3d4
-		header = pack('<IHHIIII',
-			magic,
-			2,
-			4,
-			0,
-			0,
-			65535,
-			dlt
-		)
 		try:
-			self.file.write(header)
-			return (magic,dlt,True)
+			self.writer = PCAPWriter(self.filename,self.DLT,interfaceName=self.interface)
+			return (0xa1b2c3d4,self.DLT,True)
 		except Exception as e:
 			print(e)
 			return (-1,-1,False)
-		
-	
+
+	def configureWriter(self,pcapng=None,maxSize=None,maxTime=None,rotate=True):
+		'''
+		This method configures the output format and the rotation of the PCAP file (writing mode).
+		If some rotation parameters are provided, the files are named according to the provided filename (e.g. ``capture-%03d.pcap``, or ``capture-000.pcap``, ``capture-001.pcap``... if the filename is ``capture.pcap``).
+		The parameters which are not provided keep their current value.
+
+		:param pcapng: boolean indicating if the PCAPNG format is used (None to keep the current format)
+		:type pcapng: bool
+		:param maxSize: maximal size of a file (in bytes), None to keep the current value
+		:type maxSize: int
+		:param maxTime: maximal duration of a file (in seconds), None to keep the current value
+		:type maxTime: float
+		:param rotate: boolean indicating if the output is rotated (False removes the current maximal size and duration)
+		:type rotate: bool
+
+		:Example:
+
+			>>> device.configureWriter(maxSize=100*1024*1024) # 100 MB per file
+			>>> device.configureWriter(pcapng=True, maxTime=3600) # one PCAPNG file per hour, each file is also limited to 100 MB
+			>>> device.configureWriter(rotate=False) # a single file
+
+		.. note::
+
+			This method is a **shared method** and can be called from the corresponding Emitters / Receivers.
+
+		'''
+		if self.writer is not None:
+			self.writer.configure(pcapng=pcapng,maxSize=maxSize,maxTime=maxTime,rotate=rotate)
+
+	def getWriterStatistics(self):
+		'''
+		This method returns the statistics of the PCAP writer (writing mode).
+
+		:return: dictionary indicating the number of written, dropped and queued packets, the number of written bytes, the list of created files and the error which stopped the writer (or None)
+		:rtype: dict
+
+		:Example:
+
+			>>> device.getWriterStatistics()
+			{'written': 1337, 'dropped': 0, 'queued': 0, 'bytes': 70123, 'files': ['capture.pcap'], 'error': None}
+
+		.. note::
+
+			This method is a **shared method** and can be called from the corresponding Emitters / Receivers.
+
+		'''
+		return self.writer.getStatistics() if self.writer is not None else None
+
 	def send(self,packet):
 		'''
 		This method writes a packet synchronously into the PCAP file.
@@ -125,7 +624,18 @@ class PCAPDevice(Device):
 			self.putPacket(packet)
 
 	def close(self):
-		self.file.close()
+		if self.writer is not None:
+			self.writer.close()
+			self.writer = None
+		if self.mode == "read" and isinstance(self.data,mmap.mmap):
+			try:
+				self.data.close()
+			except BufferError:
+				# Some packets returned by getRawPacket are still referenced : the file is unmapped when the last of them is released
+				pass
+		self.data = None
+		if self.file is not None:
+			self.file.close()
 
 	def isUp(self):
 		return self.ready
@@ -149,6 +659,7 @@ class PCAPDevice(Device):
 	def putPacket(self,data,timestamp = None):
 		'''
 		This method writes a packet asynchronously into the PCAP file.
+		The packet is queued and written by a background thread : if the queue is full, the packet is dropped.
 	
 		:param data: packet to write
 		:type data: bytes or scapy frame (if `SCAPY_LAYER` is not None)
@@ -158,24 +669,127 @@ class PCAPDevice(Device):
 		:rtype: bool
 		'''
 		try:
-			if timestamp is None:
-				timestamp = time.time()
-			ts_sec = int(timestamp)
-			ts_usec = int((timestamp - ts_sec)*1000000)
-			header = pack(
-			'<IIII',
-			ts_sec,
-			ts_usec,
-			len(data),
-			len(data)
-			)
-			self.file.write(header)
-			self.file.write(data)
-			return True
+			return self.writer.put(data,timestamp)
 		except Exception as e:
 			print(e)
 			return False
 
+	def _getIndex(self):
+		if self.index is None:
+			stat = os.stat(self.filename)
+			self.index = PCAPIndex.load(self.filename+".idx",stat.st_size,stat.st_mtime)
+			if self.index is None:
+				self.index = PCAPIndex(self.data)
+				self.index.save(self.filename+".idx",stat.st_size,stat.st_mtime)
+		return self.index
+
+	def getPacketCount(self):
+		'''
+		This method returns the number of packets stored in the PCAP file (reading mode).
+
+		:return: number of packets
+		:rtype: int
+
+		:Example:
+
+			>>> device.getPacketCount()
+			1337
+
+		.. note::
+
+			This method is a **shared method** and can be called from the corresponding Emitters / Receivers.
+
+		'''
+		return len(self._getIndex()) if self.mode == "read" else 0
+
+	def getRawPacket(self,number):
+		'''
+		This method returns a specific packet stored in the PCAP file (reading mode), without copying or encapsulating it.
+		The ``memoryview`` remains valid after the device is closed (e.g. when ``recv`` reaches the end of the file) : the file is unmapped when the last view is released.
+		Use ``bytes(packet)`` to keep a copy of a packet without keeping the file mapped.
+
+		:param number: number of the packet (starting from 0)
+		:type number: int
+		:return: tuple of (timestamp, packet), the packet being a ``memoryview`` on the memory mapped file
+		:rtype: tuple of (float, memoryview)
+
+		:Example:
+
+			>>> timestamp,packet = device.getRawPacket(42)
+			>>> bytes(packet[:4]).hex()
+			'd6be898e'
+
+		.. note::
+
+			This method is a **shared method** and can be called from the corresponding Emitters / Receivers.
+
+		'''
+		index = self._getIndex()
+		offset = index.offsets[number]
+		length = unpack_from('<I',self.data,offset+8)[0]
+		return (index.timestamps[number],memoryview(self.data)[offset+16:offset+16+length])
+
+	def seek(self,number):
+		'''
+		This method moves the reading position to a specific packet (reading mode) : it will be the next packet returned by ``getPacket`` or ``recv``.
+
+		:param number: number of the packet (starting from 0)
+		:type number: int
+
+		:Example:
+
+			>>> device.seek(0) # rewind
+
+		.. note::
+
+			This method is a **shared method** and can be called from the corresponding Emitters / Receivers.
+
+		'''
+		index = self._getIndex()
+		self.position = max(0,min(number,len(index)))
+		self.offset = index.offsets[self.position] if self.position < len(index) else len(self.data)
+		self.initialTimestamp = None
+
+	def seekTime(self,seconds):
+		'''
+		This method moves the reading position to the first packet captured at least ``seconds`` seconds after the first packet of the file (reading mode).
+
+		:param seconds: time (in seconds) relative to the first packet
+		:type seconds: float
+
+		:Example:
+
+			>>> device.seekTime(120.5)
+
+		.. note::
+
+			This method is a **shared method** and can be called from the corresponding Emitters / Receivers.
+
+		'''
+		index = self._getIndex()
+		if len(index) > 0:
+			self.seek(index.find(index.timestamps[0] + seconds))
+
+	def setReplaySpeed(self,speed=1.0):
+		'''
+		This method modifies the replay speed used by ``recv`` (reading mode).
+
+		:param speed: speed factor (1.0 replays the packets in real time, N replays them N times faster, None or 0 replays them as fast as possible)
+		:type speed: float
+
+		:Example:
+
+			>>> device.setReplaySpeed(10) # 10x
+			>>> device.setReplaySpeed(None) # as fast as possible
+
+		.. note::
+
+			This method is a **shared method** and can be called from the corresponding Emitters / Receivers.
+
+		'''
+		self.replaySpeed = speed if speed else None
+		self.initialTimestamp = None
+
 	def getPacket(self):
 		'''
 		This method reads a packet asynchronously from the PCAP file and returns it to the user.
@@ -184,11 +798,12 @@ class PCAPDevice(Device):
 		:rtype: tuple of (bool,tuple of (float,bytes))
 		'''
 		try:
-			header = self.file.read(16)
-			ts_sec, ts_usec, length1, length2 = unpack('<IIII',header)
-			
-			packet = self.file.read(length1)
-
+			ts_sec, ts_usec, length1, length2 = unpack_from('<IIII',self.data,self.offset)
+			if self.offset + 16 + length1 > len(self.data):
+				return (False,None)
+			packet = self.data[self.offset+16:self.offset+16+length1]
+			self.offset += 16 + length1
+			self.position += 1
 			return (True,(ts_sec + ts_usec/1000000,packet))
 		except:
 			return (False,None)
@@ -196,21 +811,13 @@ class PCAPDevice(Device):
 	def getAllPackets(self):
 		'''
 		This method gets all packets stored in the PCAP file asynchronously and returns them.
+		The packets are encapsulated only when they are accessed.
 	
-		:return: list of packets (tuple of (timestamp, packet))
-		:rtype: list of tuple of (timestamp, packet)
+		:return: sequence of packets (tuple of (timestamp, packet))
+		:rtype: mirage.libs.wireless_utils.pcapDevice.PCAPRecords
 		'''
 		if self.mode == "read":
-			packetList = []
-			while True:
-				success,data = self.getPacket()
-				if not success:
-					break
-				else:
-					timestamp,packet = data
-					packetList.append((timestamp,self.buildPacket(packet, timestamp)))
-
-			return packetList
+			return PCAPRecords(self)
 
 
 	def buildPacket(self,packet,timestamp):
@@ -223,20 +830,21 @@ class PCAPDevice(Device):
 
 	def recv(self):
 		'''
-		This method gets the packets from the PCAP file asynchronously.
+		This method gets the packets from the PCAP file asynchronously, according to the replay speed.
 		'''
 		if self.mode == "read":
-			while not self.reading:
-				utils.wait(seconds=0.00001)
+			if not self.readingEvent.wait(timeout=0.1):
+				return None
 			success,data = self.getPacket()
 			if success:
 				timestamp,packet = data
 				if self.initialTimestamp is None:
 					self.initialTimestamp = timestamp
 					self.beginningTimestamp = utils.now()
-				else:
-					while timestamp - self.initialTimestamp > (utils.now() - self.beginningTimestamp):
-						utils.wait(seconds=0.00001)
+				elif self.replaySpeed is not None:
+					delay = (timestamp - self.initialTimestamp) / self.replaySpeed - (utils.now() - self.beginningTimestamp)
+					if delay > 0:
+						time.sleep(delay)
 				return self.buildPacket(packet,timestamp)
 			else:
 				self.publish("stop")
@@ -0,0 +1,162 @@
+from threading import Lock
+
+class ChannelScheduler:
+	'''
+	This class implements an adaptive channel hopping scheduler, allowing a scan module to spend its time on the channels where something has been discovered recently.
+
+	The scan module calls ``next`` to move to the next channel (the provided ``setChannel`` function is called, e.g. ``receiver.setChannel``) and waits for the returned dwell time,
+	while its callbacks indicate the discoveries (new device, new channel of a device ...) by calling ``hit``.
+
+	The yield of a channel is the average number of hits per visit, exponentially weighted (recent visits count more).
+	The channels are visited using a smooth weighted round robin, the weight of a channel being ``1 + boost * yield`` :
+
+		* a channel without any hit is visited as often as in a round robin, during ``minDwellTime``
+		* a channel with hits is visited more often, and its dwell time increases with its yield (up to ``maxDwellTime``)
+		* a channel which has not been visited during ``maxRevisitTime`` seconds is visited next (the most overdue channel first)
+
+	The times are counted using the dwell times returned by the scheduler (not the wall clock), so the scheduling only depends on the hits.
+
+	:param channels: list of channels to scan
+	:type channels: list
+	:param setChannel: function called with the channel to use
+	:type setChannel: function
+	:param dwellTime: reference dwell time (in seconds), used to compute the default values of the other parameters
+	:type dwellTime: float
+	:param minDwellTime: dwell time of a channel without hit (default: ``dwellTime / 4``)
+	:type minDwellTime: float
+	:param maxDwellTime: maximal dwell time of a channel (default: ``dwellTime * 2``)
+	:type maxDwellTime: float
+	:param maxRevisitTime: maximal time between two visits of a channel (default: ``dwellTime * len(channels)``, the period of a round robin using ``dwellTime``)
+	:type maxRevisitTime: float
+	:param decay: weight of the previous visits in the yield of a channel (between 0 and 1)
+	:type decay: float
+	:param boost: additional weight given to a channel by a yield of one hit per visit
+	:type boost: float
+
+	:Example:
+
+		>>> scheduler = ChannelScheduler(list(range(100)),receiver.setChannel,dwellTime=0.1)
+		>>> receiver.onEvent("*",callback=lambda packet:scheduler.hit(packet.additionalInformations.channel))
+		>>> while True:
+		...	channel,dwellTime = scheduler.next()
+		...	utils.wait(seconds=dwellTime)
+
+	'''
+	def __init__(self,channels,setChannel=None,dwellTime=0.1,minDwellTime=None,maxDwellTime=None,maxRevisitTime=None,decay=0.5,boost=4.0):
+		self.channels = list(channels)
+		self.setChannel = setChannel
+		self.minDwellTime = minDwellTime if minDwellTime is not None else dwellTime / 4
+		self.maxDwellTime = maxDwellTime if maxDwellTime is not None else max(dwellTime * 2,self.minDwellTime)
+		self.maxRevisitTime = maxRevisitTime if maxRevisitTime is not None else dwellTime * len(self.channels)
+		self.decay = decay
+		self.boost = boost
+		self.lock = Lock()
+		self.time = 0.0
+		self.current = None
+		self.statistics = {channel:{"visits":0,"hits":0,"dwellTime":0.0,"yield":0.0,"lastVisit":None} for channel in self.channels}
+		self.pendingHits = {channel:0 for channel in self.channels}
+		self.credits = {channel:0.0 for channel in self.channels}
+
+	def hit(self,channel=None,count=1):
+		'''
+		This method indicates that something has been discovered on a channel.
+		It can be called from the receiver's callbacks.
+
+		:param channel: channel of the discovery (None means the current channel)
+		:type channel: int
+		:param count: number of discoveries
+		:type count: int
+		'''
+		with self.lock:
+			channel = self.current if channel is None else channel
+			if channel in self.pendingHits:
+				self.pendingHits[channel] += count
+
+	def _update(self):
+		with self.lock:
+			pendingHits = self.pendingHits
+			self.pendingHits = {channel:0 for channel in self.channels}
+		for channel,hits in pendingHits.items():
+			statistics = self.statistics[channel]
+			statistics["hits"] += hits
+			if channel == self.current:
+				statistics["yield"] = self.decay * statistics["yield"] + (1 - self.decay) * hits
+			elif hits > 0: # discovery on another channel (e.g. a device advertising its channel)
+				statistics["yield"] += (1 - self.decay) * hits
+
+	def _select(self):
+		overdue = None
+		for channel in self.channels:
+			lastVisit = self.statistics[channel]["lastVisit"]
+			if lastVisit is None:
+				lastVisit = -self.maxRevisitTime
+			if self.time - lastVisit >= self.maxRevisitTime and (overdue is None or lastVisit < overdueLastVisit):
+				overdue,overdueLastVisit = channel,lastVisit
+		total = 0.0
+		selected = None
+		for channel in self.channels:
+			weight = 1 + self.boost * self.statistics[channel]["yield"]
+			self.credits[channel] += weight
+			total += weight
+			if selected is None or self.credits[channel] > self.credits[selected]:
+				selected = channel
+		if overdue is not None:
+			selected = overdue
+		self.credits[selected] -= total
+		return selected
+
+	def _getDwellTime(self,channel):
+		channelYield = self.statistics[channel]["yield"]
+		if channelYield <= 0:
+			return self.minDwellTime
+		return min(self.maxDwellTime,self.minDwellTime + (self.maxDwellTime - self.minDwellTime) * channelYield)
+
+	def next(self):
+		'''
+		This method updates the yields according to the hits of the last visit, selects the next channel and calls ``setChannel``.
+
+		:return: tuple of (channel, dwell time in seconds)
+		:rtype: tuple of (int, float)
+		'''
+		self._update()
+		channel = self._select()
+		dwellTime = self._getDwellTime(channel)
+		statistics = self.statistics[channel]
+		statistics["visits"] += 1
+		statistics["dwellTime"] += dwellTime
+		statistics["lastVisit"] = self.time
+		with self.lock:
+			self.current = channel
+		self.time += dwellTime
+		if self.setChannel is not None:
+			self.setChannel(channel)
+		return (channel,dwellTime)
+
+	def getChannel(self):
+		'''
+		This method returns the channel currently scanned.
+
+		:return: current channel (None if ``next`` has not been called)
+		:rtype: int
+		'''
+		return self.current
+
+	def getStatistics(self):
+		'''
+		This method returns the statistics of every channel.
+
+		:return: dictionary indexed by channel, indicating the number of visits, the number of hits, the total dwell time (in seconds), the yield and the time of the last visit (in scheduled seconds)
+		:rtype: dict
+
+		:Example:
+
+			>>> scheduler.getStatistics()[5]
+			{'visits': 12, 'hits': 3, 'dwellTime': 1.525, 'yield': 0.375, 'lastVisit': 9.85}
+
+		'''
+		with self.lock:
+			pendingHits = dict(self.pendingHits)
+		statistics = {channel:dict(statistics) for channel,statistics in self.statistics.items()}
+		for channel,hits in pendingHits.items():
+			statistics[channel]["hits"] += hits
+		return statistics
@@ -0,0 +1,334 @@
+import time
+from threading import Lock
+from queue import Queue,Empty,Full
+from mirage.libs.wireless_utils.packetQueue import StoppableThread
+
+'''
+This submodule provides a serial transport shared by the devices communicating with a serial dongle (e.g. BTLEJack, NRFSniffer, Sniffle).
+A reader thread reads the available bytes in bulk, a framer extracts the complete frames according to the firmware's framing,
+and the frames are stored in a queue until they are received by the device.
+'''
+
+class Framer:
+	'''
+	This class defines the standard behaviour of a framer, used by a ``SerialTransport`` to extract the frames from the received bytes.
+	Every framer must inherit of this class and implement the method ``parse``.
+	'''
+	def __init__(self):
+		self.discardedBytes = 0
+
+	def parse(self,buffer):
+		'''
+		This method extracts the complete frames from the provided buffer.
+		The consumed bytes (frames and garbage) must be removed from the buffer, the incomplete frame must be kept.
+
+		:param buffer: bytes received from the serial port
+		:type buffer: bytearray
+		:return: list of complete frames
+		:rtype: list of bytes
+		'''
+		return []
+
+class HeaderLengthFramer(Framer):
+	'''
+	This framer extracts the frames starting with a specific header byte and including a little endian length field (e.g. BTLEJack).
+
+	:param header: value of the header byte
+	:type header: int
+	:param lengthOffset: offset of the 16 bits length field
+	:type lengthOffset: int
+	:param overhead: number of bytes of the frame not counted by the length field
+	:type overhead: int
+
+	:Example:
+
+		>>> framer = HeaderLengthFramer(header=0xBC,lengthOffset=2,overhead=5)
+		>>> framer.parse(bytearray(bytes.fromhex("00bc010100aa55bc")))
+		[b'\xbc\x01\x01\x00\xaaU']
+
+	'''
+	def __init__(self,header=0xBC,lengthOffset=2,overhead=5):
+		super().__init__()
+		self.header = header
+		self.lengthOffset = lengthOffset
+		self.overhead = overhead
+
+	def parse(self,buffer):
+		frames = []
+		while buffer:
+			start = buffer.find(self.header)
+			if start == -1:
+				self.discardedBytes += len(buffer)
+				del buffer[:]
+				break
+			if start > 0:
+				self.discardedBytes += start
+				del buffer[:start]
+			if len(buffer) < self.lengthOffset + 2:
+				break
+			size = buffer[self.lengthOffset] | (buffer[self.lengthOffset+1] << 8)
+			if len(buffer) < size + self.overhead:
+				break
+			frames.append(bytes(buffer[:size + self.overhead]))
+			del buffer[:size + self.overhead]
+		return frames
+
+class SLIPFramer(Framer):
+	'''
+	This framer extracts the SLIP encoded frames (e.g. NRFSniffer), and decodes them.
+	If a validation function is provided, the decoded frames not validated by this function are discarded.
+
+	:param start: value of the start byte
+	:type start: int
+	:param end: value of the end byte
+	:type end: int
+	:param escape: value of the escape byte
+	:type escape: int
+	:param escapes: dictionary indicating the decoded byte of each byte following the escape byte
+	:type escapes: dict of int: int
+	:param validate: function returning a boolean indicating if the provided decoded frame is valid
+	:type validate: function
+
+	:Example:
+
+		>>> framer = SLIPFramer(start=0xAB,end=0xBC,escape=0xCD,escapes={0xAC:0xAB,0xBD:0xBC,0xCE:0xCD})
+		>>> framer.parse(bytearray(b"\x00\xab\x01\xcd\xac\xbc"))
+		[b'\x01\xab']
+
+	'''
+	def __init__(self,start,end,escape=None,escapes={},validate=None):
+		super().__init__()
+		self.start = start
+		self.end = end
+		self.escape = bytes([escape]) if escape is not None else None
+		self.escapes = {code:bytes([value]) for code,value in escapes.items()}
+		self.validate = validate
+
+	def _decode(self,frame):
+		if self.escape is None or self.escape not in frame:
+			return frame
+		parts = frame.split(self.escape)
+		decoded = [parts[0]]
+		for part in parts[1:]:
+			if part and part[0] in self.escapes:
+				decoded += [self.escapes[part[0]],part[1:]]
+			else:
+				decoded += [self.escape,part]
+		return b"".join(decoded)
+
+	def parse(self,buffer):
+		frames = []
+		while buffer:
+			start = buffer.find(self.start)
+			if start == -1:
+				self.discardedBytes += len(buffer)
+				del buffer[:]
+				break
+			end = buffer.find(self.end,start+1)
+			if end == -1:
+				if start > 0:
+					self.discardedBytes += start
+					del buffer[:start]
+				break
+			frame = self._decode(bytes(buffer[start+1:end]))
+			self.discardedBytes += start
+			del buffer[:end+1]
+			if self.validate is None or self.validate(frame):
+				frames.append(frame)
+			else:
+				self.discardedBytes += end - start + 1
+		return frames
+
+class LineFramer(Framer):
+	'''
+	This framer extracts the frames transmitted as lines (e.g. base64 encoded frames of Sniffle), and decodes them using the provided function.
+	The lines that can't be decoded are discarded.
+
+	:param decoder: function decoding a line (without the line terminators)
+	:type decoder: function
+
+	:Example:
+
+		>>> framer = LineFramer(decoder=b64decode)
+		>>> framer.parse(bytearray(b"AQI=\r\nAw"))
+		[b'\x01\x02']
+
+	'''
+	def __init__(self,decoder=None):
+		super().__init__()
+		self.decoder = decoder
+
+	def parse(self,buffer):
+		frames = []
+		end = buffer.rfind(b"\n")
+		if end == -1:
+			return frames
+		lines = bytes(buffer[:end]).split(b"\n")
+		del buffer[:end+1]
+		for line in lines:
+			line = line.rstrip()
+			try:
+				frames.append(self.decoder(line) if self.decoder is not None else line)
+			except Exception:
+				self.discardedBytes += len(line)
+		return frames
+
+class SerialTransport:
+	'''
+	This class implements a serial transport : a reader thread reads the available bytes of a serial port in bulk (``read(in_waiting or 1)``),
+	extracts the complete frames using the provided framer and stores them in a queue. The ``recv`` method blocks on this queue.
+
+	:param port: serial port (``serial.Serial`` instance)
+	:type port: serial.Serial
+	:param framer: framer used to extract the frames
+	:type framer: mirage.libs.wireless_utils.serialTransport.Framer
+	:param queueSize: maximum number of frames stored in the queue (0 means unlimited), the frames received when the queue is full are dropped
+	:type queueSize: int
+	:param readTimeout: maximum time (in seconds) spent by the reader thread waiting for a byte
+	:type readTimeout: float
+
+	:Example:
+
+		>>> transport = SerialTransport(Serial(port="/dev/ttyACM0",baudrate=115200),HeaderLengthFramer(header=0xBC))
+		>>> transport.start()
+		>>> transport.send(bytes.fromhex("bc01000000"))
+		>>> transport.recv(timeout=1.0)
+		b'\xbc\x01\x04\x00\x03\x00\x0e\x00\x00'
+
+	'''
+	def __init__(self,port,framer,queueSize=0,readTimeout=0.05):
+		self.port = port
+		self.framer = framer
+		self.readTimeout = readTimeout
+		self.queue = Queue(maxsize=queueSize)
+		self.buffer = bytearray()
+		self.bufferLock = Lock()
+		self.writeLock = Lock()
+		self.readerThread = None
+		self.startTime = time.time()
+		self.receivedBytes = 0
+		self.sentBytes = 0
+		self.receivedFrames = 0
+		self.processedFrames = 0
+		self.droppedFrames = 0
+		self.totalLatency = 0.0
+		self.maxLatency = 0.0
+		self.maxBacklog = 0
+
+	def start(self):
+		'''
+		This method starts the reader thread.
+		'''
+		if self.readerThread is None:
+			self.port.timeout = self.readTimeout
+			self.readerThread = StoppableThread(target=self._read)
+			self.readerThread.start()
+
+	def stop(self):
+		'''
+		This method stops the reader thread.
+		'''
+		if self.readerThread is not None:
+			self.readerThread.stop()
+			self.readerThread.join(self.readTimeout * 4)
+			self.readerThread = None
+
+	def isStarted(self):
+		'''
+		This method indicates if the reader thread is running.
+
+		:return: boolean indicating if the reader thread is running
+		:rtype: bool
+		'''
+		return self.readerThread is not None
+
+	def _read(self):
+		data = self.port.read(self.port.in_waiting or 1)
+		if not data:
+			return
+		timestamp = time.time()
+		self.receivedBytes += len(data)
+		# The frames are queued under the lock, so a flush can't be followed by frames built from the flushed bytes
+		with self.bufferLock:
+			self.buffer += data
+			for frame in self.framer.parse(self.buffer):
+				self.receivedFrames += 1
+				try:
+					self.queue.put_nowait((timestamp,frame))
+				except Full:
+					self.droppedFrames += 1
+		backlog = self.queue.qsize()
+		if backlog > self.maxBacklog:
+			self.maxBacklog = backlog
+
+	def send(self,data):
+		'''
+		This method writes the provided data on the serial port.
+
+		:param data: data to write
+		:type data: bytes
+		'''
+		with self.writeLock:
+			self.port.write(data)
+			self.sentBytes += len(data)
+
+	def recv(self,timeout=None):
+		'''
+		This method returns the next received frame, waiting at most ``timeout`` seconds if no frame is available.
+
+		:param timeout: time (in seconds) before the method returns None (None means no timeout)
+		:type timeout: float
+		:return: received frame (or None if no frame has been received)
+		:rtype: bytes
+		'''
+		try:
+			timestamp,frame = self.queue.get(timeout=timeout)
+		except Empty:
+			return None
+		latency = time.time() - timestamp
+		self.processedFrames += 1
+		self.totalLatency += latency
+		if latency > self.maxLatency:
+			self.maxLatency = latency
+		return frame
+
+	def flush(self):
+		'''
+		This method removes the received frames and the bytes not yet framed.
+		'''
+		with self.bufferLock:
+			while not self.queue.empty():
+				try:
+					self.queue.get_nowait()
+				except Empty:
+					break
+			del self.buffer[:]
+
+	def getStatistics(self):
+		'''
+		This method returns the statistics of the transport.
+
+		:return: dictionary indicating the throughput (bytes and frames per second), the number of received, processed, dropped and queued frames, the number of received, sent and discarded bytes, the maximal backlog and the average and maximal latencies (in seconds) between the reception of a frame and its processing
+		:rtype: dict
+
+		:Example:
+
+			>>> transport.getStatistics()
+			{'receivedBytes': 180233, 'sentBytes': 80, 'discardedBytes': 0, 'receivedFrames': 4502, 'processedFrames': 4502, 'droppedFrames': 0, 'queued': 0, 'maxBacklog': 12, 'bytesPerSecond': 18020.1, 'framesPerSecond': 450.1, 'averageLatency': 0.00021, 'maxLatency': 0.0031}
+
+		'''
+		elapsed = max(time.time() - self.startTime,1e-6)
+		return {
+			"receivedBytes":self.receivedBytes,
+			"sentBytes":self.sentBytes,
+			"discardedBytes":self.framer.discardedBytes,
+			"receivedFrames":self.receivedFrames,
+			"processedFrames":self.processedFrames,
+			"droppedFrames":self.droppedFrames,
+			"queued":self.queue.qsize(),
+			"maxBacklog":self.maxBacklog,
+			"bytesPerSecond":self.receivedBytes / elapsed,
+			"framesPerSecond":self.receivedFrames / elapsed,
+			"averageLatency":self.totalLatency / self.processedFrames if self.processedFrames > 0 else 0.0,
+			"maxLatency":self.maxLatency
+		}
@@ -1,6 +1,8 @@
 '''
 This file allows to manipulate Zigbee chips.
 '''
+import numpy
+
 SYMBOL_TO_CHIP_MAPPING = [
 	{"symbols":"0000", "chip_values":"11011001110000110101001000101110","msk_values":"1100000011101111010111001101100"},
 	{"symbols":"1000", "chip_values":"11101101100111000011010100100010","msk_values":"1001110000001110111101011100110"},
@@ -20,6 +22,15 @@ SYMBOL_TO_CHIP_MAPPING = [
 	{"symbols":"1111", "chip_values":"11001001011000000111011110111000","msk_values":"1111000100001010001100100110001"}
 ]
 
+# Chip sequences packed as integers (first chip as most significant bit), indexed by the symbol's position in SYMBOL_TO_CHIP_MAPPING
+PACKED_CHIP_TABLES = {
+	"chip_values":numpy.array([int(i["chip_values"],2) for i in SYMBOL_TO_CHIP_MAPPING],dtype=numpy.uint32),
+	"msk_values":numpy.array([int(i["msk_values"],2) for i in SYMBOL_TO_CHIP_MAPPING],dtype=numpy.uint32)
+}
+
+# Number of bits set for every byte value
+POPCOUNT_TABLE = numpy.array([bin(i).count("1") for i in range(256)],dtype=numpy.uint8)
+
 
 def OQPSKtoMSKsymbols(pn,order=["11","01","00","10"]):
 	'''
@@ -94,11 +105,46 @@ def checkBestMatch(sequence,subtype="msk_values"):
 	:rtype: (str, int)
 
 	'''
-	min_hamming = hamming(sequence,SYMBOL_TO_CHIP_MAPPING[0][subtype])
-	best_match = SYMBOL_TO_CHIP_MAPPING[0]["symbols"]
-	for i in SYMBOL_TO_CHIP_MAPPING[1:]:
-		current = hamming(sequence,i[subtype])
-		if current <= min_hamming:
-			min_hamming = current
-			best_match = i["symbols"]
-	return (best_match,min_hamming)
+	if len(sequence) != len(SYMBOL_TO_CHIP_MAPPING[0][subtype]):
+		return (SYMBOL_TO_CHIP_MAPPING[0]["symbols"],None)
+	symbols,distances = correlateChips(numpy.array([int(sequence,2)],dtype=numpy.uint32),subtype)
+	return (SYMBOL_TO_CHIP_MAPPING[symbols[0]]["symbols"],int(distances[0]))
+
+def packChips(chips,length=31,step=32):
+	'''
+	This function splits an array of chips into sequences and packs every sequence into an integer (first chip as most significant bit).
+
+	:param chips: chips to pack (0 or 1)
+	:type chips: numpy array of uint8
+	:param length: number of chips packed in every sequence
+	:type length: int
+	:param step: number of chips between the beginning of two consecutive sequences
+	:type step: int
+	:return: packed sequences (only the complete sequences are returned)
+	:rtype: numpy array of uint32
+
+	'''
+	count = max(0,(len(chips) - length) // step + 1)
+	sequences = numpy.lib.stride_tricks.as_strided(chips,shape=(count,length),strides=(step*chips.strides[0],chips.strides[0]))
+	weights = numpy.left_shift(numpy.uint32(1),numpy.arange(length-1,-1,-1,dtype=numpy.uint32))
+	return (sequences.astype(numpy.uint32) * weights).sum(axis=1,dtype=numpy.uint32)
+
+def correlateChips(sequences,subtype="msk_values"):
+	'''
+	This function returns the best match (i.e. the symbol with the lowest hamming distance) for every provided packed sequence.
+	The hamming distances between every sequence and every entry of SYMBOL_TO_CHIP_MAPPING are computed at once (XOR + popcount).
+
+	:param sequences: packed sequences to analyze (see ``packChips``)
+	:type sequences: numpy array of uint32
+	:param subtype: string indicating if the comparison must be performed using MSK values or OQPSK values ("msk_values" or "chip_values")
+	:type subtype: str
+	:return: tuple composed of the index of the best symbol in SYMBOL_TO_CHIP_MAPPING and the corresponding hamming distance, for every sequence
+	:rtype: (numpy array of int, numpy array of uint8)
+
+	'''
+	table = PACKED_CHIP_TABLES[subtype]
+	differences = numpy.bitwise_xor(sequences[:,None],table[None,:])
+	distances = POPCOUNT_TABLE[differences.view(numpy.uint8)].reshape(differences.shape+(4,)).sum(axis=2,dtype=numpy.uint8)
+	# If multiple symbols have the same distance, the last one is selected
+	symbols = len(table) - 1 - numpy.argmin(distances[:,::-1],axis=1)
+	return (symbols,distances[numpy.arange(len(symbols)),symbols])
@@ -1,6 +1,7 @@
 from mirage.libs.common.sdr.decoders import SDRDecoder
 from mirage.libs.zigbee_utils.chip_tables import *
 from mirage.libs.zigbee_utils.helpers import *
+import numpy
 
 class ZigbeeDecoder(SDRDecoder):
 	'''
@@ -27,23 +28,36 @@ class ZigbeeDecoder(SDRDecoder):
 		'''
 		self.crcChecking = enable
 
+	def _symbolsToPacket(self,symbols):
+		'''
+		This method converts a sequence of symbols (indexes in SYMBOL_TO_CHIP_MAPPING) into bytes.
+		The sequence is left-padded with null symbols in order to start with a complete preamble (32 null bits).
+		'''
+		nonNullSymbols = numpy.flatnonzero(symbols)
+		if len(nonNullSymbols) == 0:
+			leadingZeros = 4*len(symbols)
+		else:
+			firstSymbol = int(symbols[nonNullSymbols[0]])
+			# Symbols bits are transmitted LSB first
+			leadingZeros = 4*nonNullSymbols[0] + (firstSymbol & -firstSymbol).bit_length() - 1
+		padding = max(0,(32 - leadingZeros + 3) // 4)
+		nibbles = numpy.concatenate((numpy.zeros(padding,dtype=numpy.uint8),symbols.astype(numpy.uint8)))
+		if len(nibbles) % 2 == 1:
+			nibbles = numpy.append(nibbles,numpy.uint8(0))
+		return (nibbles[0::2] | (nibbles[1::2] << 4)).tobytes()
+
 	def decode(self,demodulatedData,iqSamples):
-		hamming = 0
-		zigbeeFrame = ""
-		for i in range(0,len(demodulatedData),32):
-			value,hamming = checkBestMatch(demodulatedData[i:i+31])
-			if hamming > self.hammingThresold:
-				endOfFrame = i-1
-				break
-			else:
-				zigbeeFrame += value
+		chips = numpy.frombuffer(demodulatedData.encode("ascii"),dtype=numpy.uint8) - ord("0")
+		symbols,distances = correlateChips(packChips(chips,length=31,step=32),"msk_values")
+		invalidSymbols = numpy.flatnonzero(distances > self.hammingThresold)
+		if len(invalidSymbols) > 0:
+			endOfFrame = 32*invalidSymbols[0] - 1
+			symbols = symbols[:invalidSymbols[0]]
+		else:
+			endOfFrame = len(demodulatedData)
 
 		newIqSamples = iqSamples[:self.samplesBefore+self.samplesPerSymbol*(len(demodulatedData[:endOfFrame]))+self.samplesPerSymbol+self.samplesAfter]
-		zigbeeValidFrame = zigbeeFrame
-
-		while "0000"*8 != zigbeeValidFrame[:4*8]:
-			zigbeeValidFrame = "0000"+zigbeeValidFrame
-		packet = bits2bytes(zigbeeValidFrame)
+		packet = self._symbolsToPacket(symbols)
 
 		if self.crcChecking:
 			if (fcs(packet[6:-2]) == packet[-2:]):
@@ -52,4 +66,3 @@ class ZigbeeDecoder(SDRDecoder):
 				return (None,None)
 		else:
 			return (packet, newIqSamples)
-		return (None, None)
@@ -59,6 +59,11 @@ class ZigbeeHackRFDevice(wireless.SDRDevice):
 			return None
 
 	def _getDemodulator(self):
+		if self.blockDemodulatorEnabled:
+			return demodulators.BlockFSK2Demodulator(
+						preamble="1100000011101111010111001101100",
+						size=8*200,
+						samplesPerSymbol=1)
 		return (demodulators.FSK2Demodulator(
 						preamble="1100000011101111010111001101100",
 						size=8*200,
@@ -69,6 +74,16 @@ class ZigbeeHackRFDevice(wireless.SDRDevice):
 						size=8*200,
 						samplesPerSymbol=1))
 
+	def setBlockDemodulator(self,enable=True):
+		self.blockDemodulatorEnabled = enable
+		if self.receivePipeline is not None:
+			started = self.receivePipeline.isStarted()
+			if started:
+				self.receivePipeline.stop()
+			self.receivePipeline.updateDemodulator(self._getDemodulator())
+			if started:
+				self.receivePipeline.start()
+
 	def setExperimentalDemodulator(self,enable=True):
 		self.experimentalDemodulatorEnabled = enable
 		if enable and self.receivePipeline is not None:
@@ -97,6 +112,7 @@ class ZigbeeHackRFDevice(wireless.SDRDevice):
 		self.ready = False
 		self.channel = 12
 		self.experimentalDemodulatorEnabled = False
+		self.blockDemodulatorEnabled = False
 		super().__init__(interface=interface)
 		self.receivePipeline.start()
 
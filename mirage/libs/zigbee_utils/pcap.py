@@ -36,7 +36,7 @@ class ZigbeePCAPDevice(wireless.PCAPDevice):
 	'''
 	DLT = 195
 	SCAPY_LAYER = Dot15d4
-	sharedMethods = ["generateStream","setChannel","getChannel","getMode"]
+	sharedMethods = wireless.PCAPDevice.sharedMethods + ["generateStream","setChannel","getChannel"]
 
 	def init(self):
 		super().init()
@@ -1,3 +1,4 @@
+import sys
 from mirage.libs import utils,io,ble
 from mirage.core import module
 
@@ -36,6 +37,10 @@ class ble_crack(module.WirelessModule):
 		payloads = (self.args["PAIRING_REQUEST"] != "" and self.args["PAIRING_RESPONSE"] != "")
 		return couple and addresses and payloads
 
+	def displayProgress(self,testedKeys,totalKeys,keysPerSecond,remainingTime):
+		self.progressDisplayed = True
+		io.progress(testedKeys,total=totalKeys,suffix="{:.0f} keys/s, ETA: {}s".format(keysPerSecond,int(remainingTime) if remainingTime is not None else "?"))
+
 	def run(self):
 		if self.checkParametersValidity():
 			self.mRand = bytes.fromhex(self.args["MASTER_RAND"])
@@ -59,6 +64,7 @@ class ble_crack(module.WirelessModule):
 			
 
 			io.info("Cracking TK ...")
+			self.progressDisplayed = False
 			
 			pin = ble.BLECrypto.crackTemporaryKey(
 								rand,
@@ -68,8 +74,14 @@ class ble_crack(module.WirelessModule):
 								self.initiatorAddress,
 								self.responderAddressType,
 								self.responderAddress,
-								confirm
+								confirm,
+								progress=self.displayProgress
 								)
+			if self.progressDisplayed:
+				sys.stdout.write("\n")
+			if pin is None:
+				io.fail("No PIN code matches the provided values !")
+				return self.nok()
 			io.success("Pin found : "+str(pin))
 			self.temporaryKey = bytes.fromhex((32-len(hex(pin)[2:]))*"0"+hex(pin)[2:])
 			io.success("Temporary Key found : "+self.temporaryKey.hex())
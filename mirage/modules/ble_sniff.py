@@ -14,6 +14,9 @@ class ble_sniff(module.WirelessModule):
 				"TARGET":"",
 				"CHANNEL":"37",
 				"PCAP_FILE":"",
+				"PCAPNG":"no",
+				"PCAP_MAX_SIZE":"",
+				"PCAP_MAX_TIME":"",
 				"HIJACKING_MASTER":"no",
 				"HIJACKING_SLAVE":"no",
 				"MITMING":"no",
@@ -30,6 +33,7 @@ class ble_sniff(module.WirelessModule):
 		# Security Manager related
 		self.pReq = None
 		self.pRes = None
+		self.accessAddress = None
 		self.initiatorAddress = None
 		self.initiatorAddressType = None
 		self.responderAddress = None
@@ -147,6 +151,7 @@ class ble_sniff(module.WirelessModule):
 
 			if utils.booleanArg(self.args["CRACK_KEY"]):
 				if isConnectReq:
+					self.accessAddress = packet.accessAddress
 					self.initiatorAddress = packet.srcAddr
 					self.initiatorAddressType = packet.srcAddrType
 					self.responderAddress = packet.dstAddr
@@ -169,7 +174,7 @@ class ble_sniff(module.WirelessModule):
 						io.info("Derivating Short Term Key ...")
 						self.shortTermKey = ble.BLECrypto.s1(self.temporaryKey,self.mRand,self.sRand)[::-1]
 						io.success("Short Term Key found : "+ self.shortTermKey.hex())
-						ble.BLELinkLayerCrypto.provideLTK(self.shortTermKey)
+						ble.BLELinkLayerCrypto.provideLTK(self.shortTermKey,identifier=self.accessAddress)
 
 				if isinstance(packet,ble.BLEPairingRandom) and self.mRand is None:
 					self.mRand = packet.random[::-1]
@@ -360,6 +365,12 @@ class ble_sniff(module.WirelessModule):
 			self.pcap = self.getEmitter(self.args["PCAP_FILE"])
 		else:
 			self.pcap = None
+		if self.pcap is not None:
+			self.pcap.configureWriter(
+				pcapng=utils.booleanArg(self.args["PCAPNG"]),
+				maxSize=utils.integerArg(self.args["PCAP_MAX_SIZE"]) if self.args["PCAP_MAX_SIZE"] != "" else None,
+				maxTime=utils.integerArg(self.args["PCAP_MAX_TIME"]) if self.args["PCAP_MAX_TIME"] != "" else None
+			)
 		self.initEmittersAndReceivers()
 
 		if self.args["LTK"] != "":
@@ -1,4 +1,5 @@
 from mirage.libs import esb,utils,io
+from mirage.libs.wireless_utils.scheduler import ChannelScheduler
 from mirage.core import module
 import sys
 
@@ -18,13 +19,14 @@ class esb_scan(module.WirelessModule):
 
 
 	def add(self,packet):
-		self.changes = 0
 		if packet.address not in self.devices:
 			self.devices[packet.address] = {"channels":set([packet.additionalInformations.channel]),"protocol":"unknown" if packet.protocol is None else packet.protocol}
 			self.changes+=1
+			self.scheduler.hit(packet.additionalInformations.channel)
 		elif packet.additionalInformations.channel not in self.devices[packet.address]["channels"]:
 			self.devices[packet.address]["channels"].add(packet.additionalInformations.channel)
 			self.changes+=1
+			self.scheduler.hit(packet.additionalInformations.channel)
 		elif packet.protocol is not None and self.devices[packet.address]["protocol"] == "unknown":
 			self.devices[packet.address]["protocol"] = packet.protocol
 			self.changes+=1
@@ -57,10 +59,6 @@ class esb_scan(module.WirelessModule):
 	def run(self):
 		self.receiver = self.getReceiver(interface=self.args['INTERFACE'])
 		if self.checkScanningCapabilities():
-			self.receiver.onEvent("*",callback=self.add)
-			self.receiver.enterPromiscuousMode()
-			start = utils.now()
-
 			if utils.isNumber(self.args["START_CHANNEL"]) and utils.integerArg(self.args["START_CHANNEL"]) < 100 and utils.integerArg(self.args["START_CHANNEL"]) >= 0:
 				startChannel = utils.integerArg(self.args["START_CHANNEL"])
 			else:
@@ -76,13 +74,15 @@ class esb_scan(module.WirelessModule):
 			numberOfChannels = endChannel+1 - startChannel
 
 			channels = list(range(startChannel,endChannel+1))
-			i = 0
+			self.scheduler = ChannelScheduler(channels,self.receiver.setChannel,dwellTime=0.1)
+			self.receiver.onEvent("*",callback=self.add)
+			self.receiver.enterPromiscuousMode()
+			start = utils.now()
 			while self.args["TIME"] == "" or utils.now() - start < utils.integerArg(self.args["TIME"]):
-				io.progress(i,total=numberOfChannels,suffix="Channel: "+(" " if len(str(channels[i]))==1 else "")+str(channels[i]))
-				self.receiver.setChannel(channels[i])
-				utils.wait(seconds=0.1)
+				channel,dwellTime = self.scheduler.next()
+				io.progress(channel-startChannel,total=numberOfChannels,suffix="Channel: "+(" " if len(str(channel))==1 else "")+str(channel))
+				utils.wait(seconds=dwellTime)
 				self.displayDevices()
-				i = (i + 1) % len(channels)
 			sys.stdout.write(" "*100+"\r") # TODO : moving it in io
 			if len(self.devices) >= 1:
 				return self.ok(self.generateOutput())
@@ -12,6 +12,9 @@ class esb_sniff(module.WirelessModule):
 				"TARGET":"",
 				"MOUSE_FILE":"",
 				"PCAP_FILE":"",
+				"PCAPNG":"no",
+				"PCAP_MAX_SIZE":"",
+				"PCAP_MAX_TIME":"",
 				"TIME":"20",
 				"ACK_PACKETS":"no",
 				"CHANNELS":"all",
@@ -126,6 +129,12 @@ class esb_sniff(module.WirelessModule):
 
 		if self.args["PCAP_FILE"] != "":
 			self.pcap = self.getEmitter(interface=self.args["PCAP_FILE"])
+		if self.pcap is not None:
+			self.pcap.configureWriter(
+				pcapng=utils.booleanArg(self.args["PCAPNG"]),
+				maxSize=utils.integerArg(self.args["PCAP_MAX_SIZE"]) if self.args["PCAP_MAX_SIZE"] != "" else None,
+				maxTime=utils.integerArg(self.args["PCAP_MAX_TIME"]) if self.args["PCAP_MAX_TIME"] != "" else None
+			)
 
 		channelsTimeout = float(self.args["CHANNEL_TIMEOUT"]) if self.args["CHANNEL_TIMEOUT"] != "" else None
 
@@ -149,6 +158,9 @@ class esb_sniff(module.WirelessModule):
 
 		self.receiver.removeCallbacks()
 		if self.pcap is not None:
+			statistics = self.pcap.getWriterStatistics()
+			if statistics is not None and statistics["dropped"] > 0:
+				io.warning(str(statistics["dropped"])+" packets have not been written into the PCAP file !")
 			self.pcap.stop()
 
 		output = {}
@@ -1,6 +1,6 @@
 from mirage.libs import mosart,utils,io,wireless
 from mirage.libs.common.parsers import DuckyScriptParser
-from mirage.libs.common.hid import HIDMapping
+from mirage.libs.common.hid import HIDCompiler
 from mirage.core import module
 
 
@@ -28,38 +28,27 @@ class mosart_keyinjector(module.WirelessModule):
 	def checkInjectionSyncCapabilities(self):
 		return self.emitter.hasCapabilities("INJECTING_SYNC")
 
-	def addMosartKeystroke(self,locale="fr",key="a",ctrl=False, alt=False, gui=False,shift=False):
+	def addMosartSequence(self,sequence=[]):
 		keystrokes = []
-		if key == "\n":
-			key = "ENTER"
-		hid,mod = HIDMapping(locale=locale).getHIDCodeFromKey(key=key)
-
-		if mod == 0:
-			keystrokes.append(mosart.MosartKeyboardKeystrokePacket(sequenceNumber=self.counter,address=self.args["TARGET"],hidCode=hid,modifiers=0,state="pressed"))
-			keystrokes.append(mosart.MosartKeyboardKeystrokePacket(sequenceNumber=self.counter,address=self.args["TARGET"],hidCode=hid,modifiers=0,state="pressed"))
-
-			self.counter = self.counter + 1 if self.counter + 1 <= 15 else 0
-		else:
-			keystrokes.append(mosart.MosartKeyboardKeystrokePacket(sequenceNumber=self.counter,address=self.args["TARGET"],hidCode=0,modifiers=mod,state="pressed"))
-			keystrokes.append(mosart.MosartKeyboardKeystrokePacket(sequenceNumber=self.counter,address=self.args["TARGET"],hidCode=0,modifiers=mod,state="pressed"))
-			keystrokes.append(mosart.MosartKeyboardKeystrokePacket(sequenceNumber=self.counter,address=self.args["TARGET"],hidCode=hid,modifiers=0,state="pressed"))
-			keystrokes.append(mosart.MosartKeyboardKeystrokePacket(sequenceNumber=self.counter,address=self.args["TARGET"],hidCode=hid,modifiers=0,state="pressed"))
-			
-			self.counter = self.counter + 1 if self.counter + 1 <= 15 else 0	
-		keystrokes.append(mosart.MosartKeyboardKeystrokePacket(sequenceNumber=self.counter,address=self.args["TARGET"],hidCode=hid,modifiers=0,state="released"))
-		keystrokes.append(mosart.MosartKeyboardKeystrokePacket(sequenceNumber=self.counter,address=self.args["TARGET"],hidCode=hid,modifiers=0,state="released"))
-		keystrokes.append(mosart.MosartKeyboardKeystrokePacket(sequenceNumber=self.counter,address=self.args["TARGET"],hidCode=0,modifiers=mod,state="released"))
-		keystrokes.append(mosart.MosartKeyboardKeystrokePacket(sequenceNumber=self.counter,address=self.args["TARGET"],hidCode=0,modifiers=mod,state="released"))
-		keystrokes.append(wireless.WaitPacket(time=0.4))
-		self.counter = self.counter + 1 if self.counter + 1 <= 15 else 0
+		for step in sequence:
+			if step[0] == "delay":
+				keystrokes += self.addMosartDelay(duration=step[1])
+				continue
+			_,pressed,released = step
+			for reports in (pressed,released):
+				for report in reports:
+					keystroke = mosart.MosartKeyboardKeystrokePacket(sequenceNumber=self.counter,address=self.args["TARGET"],stateCode=report[0],code=report[1])
+					keystrokes += [keystroke,keystroke]
+				self.counter = self.counter + 1 if self.counter + 1 <= 15 else 0
+			keystrokes.append(wireless.WaitPacket(time=0.4))
 		return keystrokes
 
+	def addMosartKeystroke(self,locale="fr",key="a",ctrl=False, alt=False, gui=False,shift=False):
+		return self.addMosartSequence([self.compiler.compileKey(key=key,ctrl=ctrl,alt=alt,gui=gui,shift=shift)])
+
 	def addMosartText(self,string="",locale="fr"):
-		keystrokes = []
-		for letter in string:
-			keystrokes += self.addMosartKeystroke(key=letter,locale=locale)
+		return self.addMosartSequence(self.compiler.compileText(string))
 
-		return keystrokes
 	def startMosartInjection(self):
 		return []
 
@@ -100,6 +89,7 @@ class mosart_keyinjector(module.WirelessModule):
 
 
 			self.receiver.setChannel(utils.integerArg(self.args["CHANNEL"]))
+			self.compiler = HIDCompiler(locale=self.args["LOCALE"].lower(),protocol="mosart")
 
 			if self.args["TEXT"] != "":
 				keystrokes = self.addMosartText(self.args["TEXT"])
@@ -111,12 +101,7 @@ class mosart_keyinjector(module.WirelessModule):
 
 			elif self.args["DUCKYSCRIPT"] != "":
 				parser = DuckyScriptParser(filename=self.args["DUCKYSCRIPT"])
-				keystrokes = parser.generatePackets(
-					textFunction=self.addMosartText,
-					initFunction=self.startMosartInjection,
-					keyFunction=self.addMosartKeystroke,
-					sleepFunction=self.addMosartDelay
-					)
+				keystrokes = self.startMosartInjection() + self.addMosartSequence(self.compiler.compileScript(parser))
 				self.emitter.sendp(*keystrokes)		
 				while not self.emitter.isTransmitting():
 					utils.wait(seconds=0.1)
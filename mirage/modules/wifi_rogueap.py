@@ -26,6 +26,7 @@ class wifi_rogueap(module.WirelessModule):
 		self.receiver = self.getReceiver(interface=self.args["INTERFACE"])
 		self.emitter = self.getEmitter(interface=self.args["INTERFACE"])
 		if self.checkCapabilities():
+			self.receiver.setFastMode(enable=True,subtypes=[4])
 			self.receiver.onEvent("WifiProbeRequest",callback=self.probeResponse)
 			
 			self.emitter.setChannel(utils.integerArg(self.args["CHANNEL"]))
@@ -36,3 +37,6 @@ class wifi_rogueap(module.WirelessModule):
 		else:
 			io.fail("Interface provided ("+str(self.args["INTERFACE"])+") is not able to communicate as an access point and run in monitor mode.")
 			return self.nok()
+
+	def postrun(self):
+		self.receiver.setFastMode(enable=False)
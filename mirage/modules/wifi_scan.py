@@ -1,5 +1,6 @@
 import queue
 from mirage.libs import io,wifi,utils
+from mirage.libs.wireless_utils.scheduler import ChannelScheduler
 from mirage.core import module
 
 class wifi_scan(module.WirelessModule):
@@ -90,6 +91,7 @@ class wifi_scan(module.WirelessModule):
 				changes += 1
 				self.accessPoints[current["address"]] = {"ssid":current["ssid"],"channels":set()}
 				self.accessPoints[current["address"]]["channels"].add(current["channel"])
+				self.scheduler.hit(current["channel"])
 			else:
 				if self.accessPoints[current["address"]]["ssid"] != current["ssid"]:
 					changes += 1
@@ -97,6 +99,7 @@ class wifi_scan(module.WirelessModule):
 				if current["channel"] not in self.accessPoints[current["address"]]["channels"]:
 					changes += 1
 					self.accessPoints[current["address"]]["channels"].add(current["channel"])
+					self.scheduler.hit(current["channel"])
 		if changes != 0:
 			self.displayAccessPoints()
 
@@ -108,9 +111,11 @@ class wifi_scan(module.WirelessModule):
 				changes += 1
 				self.stations[current["address"]] = {"channels":set()}
 				self.stations[current["address"]]["channels"].add(current["channel"])
+				self.scheduler.hit(current["channel"])
 			elif current["address"]!="FF:FF:FF:FF:FF:FF" and current["channel"] not in self.stations[current["address"]]["channels"]:
 				changes += 1
 				self.stations[current["address"]]["channels"].add(current["channel"])
+				self.scheduler.hit(current["channel"])
 		if changes != 0:
 			self.displayStations()
 
@@ -118,16 +123,16 @@ class wifi_scan(module.WirelessModule):
 		self.receiver = self.getReceiver(interface=self.args["INTERFACE"])
 		self.emitter = self.getEmitter(interface=self.args["INTERFACE"])
 		if self.checkCapabilities():
+			# Only the Probe Requests, Probe Responses and Beacons are received and converted
+			self.receiver.setFastMode(enable=True,subtypes=[4,5,8])
 			self.receiver.onEvent("*",callback=self.scan)
+			self.scheduler = ChannelScheduler(list(range(1,15)),self.receiver.setChannel,dwellTime=1.0)
 
-			accessPoints = {}
-			channel = 0
-
-			for i in range(utils.integerArg(self.args['TIME'])):
-				self.receiver.setChannel(channel+1)
+			start = utils.now()
+			while utils.now() - start < utils.integerArg(self.args['TIME']):
+				channel,dwellTime = self.scheduler.next()
 				self.emitter.sendp(wifi.WifiProbeRequest(srcMac = 'FF:FF:FF:FF:FF:FF', destMac= 'FF:FF:FF:FF:FF:FF', emitMac = "FF:FF:FF:FF:FF:FF"))
-				channel = (channel+1) % 14
-				utils.wait(seconds=1)
+				utils.wait(seconds=dwellTime)
 				if utils.booleanArg(self.args["ACCESS_POINTS"]):
 					self.updateAccessPoints()
 				if utils.booleanArg(self.args["STATIONS"]):			
@@ -139,5 +144,6 @@ class wifi_scan(module.WirelessModule):
 			io.fail("Interface provided ("+str(self.args["INTERFACE"])+") is not able to scan and run in monitor mode.")
 			return self.nok()
 	def postrun(self):
+		self.receiver.setFastMode(enable=False)
 		io.info("Disabling monitor mode ...")
 		self.receiver.setMonitorMode(enable=False)
@@ -1,4 +1,5 @@
 from mirage.libs import io,zigbee,utils
+from mirage.libs.wireless_utils.scheduler import ChannelScheduler
 from mirage.core import module
 import sys
 
@@ -15,6 +16,7 @@ class zigbee_scan(module.WirelessModule):
 				"ACTIVE":"yes"
 			}
 		self.devices = {}
+		self.changes = 0
 
 	def checkCapabilities(self):
 		return self.emitter.hasCapabilities("SNIFFING", "INJECTING")
@@ -58,7 +60,8 @@ class zigbee_scan(module.WirelessModule):
 				changes += 1
 				self.devices[panID]["nodes"][packet.srcAddr] = "unknown"
 		if changes > 0:
-			self.displayDevices()
+			self.changes += changes
+			self.scheduler.hit(self.receiver.getChannel(),count=changes)
 
 	def generateOutput(self):
 		output = {}
@@ -90,8 +93,6 @@ class zigbee_scan(module.WirelessModule):
 		self.receiver = self.getReceiver(interface=self.args["INTERFACE"])
 		self.emitter = self.getEmitter(interface=self.args["INTERFACE"])
 		if self.checkCapabilities():
-			self.receiver.onEvent("*",callback=self.updateDevices)
-
 			start = utils.now()
 			startChannel = utils.integerArg(self.args["START_CHANNEL"])
 			endChannel = utils.integerArg(self.args["END_CHANNEL"])
@@ -99,15 +100,18 @@ class zigbee_scan(module.WirelessModule):
 			numberOfChannels = endChannel+1 - startChannel
 
 			channels = list(range(startChannel,endChannel+1))
-			i = 0
+			self.scheduler = ChannelScheduler(channels,self.receiver.setChannel,dwellTime=0.1)
+			self.receiver.onEvent("*",callback=self.updateDevices)
 			while self.args["TIME"] == "" or utils.now() - start < utils.integerArg(self.args["TIME"]):
+				channel,dwellTime = self.scheduler.next()
 				if startChannel != endChannel:
-					io.progress(i,total=numberOfChannels,suffix="Channel: "+(" " if len(str(channels[i]))==1 else "")+str(channels[i]))
-				self.receiver.setChannel(channels[i])
+					io.progress(channel-startChannel,total=numberOfChannels,suffix="Channel: "+(" " if len(str(channel))==1 else "")+str(channel))
 				if utils.booleanArg(self.args["ACTIVE"]):
 					self.emitter.sendp(zigbee.ZigbeeBeaconRequest(sequenceNumber=1,destPanID=0xFFFF,destAddr=0xFFFF))
-				utils.wait(seconds=0.1)
-				i = (i + 1) % len(channels)
+				utils.wait(seconds=dwellTime)
+				if self.changes > 0:
+					self.changes = 0
+					self.displayDevices()
 
 			if startChannel != endChannel:
 				sys.stdout.write(" "*100+"\r")
@@ -13,7 +13,10 @@ class zigbee_sniff(module.WirelessModule):
 				"TARGET_PANID":"",
 				"TARGET":"",
 				"TIME":"20",
-				"PCAP_FILE":""
+				"PCAP_FILE":"",
+				"PCAPNG":"no",
+				"PCAP_MAX_SIZE":"",
+				"PCAP_MAX_TIME":""
 
 			}
 
@@ -57,6 +60,12 @@ class zigbee_sniff(module.WirelessModule):
 				self.pcap = self.getEmitter(interface=self.args["PCAP_FILE"])
 			else:
 				self.pcap = None
+			if self.pcap is not None:
+				self.pcap.configureWriter(
+					pcapng=utils.booleanArg(self.args["PCAPNG"]),
+					maxSize=utils.integerArg(self.args["PCAP_MAX_SIZE"]) if self.args["PCAP_MAX_SIZE"] != "" else None,
+					maxTime=utils.integerArg(self.args["PCAP_MAX_TIME"]) if self.args["PCAP_MAX_TIME"] != "" else None
+				)
 			self.receiver.onEvent("*",callback=self.show)	
 
 			time = utils.integerArg(self.args['TIME']) if self.args["TIME"] != "" else None
@@ -65,6 +74,10 @@ class zigbee_sniff(module.WirelessModule):
 				utils.wait(seconds=0.1)
 
 			self.receiver.removeCallbacks()
+			if self.pcap is not None:
+				statistics = self.pcap.getWriterStatistics()
+				if statistics is not None and statistics["dropped"] > 0:
+					io.warning(str(statistics["dropped"])+" packets have not been written into the PCAP file !")
 
 			output = {
 					"CHANNEL":self.args["CHANNEL"],
@@ -1,6 +1,6 @@
 from mirage.core import scenario
 from mirage.libs import io,ble,bt,utils,wireless
-from mirage.libs.common import parsers
+from mirage.libs.common import parsers,hid
 
 REPORT_MAP = bytes.fromhex("05010906a1018501050719e029e7150025019508750181029501750881010507190029ff150025ff950675088100050819012905950575019102950175039101c0")
 # Problème au niveau des modifiers !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!
@@ -65,11 +65,16 @@ class keyboard_hid_over_gatt(scenario.Scenario):
 		self.module.show("gatt")
 
 	def addHIDoverGATTKeystroke(self,locale="fr",key="a",ctrl=False, alt=False, gui=False,shift=False):
+		return self.addHIDoverGATTSequence([self.compiler.compileKey(key=key,ctrl=ctrl,alt=alt,gui=gui,shift=shift)])
+
+	def addHIDoverGATTSequence(self,sequence=[]):
 		keystrokes = []
-		keystrokePressed = ble.HIDoverGATTKeystroke(locale=locale,key=key,ctrl=ctrl,alt=alt,gui=gui,shift=shift)
-		keystrokeReleased = bytes([0,0,0,0,0,0,0,0])
-		keystrokes.append(ble.BLEHandleValueNotification(handle=0x000d,value=keystrokePressed.data))
-		keystrokes.append(ble.BLEHandleValueNotification(handle=0x000d,value=keystrokeReleased))
+		for step in sequence:
+			if step[0] == "delay":
+				keystrokes += self.addHIDoverGATTDelay(duration=step[1])
+			else:
+				for report in step[1]+step[2]:
+					keystrokes.append(ble.BLEHandleValueNotification(handle=0x000d,value=report))
 		return keystrokes
 
 	def startHIDoverGATTInjection(self):
@@ -81,16 +86,14 @@ class keyboard_hid_over_gatt(scenario.Scenario):
 		return keystrokes
 
 	def addHIDoverGATTText(self,string="hello world !",locale="fr"):
-		keystrokes = []
-		for letter in string:
-			keystrokes += self.addHIDoverGATTKeystroke(key=letter,locale=locale)
-		return keystrokes
+		return self.addHIDoverGATTSequence(self.compiler.compileText(string))
 
 	def onStart(self):
 		self.emitter = self.module.emitter
 		self.receiver = self.module.receiver
 		self.server = self.module.server
 		self.mode = "text"
+		self.compiler = hid.HIDCompiler(locale="fr",protocol="hid_over_gatt")
 		self.enableAdvertising()
 		self.initializeServices()
 		if "PAIRING" in self.module.args and self.module.args["PAIRING"].lower()=="passive":
@@ -113,12 +116,7 @@ class keyboard_hid_over_gatt(scenario.Scenario):
 			self.mode = "duckyscript"
 			io.info("Duckyscript injection: "+self.module.args["DUCKYSCRIPT"])
 			parser = parsers.DuckyScriptParser(filename=self.args["DUCKYSCRIPT"])
-			self.attackStream = parser.generatePackets(
-				textFunction=self.addHIDoverGATTText,
-				initFunction=self.startHIDoverGATTInjection,
-				keyFunction=self.addHIDoverGATTKeystroke,
-				sleepFunction=self.addHIDoverGATTDelay
-				)
+			self.attackStream = self.startHIDoverGATTInjection() + self.addHIDoverGATTSequence(self.compiler.compileScript(parser))
 			io.info("You can start the injection by pressing [SPACE]")
 		return True
 
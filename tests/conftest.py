@@ -0,0 +1,7 @@
+import os,sys
+
+# The tests are run against the source tree
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# mirage.core.app must be imported before the libraries (circular import)
+import mirage.core.app
@@ -0,0 +1,57 @@
+from mirage.libs.ble_utils.att_server import GATT_Server
+import pytest
+
+PRIMARY_SERVICE = 0x2800
+BATTERY_SERVICE = bytes.fromhex("0f18")
+CUSTOM_SERVICE = bytes.fromhex("ffeeddccbbaa99887766554433221100")
+
+@pytest.fixture
+def server():
+	# Handles : 1-5 Generic Access, 6-9 Battery Service (with a descriptor), 10-12 custom 128 bits service
+	server = GATT_Server()
+	server.addPrimaryService(bytes.fromhex("1800"))
+	server.addCharacteristic(bytes.fromhex("2a00"),b"mirage",permissions=["Read"])
+	server.addCharacteristic(bytes.fromhex("2a01"),b"\x00\x00",permissions=["Read"])
+	server.addPrimaryService(BATTERY_SERVICE[::-1])
+	server.addCharacteristic(bytes.fromhex("2a19"),b"\x64",permissions=["Read","Notify"])
+	server.addDescriptor(bytes.fromhex("2902"),b"\x00\x00")
+	server.addPrimaryService(CUSTOM_SERVICE[::-1])
+	server.addCharacteristic(bytes.fromhex("00112233445566778899aabbccddee01"),b"\x01")
+	return server
+
+def test_read_by_group_type(server):
+	assert server.database.readByGroupType(1,0xFFFF,PRIMARY_SERVICE) == [
+		{"attributeHandle":1,"endGroupHandle":5,"value":b"\x00\x18"},
+		{"attributeHandle":6,"endGroupHandle":9,"value":BATTERY_SERVICE},
+		{"attributeHandle":10,"endGroupHandle":12,"value":CUSTOM_SERVICE}
+	]
+	# Only the groups starting in the range are returned, the last one ends at the end of the range
+	assert server.database.readByGroupType(2,7,PRIMARY_SERVICE) == [{"attributeHandle":6,"endGroupHandle":7,"value":BATTERY_SERVICE}]
+	assert server.database.readByGroupType(2,5,PRIMARY_SERVICE) == []
+	# The response only contains the values of the same size
+	assert server.readByGroupType(1,0xFFFF,PRIMARY_SERVICE) == (True,[
+		{"attributeHandle":1,"endGroupHandle":5,"value":b"\x00\x18"},
+		{"attributeHandle":6,"endGroupHandle":9,"value":BATTERY_SERVICE}
+	])
+	assert server.readByGroupType(11,0xFFFF,PRIMARY_SERVICE)[0] is False
+
+def test_find_by_type_value(server):
+	assert server.database.findByTypeValue(1,0xFFFF,PRIMARY_SERVICE,BATTERY_SERVICE) == [{"attributeHandle":6,"endGroupHandle":9}]
+	assert server.database.findByTypeValue(1,0xFFFF,PRIMARY_SERVICE,CUSTOM_SERVICE) == [{"attributeHandle":10,"endGroupHandle":12}]
+	assert server.database.findByTypeValue(7,0xFFFF,PRIMARY_SERVICE,BATTERY_SERVICE) == []
+	assert server.database.findByTypeValue(1,0xFFFF,PRIMARY_SERVICE,b"\x0a\x18") == []
+
+def test_find_information(server):
+	# With the default MTU (23 bytes), a response contains five handles with 16 bits types
+	assert server.findInformation(1,0xFFFF) == (True,[
+		{"attributeHandle":1,"type":b"\x28\x00"},
+		{"attributeHandle":2,"type":b"\x28\x03"},
+		{"attributeHandle":3,"type":b"\x2a\x00"},
+		{"attributeHandle":4,"type":b"\x28\x03"},
+		{"attributeHandle":5,"type":b"\x2a\x01"}
+	])
+	# The response stops before the first 128 bits type
+	success,body = server.findInformation(9,0xFFFF)
+	assert [entry["attributeHandle"] for entry in body] == [9,10,11]
+	assert len(server.database.findInformation(1,0xFFFF)) == 12
+	assert server.findInformation(13,0xFFFF) == (False,0x0A)
@@ -0,0 +1,83 @@
+from mirage.libs.ble import *
+from mirage.libs.ble_utils import converters
+import pytest
+
+ACCESS_ADDRESS = 0x12345678
+
+class RecordingDevice:
+	def __init__(self):
+		self.removedHandles = []
+
+	def _removeConnectionHandle(self,handle):
+		self.removedHandles.append(handle)
+
+def sniffed(frame):
+	# Frames are dissected from bytes, as provided by the sniffers
+	return BTLE_PPI(btle_channel=37,btle_clkn_high=0,btle_clk_100ns=0,rssi_max=0,rssi_min=0,rssi_avg=0,rssi_count=1)/BTLE(raw(frame))
+
+def data(layers):
+	return sniffed(BTLE(access_addr=ACCESS_ADDRESS)/BTLE_DATA()/layers)
+
+# Mixed capture : advertisements, connection, ATT, Security Manager and Link Layer control packets
+CAPTURE = [
+	(sniffed(BTLE()/BTLE_ADV()/BTLE_ADV_IND(AdvA="11:22:33:44:55:66",data=[EIR_Hdr()/EIR_CompleteLocalName(local_name=b"mirage")])),BLEAdvInd),
+	(sniffed(BTLE()/BTLE_ADV()/BTLE_CONNECT_REQ(InitA="11:22:33:44:55:66",AdvA="aa:bb:cc:dd:ee:ff",AA=ACCESS_ADDRESS)),BLEConnectRequest),
+	(data(b""),BLEPacket),
+	(data(L2CAP_Hdr()/ATT_Hdr()/ATT_Exchange_MTU_Request(mtu=247)),BLEExchangeMTURequest),
+	(data(L2CAP_Hdr()/ATT_Hdr()/ATT_Read_Request(gatt_handle=3)),BLEReadRequest),
+	(data(L2CAP_Hdr()/ATT_Hdr()/ATT_Write_Command(gatt_handle=3,data=b"on")),BLEWriteCommand),
+	(data(L2CAP_Hdr()/ATT_Hdr()/ATT_Handle_Value_Notification(gatt_handle=3,value=b"abc")),BLEHandleValueNotification),
+	(data(L2CAP_Hdr()/SM_Hdr()/SM_Pairing_Request()),BLEPairingRequest),
+	(data(BTLE_CTRL()/LL_VERSION_IND()),BLEControlPDU),
+	(data(BTLE_CTRL()/LL_ENC_REQ()),BLEControlPDU),
+	(data(BTLE_CTRL()/LL_TERMINATE_IND(code=0x24)),BLEDisconnect)
+]
+
+@pytest.fixture
+def receiver(tmp_path):
+	receiver = BLEReceiver(interface=str(tmp_path/"capture.pcap"))
+	yield receiver
+	receiver.stop()
+
+def test_mixed_capture_conversion(receiver):
+	for frame,packetClass in CAPTURE:
+		assert type(receiver.convert(frame)) is packetClass
+
+	notification = receiver.convert(CAPTURE[6][0])
+	assert (notification.handle,notification.value) == (3,b"abc")
+	assert receiver.convert(CAPTURE[9][0]).type == "LL_ENC_REQ"
+	assert receiver.convert(data(BTLE_CTRL()/LL_TERMINATE_IND(code=0x13))).data == b"\x13"
+
+def test_start_encryption_request_enables_encryption(receiver):
+	receiver.convert(data(BTLE_CTRL()/LL_START_ENC_REQ()))
+	assert receiver.encrypted
+
+def test_hci_registries(monkeypatch):
+	assert isinstance(converters.convertHCICommand(HCI_Hdr(raw(HCI_Hdr()/HCI_Command_Hdr()/HCI_Cmd_LE_Create_Connection_Cancel()))),BLEConnectionCancel)
+	assert converters.convertHCICommand(HCI_Hdr(raw(HCI_Hdr()/HCI_Command_Hdr()/HCI_Cmd_LE_Rand()))) is None
+
+	# Third-party converters are dispatched by HCI event code (and LE meta subevent)
+	monkeypatch.setitem(converters._HCI_EVENT_CONVERTERS,(HCI_DISCONNECTION_COMPLETE,None),lambda packet,device:BLEDisconnect(connectionHandle=device._removeConnectionHandle(packet.connection_handle) or packet.connection_handle))
+	monkeypatch.setitem(converters._HCI_EVENT_CONVERTERS,(HCI_LE_META,0x07),lambda packet,device:BLEPacket())
+	device = RecordingDevice()
+	event = HCI_Hdr(raw(HCI_Hdr()/HCI_Event_Hdr()/HCI_Event_Disconnection_Complete(connection_handle=0x40)))
+	assert converters.convertHCIEvent(event,device).connectionHandle == 0x40
+	assert device.removedHandles == [0x40]
+	assert type(converters.convertHCIEvent(HCI_Hdr(raw(HCI_Hdr()/HCI_Event_Hdr()/HCI_Event_LE_Meta(event=0x07))),device)) is BLEPacket
+	assert converters.convertHCIEvent(HCI_Hdr(raw(HCI_Hdr()/HCI_Event_Hdr()/HCI_Event_LE_Meta(event=0x08))),device) is None
+
+def chainLookup(packet):
+	# Reference : the layers are tested one after the other, as in a chain of "layer in packet" tests
+	for layer,converter in converters._L2CAP_CONVERTERS.values():
+		if layer is not None and layer in packet:
+			return converter
+
+def registryLookup(packet):
+	l2cap = packet.getlayer(L2CAP_Hdr)
+	header = l2cap.payload
+	return converters._L2CAP_CONVERTERS.get((l2cap.cid,getattr(header,converters._OPCODE_FIELDS[l2cap.cid])))
+
+def test_registry_lookup_matches_the_chain():
+	for frame,packetClass in CAPTURE:
+		if L2CAP_Hdr in frame:
+			assert registryLookup(frame)[1] is chainLookup(frame)
@@ -0,0 +1,152 @@
+import os,sys,json,subprocess,threading
+from mirage.libs import ble
+from mirage.libs.ble_utils import converters,scapy_link_layers
+from mirage.libs.ble_utils.constants import CONTROL_OPCODES
+from mirage.libs.ble_utils.crypto import BLECrypto,BLETemporaryKeyCracker,BLELinkLayerCrypto
+from scapy.all import BTLE_PPI,BTLE,BTLE_ADV,BTLE_ADV_IND,BTLE_CONNECT_REQ,BTLE_DATA,BTLE_CTRL,LL_TERMINATE_IND,L2CAP_Hdr,ATT_Hdr,ATT_Read_Request,raw
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SCRIPT = """
+import json,psutil
+process = psutil.Process()
+before = process.memory_info().rss
+import mirage.core.app
+import mirage.libs.ble
+from mirage.libs.ble_utils.crypto import BLECrypto,BLETemporaryKeyCracker
+print(json.dumps({
+	"rss":process.memory_info().rss - before,
+	"temporaryKeys":hasattr(BLECrypto,"temporaryKeys")
+}))
+"""
+
+def test_import_does_not_build_the_temporary_keys_table():
+	# Measured in a fresh interpreter : importing the BLE stack uses about 85 MB, the table of the one million temporary keys added more than 100 MB
+	output = subprocess.run([sys.executable,"-c",IMPORT_SCRIPT],cwd=ROOT,stdout=subprocess.PIPE,check=True,timeout=120).stdout
+	result = json.loads(output.decode().strip().splitlines()[-1])
+	assert not result["temporaryKeys"]
+	assert result["rss"] < 140*1024*1024
+
+def test_temporary_key():
+	assert BLECrypto.getTemporaryKey(0) == bytes(16)
+	assert BLECrypto.getTemporaryKey(123456).hex() == "0000000000000000000000000001e240"
+	assert BLECrypto.getTemporaryKey(999999) == bytes.fromhex("000000000000000000000000000f423f")
+
+def capture(pin,address):
+	random = bytes.fromhex("abb692ebfd4601f4aad3aea40f7da5fc")[::-1]
+	pairingRequest = bytes.fromhex("01030005100001")[::-1]
+	pairingResponse = bytes.fromhex("02000005100001")[::-1]
+	confirm = BLECrypto.c1(BLECrypto.getTemporaryKey(pin),random,pairingRequest,pairingResponse,b"\x00",address,b"\x00","78:C5:E5:6E:DD:E8")
+	return (random,pairingRequest,pairingResponse,b"\x00",address,b"\x00","78:C5:E5:6E:DD:E8",confirm)
+
+def test_concurrent_cracks(monkeypatch):
+	monkeypatch.setattr(BLETemporaryKeyCracker,"numberOfPins",8192)
+	cracker = BLETemporaryKeyCracker(processes=2,chunkSize=256)
+	expected = {thread:[(thread*997 + i*613) % 8192 for i in range(4)] for thread in range(4)}
+	results = {}
+	def crack(thread):
+		results[thread] = cracker.crack([capture(pin,"08:3E:8E:E1:0B:%02X" % i) for i,pin in enumerate(expected[thread])])
+	try:
+		threads = [threading.Thread(target=crack,args=(thread,)) for thread in expected]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join(60)
+	finally:
+		cracker.close()
+	assert results == expected
+
+LTK = bytes.fromhex("112233445566778899aabbccddeeff00")
+ACCESS_ADDRESS = 0x12345678
+
+def sniffed(frame):
+	return BTLE_PPI(btle_channel=37,btle_clkn_high=0,btle_clk_100ns=0,rssi_max=0,rssi_min=0,rssi_avg=0,rssi_count=1)/BTLE(raw(frame))
+
+@pytest.fixture
+def defaultLTK(monkeypatch):
+	monkeypatch.setattr(BLELinkLayerCrypto,"contexts",{})
+	monkeypatch.setattr(BLELinkLayerCrypto,"instance",None)
+	monkeypatch.setattr(BLELinkLayerCrypto,"defaultLTK",None)
+	BLELinkLayerCrypto.provideLTK(LTK)
+
+@pytest.fixture
+def receiver(tmp_path):
+	receiver = ble.BLEReceiver(interface=str(tmp_path/"capture.pcap"))
+	yield receiver
+	receiver.stop()
+
+def test_contexts_follow_the_connections(receiver,defaultLTK):
+	# Advertisements and unknown connections don't create contexts
+	receiver.convert(sniffed(BTLE()/BTLE_ADV()/BTLE_ADV_IND(AdvA="11:22:33:44:55:66")))
+	receiver.convert(sniffed(BTLE(access_addr=0x87654321)/BTLE_DATA()/L2CAP_Hdr()/ATT_Hdr()/ATT_Read_Request(gatt_handle=3)))
+	assert BLELinkLayerCrypto.getContexts() == {}
+
+	receiver.convert(sniffed(BTLE()/BTLE_ADV()/BTLE_CONNECT_REQ(InitA="11:22:33:44:55:66",AdvA="aa:bb:cc:dd:ee:ff",AA=ACCESS_ADDRESS)))
+	assert list(BLELinkLayerCrypto.getContexts()) == [ACCESS_ADDRESS]
+	assert BLELinkLayerCrypto.getInstance(ACCESS_ADDRESS).default
+
+	# The encryption of a connection whose CONNECT_REQ has been missed
+	encryptionRequest = BTLE(access_addr=0x87654321)/BTLE_DATA()/BTLE_CTRL(opcode=CONTROL_OPCODES["LL_ENC_REQ"])/scapy_link_layers.LL_ENC_REQ(rand=0,ediv=0,skd=5,iv=7)
+	converters.convertControlPacket(encryptionRequest,receiver,BLELinkLayerCrypto.getInstance(0x87654321))
+	assert BLELinkLayerCrypto.getInstance(0x87654321).masterIv is not None
+
+	receiver.convert(sniffed(BTLE(access_addr=ACCESS_ADDRESS)/BTLE_DATA()/BTLE_CTRL()/LL_TERMINATE_IND(code=0x13)))
+	assert list(BLELinkLayerCrypto.getContexts()) == [0x87654321]
+
+def test_contexts_are_bounded(defaultLTK,monkeypatch):
+	monkeypatch.setattr(BLELinkLayerCrypto,"maxContexts",4)
+	BLELinkLayerCrypto.provideLTK(bytes(16),identifier=0x11111111)
+	for accessAddress in range(0x20000000,0x20000010):
+		BLELinkLayerCrypto.createContext(accessAddress)
+	assert list(BLELinkLayerCrypto.getContexts()) == [0x11111111] + list(range(0x2000000c,0x20000010))
+
+def session(window=30):
+	context = BLELinkLayerCrypto(LTK,window=window)
+	context.setMasterValues(0x1122334455667788,0x01020304)
+	context.setSlaveValues(0x8877665544332211,0x0a0b0c0d)
+	context.generateSessionKey()
+	return context
+
+# Packets of a connection : (counter, master to slave, header, payload)
+PACKETS = [
+	(0,True,0x03,bytes.fromhex("0e")),
+	(0,False,0x07,bytes.fromhex("0a")),
+	(1,True,0x0e,bytes(range(16))),
+	(1,False,0x1a,bytes(range(17))),
+	# Missed packets : gaps in both directions
+	(3,True,0x02,b""),
+	(5,False,0x12,bytes(range(27))),
+	(4,True,0x16,bytes(range(40))),
+	(6,False,0x02,bytes(range(251)))
+]
+
+def encryptPackets(packets):
+	sender = session()
+	encrypted = []
+	for counter,masterToSlave,header,payload in packets:
+		sender.masterCounter = sender.slaveCounter = counter
+		encrypted.append(sender.encrypt(bytes([header,len(payload)+4]) + payload,masterToSlave))
+	return encrypted
+
+def test_batched_decryption_matches_decrypt():
+	context,reference = session(),session()
+	for (counter,masterToSlave,header,payload),encrypted in zip(PACKETS,encryptPackets(PACKETS)):
+		plain,success = context.tryToDecrypt(encrypted)
+		reference.masterCounter = reference.slaveCounter = counter
+		assert (plain,success) == reference.decrypt(encrypted,masterToSlave) == (bytes([header,len(payload)+4]) + payload,True)
+		assert (context.masterCounter if masterToSlave else context.slaveCounter) == counter + 1
+	statistics = context.getStatistics()
+	assert (statistics["decryptedPackets"],statistics["failedPackets"],statistics["recoveries"],statistics["maxGap"]) == (len(PACKETS),0,2,3)
+
+def test_batched_decryption_outside_of_the_window():
+	context = session(window=4)
+	encrypted = encryptPackets([(5,True,0x02,b"abc"),(4,False,0x02,b"abc")])
+	assert context.tryToDecrypt(encrypted[0]) == (None,False)
+	assert (context.masterCounter,context.slaveCounter) == (0,0)
+	# The altered packet is rejected, the MIC is checked for every candidate
+	altered = encrypted[1][:-1] + bytes([encrypted[1][-1] ^ 1])
+	assert context.tryToDecrypt(altered) == (None,False)
+	assert context.tryToDecrypt(encrypted[1])[1]
+	assert (context.masterCounter,context.slaveCounter) == (0,5)
+	assert context.getStatistics()["failedPackets"] == 2
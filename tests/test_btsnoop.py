@@ -0,0 +1,76 @@
+import random,socket,struct,threading,time
+from mirage.libs.ble_utils.btsnoop import BtsnoopDecoder,BtsnoopStream
+
+FILE_HEADER = b"btsnoop\x00\x00\x00\x00\x01\x00\x00\x03\xea"
+
+def record(frame,flags=0):
+	return struct.pack(">IIIIq",len(frame),len(frame),flags,0,0x00e2b0ab1c0a5bf2) + frame
+
+def generateFrames(count,generator):
+	frames = []
+	for i in range(count):
+		# HCI events, commands and ACL packets of various sizes (up to a fragmented ATT MTU)
+		kind = generator.choice([b"\x01",b"\x02",b"\x04"])
+		frames.append(kind + bytes(generator.getrandbits(8) for _ in range(generator.choice([3,7,27,251,1021]))))
+	return frames
+
+def serve(server,blob,generator):
+	connection,_ = server.accept()
+	with connection:
+		offset = 0
+		while offset < len(blob):
+			size = generator.randint(1,4096)
+			connection.sendall(blob[offset:offset+size])
+			offset += size
+			if generator.random() < 0.1:
+				time.sleep(0.001)
+
+def test_stream_over_a_socket():
+	generator = random.Random(21)
+	frames = generateFrames(2000,generator)
+	blob = FILE_HEADER + b"".join(record(frame) for frame in frames)
+
+	server = socket.socket(socket.AF_INET,socket.SOCK_STREAM)
+	server.bind(("127.0.0.1",0))
+	server.listen(1)
+	serverThread = threading.Thread(target=serve,args=(server,blob,generator),daemon=True)
+	serverThread.start()
+
+	client = socket.create_connection(server.getsockname())
+	header = b""
+	while len(header) < 16:
+		header += client.recv(16 - len(header))
+	assert header == FILE_HEADER
+	client.settimeout(0.1)
+	stream = BtsnoopStream(client.recv,chunkSize=generator.randint(512,8192))
+	stream.start()
+	try:
+		received = []
+		while len(received) < len(frames):
+			frame = stream.recv(timeout=5.0)
+			assert frame is not None
+			received.append(frame)
+		assert received == frames
+
+		serverThread.join(5.0)
+		end = time.time() + 2.0
+		while stream.isStarted() and time.time() < end:
+			time.sleep(0.01)
+		assert not stream.isStarted()
+		statistics = stream.getStatistics()
+		assert statistics["receivedBytes"] == len(blob) - 16
+		assert (statistics["receivedFrames"],statistics["processedFrames"],statistics["droppedFrames"],statistics["discardedBytes"]) == (len(frames),len(frames),0,0)
+	finally:
+		stream.stop()
+		client.close()
+		server.close()
+
+def test_decoder_resynchronizes_after_invalid_bytes():
+	frames = [b"\x04\x0e\x04\x01\x03\x0c\x00",b"\x02\x40\x20\x07\x00\x03\x00\x04\x00\x0a\x03\x00"]
+	decoder = BtsnoopDecoder()
+	data = record(frames[0]) + b"\xff"*5 + record(frames[1])
+	received = []
+	for i in range(len(data)):
+		received += decoder.feed(data[i:i+1])
+	assert received == frames
+	assert decoder.discardedBytes == 5
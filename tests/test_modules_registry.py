@@ -0,0 +1,70 @@
+import os,sys,json,subprocess
+from mirage.libs import utils
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LIST_SCRIPT = """
+import sys,json
+sys.argv = ["mirage","--list"]
+from mirage.mirage import main
+from mirage.core.app import App
+main()
+print(json.dumps({"imported":list(App.Instance.loader.modulesList.loaded)}))
+"""
+
+MODULE_TEMPLATE = """from mirage.core import module
+
+class sample(module.WirelessModule):
+	def init(self):
+		self.technology = "ble"
+		self.type = "{type}"
+		self.description = "{description}"
+		self.args = {{"INTERFACE":"hci0"}}
+"""
+
+def runList(home):
+	output = subprocess.run([sys.executable,"-c",LIST_SCRIPT],cwd=ROOT,env=dict(os.environ,HOME=str(home)),stdout=subprocess.PIPE,check=True,timeout=300).stdout
+	return json.loads(output.decode().strip().splitlines()[-1])
+
+def test_list_uses_the_cached_manifest(tmp_path):
+	# "mirage --list" with an empty home directory (the manifest is built), then with the cached manifest
+	manifest = str(tmp_path/".mirage"/"modules.manifest")
+	runList(tmp_path)
+	assert os.path.isfile(manifest)
+	modification = os.stat(manifest).st_mtime_ns
+	warm = runList(tmp_path)
+	# The manifest is only written when an entry has been updated
+	assert os.stat(manifest).st_mtime_ns == modification
+	assert warm["imported"] == []
+
+def writeModule(directory,description,type="info"):
+	with open(str(directory/"sample.py"),"w") as f:
+		f.write(MODULE_TEMPLATE.format(type=type,description=description))
+
+def test_manifest_is_invalidated_when_a_module_changes(tmp_path,monkeypatch):
+	directory = tmp_path/"modules"
+	directory.mkdir()
+	manifest = str(tmp_path/"modules.manifest")
+	writeModule(directory,"first description")
+
+	registry = utils.ModulesRegistry([str(directory)],manifest)
+	assert registry.getInfo("sample")["description"] == "first description"
+	registry.saveManifest()
+
+	# The cached entry is used as long as the file is not modified
+	registry = utils.ModulesRegistry([str(directory)],manifest)
+	with monkeypatch.context() as patch:
+		patch.setattr(registry,"_extractInfo",None)
+		assert registry.getInfo("sample")["args"] == {"INTERFACE":"hci0"}
+	assert not registry.manifestUpdated
+
+	writeModule(directory,"second description",type="sniff")
+	stat = os.stat(str(directory/"sample.py"))
+	os.utime(str(directory/"sample.py"),(stat.st_atime,stat.st_mtime + 1))
+	registry = utils.ModulesRegistry([str(directory)],manifest)
+	info = registry.getInfo("sample")
+	assert (info["description"],info["type"]) == ("second description","sniff")
+	assert "sample" not in registry.loaded
+	registry.saveManifest()
+	with open(manifest) as f:
+		assert json.load(f)[str(directory/"sample.py")]["info"]["type"] == "sniff"
@@ -0,0 +1,57 @@
+import time
+from mirage.libs import wireless
+from mirage.libs.wireless_utils.device import Device
+from mirage.libs.wireless_utils.packets import Packet
+
+class RecordingDevice(Device):
+	def init(self):
+		self.sent = []
+
+	def isUp(self):
+		return True
+
+	def send(self,data):
+		self.sent.append(data)
+
+def waitFor(condition,timeout=2.0):
+	end = time.time() + timeout
+	while not condition() and time.time() < end:
+		time.sleep(0.01)
+	return condition()
+
+def test_emitter_restart_keeps_queued_packets():
+	emitter = wireless.Emitter(interface="test-restart",deviceType=RecordingDevice)
+	emitter.send(Packet(packet=b"first"))
+	assert waitFor(lambda:emitter.device.sent == [b"first"])
+
+	emitter.stop()
+	assert emitter.isEmpty()
+	packets = [Packet(packet=bytes([i])) for i in range(3)]
+	emitter.send(*packets)
+	emitter.start()
+
+	assert waitFor(lambda:len(emitter.device.sent) == 4)
+	assert emitter.device.sent[1:] == [b"\x00",b"\x01",b"\x02"]
+	assert emitter.getStatistics()["dropped"] == 0
+	assert waitFor(emitter.isEmpty)
+	emitter.stop()
+
+def test_emitter_processes_packets_following_an_interruption():
+	emitter = wireless.Emitter(interface="test-interrupt",deviceType=RecordingDevice)
+	emitter.stop()
+	# Interruption item left in the queue by a watchdog which has not consumed it
+	emitter.queue.put(wireless.PacketQueue.STOP)
+	emitter.send(Packet(packet=b"a"),Packet(packet=b"b"))
+	emitter._task()
+	assert emitter.device.sent == [b"a",b"b"]
+
+def test_start_removes_stale_interruptions():
+	emitter = wireless.Emitter(interface="test-stale",deviceType=RecordingDevice)
+	emitter.stop()
+	emitter.queue.put(wireless.PacketQueue.STOP)
+	assert not emitter.isEmpty()
+	emitter.start()
+	assert waitFor(emitter.isEmpty)
+	emitter.send(Packet(packet=b"c"))
+	assert waitFor(lambda:emitter.device.sent == [b"c"])
+	emitter.stop()
@@ -0,0 +1,148 @@
+import os,time
+from scapy.all import BTLE_RF,BTLE,BTLE_ADV,BTLE_ADV_IND,raw
+from mirage.libs import io,ble,esb
+from mirage.libs.wireless_utils.pcapDevice import PCAPWriter,PCAPDevice
+import pytest
+
+RECORD = bytes.fromhex("d6be898e0006112233445566")
+
+class SamplePCAPDevice(PCAPDevice):
+	DLT = 256
+
+@pytest.fixture
+def failures(monkeypatch):
+	messages = []
+	monkeypatch.setattr(io,"fail",messages.append)
+	return messages
+
+def waitFor(condition,timeout=2.0):
+	end = time.time() + timeout
+	while not condition() and time.time() < end:
+		time.sleep(0.01)
+	return condition()
+
+def test_writer(tmp_path):
+	writer = PCAPWriter(str(tmp_path/"capture.pcap"),dlt=256)
+	for i in range(10):
+		assert writer.put(RECORD,timestamp=1577836800+i)
+	writer.close()
+	statistics = writer.getStatistics()
+	assert (statistics["written"],statistics["dropped"],statistics["error"]) == (10,0,None)
+	assert os.path.getsize(str(tmp_path/"capture.pcap")) == statistics["bytes"] == 24 + 10*(16+len(RECORD))
+
+def test_write_error_is_reported(failures):
+	# Writing to /dev/full fails with ENOSPC, as on a full disk
+	writer = PCAPWriter("/dev/full",dlt=256,flushInterval=0.0)
+	for i in range(5):
+		writer.put(RECORD)
+	assert waitFor(lambda:writer.getStatistics()["error"] is not None)
+	assert not writer.put(RECORD)
+	writer.close()
+
+	statistics = writer.getStatistics()
+	assert "No space left on device" in statistics["error"]
+	assert (statistics["written"],statistics["dropped"],statistics["queued"]) == (0,6,0)
+	assert len(failures) == 1 and "/dev/full" in failures[0]
+
+def test_open_error_is_reported_when_closing(tmp_path,failures):
+	writer = PCAPWriter(str(tmp_path/"missing"/"capture.pcap"),dlt=256)
+	writer.close()
+	assert writer.getStatistics()["error"] is not None
+	assert len(failures) == 1
+
+def test_configure_writer_keeps_the_format(tmp_path):
+	device = SamplePCAPDevice(str(tmp_path/"capture.pcap"))
+	device.init()
+	device.configureWriter(pcapng=True)
+	device.configureWriter(maxSize=1024*1024)
+	assert device.writer.pcapng
+	assert device.writer.maxSize == 1024*1024
+	device.configureWriter(pcapng=False)
+	assert not device.writer.pcapng
+	device.close()
+
+def test_configure_keeps_the_rotation(tmp_path):
+	writer = PCAPWriter(str(tmp_path/"capture.pcap"),dlt=256)
+	writer.configure(maxSize=1024*1024)
+	writer.configure(pcapng=True,maxTime=60)
+	assert (writer.pcapng,writer.maxSize,writer.maxTime) == (True,1024*1024,60)
+	writer.configure(rotate=False)
+	assert (writer.pcapng,writer.maxSize,writer.maxTime) == (True,None,None)
+	writer.close()
+
+def test_rotation_through_an_emitter(tmp_path):
+	emitter = ble.BLEEmitter(interface=str(tmp_path/"capture.pcap"))
+	emitter.sniffAdvertisements()
+	emitter.configureWriter(maxSize=1024)
+	emitter.configureWriter(pcapng=True)
+	for i in range(100):
+		packet = ble.BLEAdvInd(addr="11:22:33:44:55:66",data=b"\x00"*20)
+		packet.additionalInformations = ble.BLESniffingParameters(clkn_high=1577836800+i,channel=37)
+		emitter.sendp(packet)
+	assert waitFor(lambda:emitter.isEmpty() and emitter.getWriterStatistics()["written"] > 0)
+	statistics = emitter.getWriterStatistics()
+	emitter.stop()
+
+	files = sorted(os.listdir(str(tmp_path)))
+	assert (statistics["dropped"],statistics["error"]) == (0,None)
+	assert len(files) > 1 and files[0] == "capture-000.pcap"
+	for filename in files:
+		with open(str(tmp_path/filename),"rb") as f:
+			data = f.read()
+		assert data[:4] == bytes.fromhex("0a0d0d0a")
+		assert len(data) <= 1024 + 128
+
+def test_close_with_referenced_raw_packets(tmp_path):
+	filename = str(tmp_path/"capture.pcap")
+	writer = PCAPWriter(filename,dlt=256)
+	for i in range(3):
+		writer.put(RECORD,timestamp=1577836800+i)
+	writer.close()
+
+	device = SamplePCAPDevice(filename)
+	device.init()
+	device.setReplaySpeed(None)
+	device.startReading()
+	timestamp,packet = device.getRawPacket(2)
+	assert (timestamp,bytes(packet)) == (1577836802,RECORD)
+	# The end of the file is reached : the device is closed while the view is still referenced
+	while device.recv() is not None:
+		pass
+	assert device.data is None
+	assert bytes(packet) == RECORD
+	device.close()
+	packet.release()
+
+def writeAdvertisements(filename,count):
+	writer = PCAPWriter(filename,dlt=256)
+	for i in range(count):
+		writer.put(raw(BTLE_RF()/BTLE()/BTLE_ADV()/BTLE_ADV_IND(AdvA="11:22:33:44:55:%02x" % i)),timestamp=1577836800+10*i)
+	writer.close()
+
+def test_replay_through_a_receiver(tmp_path):
+	filename = str(tmp_path/"capture.pcap")
+	writeAdvertisements(filename,5)
+	receiver = ble.BLEReceiver(interface=filename)
+	try:
+		assert receiver.getPacketCount() == 5
+		receiver.setReplaySpeed(None)
+		receiver.seekTime(25)
+		receiver.sniffAdvertisements()
+		assert [receiver.next(timeout=1.0).addr for i in range(2)] == ["11:22:33:44:55:03","11:22:33:44:55:04"]
+	finally:
+		receiver.stop()
+
+def test_seek_through_a_receiver(tmp_path):
+	filename = str(tmp_path/"capture.pcap")
+	writer = PCAPWriter(filename,dlt=148)
+	for i in range(3):
+		writer.put(bytes([i])*8,timestamp=1577836800+i)
+	writer.close()
+	receiver = esb.ESBReceiver(interface=filename)
+	try:
+		receiver.setReplaySpeed(None)
+		assert receiver.getRawPacket(2)[0] == 1577836802
+		receiver.seek(2)
+		assert receiver.getPacket() == (True,(1577836802,bytes([2])*8))
+	finally:
+		receiver.stop()
@@ -0,0 +1,95 @@
+import threading,time
+from base64 import b64decode,b64encode
+from mirage.libs.ble_utils.scapy_nrfsniffer_layers import SLIP_START,SLIP_END,SLIP_ESC,SLIP_ESC_START,SLIP_ESC_END,SLIP_ESC_ESC
+from mirage.libs.wireless_utils.serialTransport import SerialTransport,HeaderLengthFramer,SLIPFramer,LineFramer
+
+def slipFramer(validate=None):
+	return SLIPFramer(start=SLIP_START,end=SLIP_END,escape=SLIP_ESC,escapes={SLIP_ESC_START:SLIP_START,SLIP_ESC_END:SLIP_END,SLIP_ESC_ESC:SLIP_ESC},validate=validate)
+
+def slipEncode(frame):
+	escaped = {SLIP_START:[SLIP_ESC,SLIP_ESC_START],SLIP_END:[SLIP_ESC,SLIP_ESC_END],SLIP_ESC:[SLIP_ESC,SLIP_ESC_ESC]}
+	return bytes([SLIP_START] + [code for byte in frame for code in escaped.get(byte,[byte])] + [SLIP_END])
+
+def chainedReplaceDecode(frame):
+	# Previous decoding of the NRFSniffer frames
+	frame = frame.replace(bytes([SLIP_ESC,SLIP_ESC_ESC]),bytes([SLIP_ESC]))
+	frame = frame.replace(bytes([SLIP_ESC,SLIP_ESC_START]),bytes([SLIP_START]))
+	return frame.replace(bytes([SLIP_ESC,SLIP_ESC_END]),bytes([SLIP_END]))
+
+def test_header_length_framer():
+	framer = HeaderLengthFramer(header=0xBC,lengthOffset=2,overhead=5)
+	frames = [bytes.fromhex("bc010100aa55"),bytes.fromhex("bc02000000"),bytes.fromhex("bc030300010203bc")]
+	buffer = bytearray(b"\x00\x01" + b"".join(frames) + bytes.fromhex("bc0405"))
+	assert framer.parse(buffer) == frames
+	# The incomplete frame is kept until its end is received
+	assert buffer == bytearray(bytes.fromhex("bc0405"))
+	buffer += bytes.fromhex("00112233445566")
+	assert framer.parse(buffer) == [bytes.fromhex("bc040500112233445566")]
+	assert (buffer,framer.discardedBytes) == (bytearray(),2)
+
+def test_slip_framer_escapes():
+	framer = slipFramer()
+	frames = [bytes([SLIP_START,SLIP_END,SLIP_ESC,0x00]),b"\x01\x02",bytes([SLIP_ESC,SLIP_ESC_START]),bytes([SLIP_ESC,SLIP_ESC_END,SLIP_ESC_ESC])]
+	buffer = bytearray(b"\x00" + b"".join(slipEncode(frame) for frame in frames) + slipEncode(b"\x03")[:2])
+	assert framer.parse(buffer) == frames
+	assert buffer == bytearray(slipEncode(b"\x03")[:2])
+	assert framer.discardedBytes == 1
+
+def test_slip_framer_decodes_escaped_escape_bytes():
+	# An escaped ESC followed by the value of ESC_START : the chained replace() calls decoded it as a START byte
+	encoded = slipEncode(bytes([SLIP_ESC,SLIP_ESC_START]))
+	assert chainedReplaceDecode(encoded[1:-1]) == bytes([SLIP_START])
+	assert slipFramer().parse(bytearray(encoded)) == [bytes([SLIP_ESC,SLIP_ESC_START])]
+
+def test_slip_framer_validation():
+	framer = slipFramer(validate=lambda frame:len(frame) >= 6 and len(frame) == frame[0] + frame[1])
+	valid = bytes([6,2,SLIP_START,0x01,SLIP_END,0x02,0x10,0x20])
+	invalid = bytes([6,3,0x00,0x01,0x02,0x03])
+	assert framer.parse(bytearray(slipEncode(invalid) + slipEncode(valid))) == [valid]
+	assert framer.discardedBytes == len(slipEncode(invalid))
+
+def test_line_framer():
+	framer = LineFramer(decoder=b64decode)
+	buffer = bytearray(b64encode(b"\x01\x02") + b"\r\n" + b"A\n" + b64encode(b"\x03") + b"\n" + b"Aw")
+	assert framer.parse(buffer) == [b"\x01\x02",b"\x03"]
+	assert (buffer,framer.discardedBytes) == (bytearray(b"Aw"),1)
+	buffer += b"Q=\n"
+	assert framer.parse(buffer) == [b"\x03\x04"]
+	assert LineFramer().parse(bytearray(b"ok\r\n")) == [b"ok"]
+
+class LoopbackPort:
+	'''
+	Serial port returning the same frame indefinitely, in chunks of random sizes.
+	'''
+	def __init__(self,frame):
+		self.data = frame * 64
+		self.offset = 0
+		self.timeout = None
+		self.in_waiting = 7
+
+	def read(self,size):
+		chunk = self.data[self.offset:self.offset+size]
+		self.offset = (self.offset + size) % len(self.data)
+		if len(chunk) < size:
+			chunk += self.data[:size-len(chunk)]
+		self.in_waiting = 1 + (self.offset * 31) % 97
+		time.sleep(0)
+		return chunk
+
+	def write(self,data):
+		pass
+
+def test_flush_while_reading():
+	frame = bytes.fromhex("bc01030011223344")
+	framer = HeaderLengthFramer(header=0xBC,lengthOffset=2,overhead=5)
+	transport = SerialTransport(LoopbackPort(frame),framer,readTimeout=0.01)
+	transport.start()
+	try:
+		for i in range(200):
+			transport.flush()
+			received = transport.recv(timeout=1.0)
+			assert received is not None
+			# A flush drops the bytes of the current frame, the framer resynchronizes on the next header
+			assert received == frame
+	finally:
+		transport.stop()
@@ -0,0 +1,57 @@
+import os,time
+import pytest
+from mirage.libs import utils
+from mirage.core.taskManager import TaskManager
+
+@pytest.fixture(autouse=True)
+def tempDir(tmp_path,monkeypatch):
+	# Output files of the tasks
+	directory = tmp_path / "outputs"
+	directory.mkdir()
+	monkeypatch.setattr(utils,"getTempDir",lambda:str(directory))
+
+def record(directory,name,duration=0.0):
+	time.sleep(duration)
+	with open(os.path.join(directory,name),"w") as f:
+		f.write(name)
+
+def waitFor(condition,timeout=10.0):
+	end = time.time() + timeout
+	while not condition() and time.time() < end:
+		time.sleep(0.05)
+	return condition()
+
+def test_stopped_queued_task_does_not_run_in_reused_slot(tmp_path):
+	manager = TaskManager(capacity=8,poolSize=1,startMethod="fork")
+	try:
+		busy = manager.addTask(record,"busy",args=[str(tmp_path),"busy",1.0],pooled=True)
+		manager.startTask(busy)
+		assert waitFor(lambda:manager.getTaskState(busy) == "running")
+
+		first = manager.addTask(record,"first",args=[str(tmp_path),"first"],pooled=True)
+		manager.startTask(first)
+		assert manager.getTaskState(first) == "queued"
+		slot = manager.tasks[first].slot
+		assert manager.stopTask(first)
+
+		second = manager.addTask(record,"second",args=[str(tmp_path),"second"],pooled=True)
+		assert manager.tasks[second].slot == slot
+		manager.startTask(second)
+
+		assert waitFor(lambda:manager.getTaskState(second) == "ended")
+		assert waitFor(lambda:os.path.exists(str(tmp_path/"second")))
+		time.sleep(0.2)
+		assert not os.path.exists(str(tmp_path/"first"))
+	finally:
+		manager.stopAllTasks()
+
+def test_pooled_tasks_run_and_end(tmp_path):
+	manager = TaskManager(capacity=8,poolSize=2,startMethod="fork")
+	try:
+		names = [manager.addTask(record,"task",args=[str(tmp_path),"task"+str(i)],pooled=True) for i in range(4)]
+		for name in names:
+			manager.startTask(name)
+		assert waitFor(lambda:all(manager.getTaskState(name) == "ended" for name in names))
+		assert sorted(f for f in os.listdir(str(tmp_path)) if f != "outputs") == ["task0","task1","task2","task3"]
+	finally:
+		manager.stopAllTasks()
@@ -0,0 +1,74 @@
+from scapy.all import RadioTap,Dot11,Dot11FCS,Dot11Beacon,Dot11ProbeResp,Dot11Deauth,Dot11Disas,Dot11Elt,LLC,SNAP,Raw,raw
+from mirage.libs import wifi
+from mirage.libs.wifi_utils.dot11 import parseManagementFrame,buildManagementFilter
+import pytest
+
+ADDRESSES = {"addr1":"ff:ff:ff:ff:ff:ff","addr2":"00:11:22:33:44:55","addr3":"00:11:22:33:44:55"}
+RSN = Dot11Elt(ID=48,info=bytes.fromhex("0100000fac040100000fac040100000fac020000"))
+WPA = Dot11Elt(ID=221,info=bytes.fromhex("0050f20101000050f20201000050f20201000050f202"))
+
+def ssid(name):
+	return Dot11Elt(ID=0,info=name)
+
+def channel(number):
+	return Dot11Elt(ID=3,info=bytes([number]))
+
+FRAMES = {
+	"beacon_open":RadioTap()/Dot11(type=0,subtype=8,**ADDRESSES)/Dot11Beacon(cap="ESS+short-slot")/ssid(b"mirage")/channel(6),
+	"beacon_wep":RadioTap()/Dot11(type=0,subtype=8,**ADDRESSES)/Dot11Beacon(cap="ESS+privacy+short-slot")/ssid(b"mirage")/channel(6),
+	"beacon_wpa2":RadioTap()/Dot11(type=0,subtype=8,**ADDRESSES)/Dot11Beacon(cap="ESS+privacy+short-slot")/ssid(b"mirage")/channel(11)/RSN,
+	"beacon_fcs":RadioTap(present="TSFT+Flags+Rate+Channel+dBm_AntSignal",Flags="FCS",Rate=2,ChannelFrequency=2437,ChannelFlags=0xa0,dBm_AntSignal=-40)/Dot11FCS(type=0,subtype=8,**ADDRESSES)/Dot11Beacon(cap="ESS+short-slot")/ssid(b"caf\xc3\xa9")/channel(6),
+	"probe_response_wpa":RadioTap()/Dot11(type=0,subtype=5,**ADDRESSES)/Dot11ProbeResp(cap="ESS+privacy+short-slot")/ssid(b"mirage")/channel(1)/WPA,
+	"probe_request":RadioTap()/Dot11(type=0,subtype=4,**ADDRESSES)/ssid(b"mirage"),
+	"deauthentication":RadioTap()/Dot11(type=0,subtype=12,**ADDRESSES)/Dot11Deauth(reason=7),
+	"disassociation":RadioTap()/Dot11(type=0,subtype=10,**ADDRESSES)/Dot11Disas(reason=8),
+	"protected_deauthentication":RadioTap()/Dot11(type=0,subtype=12,FCfield="protected",**ADDRESSES)/Raw(bytes(12)),
+	"data":RadioTap()/Dot11(type=2,subtype=0,**ADDRESSES)/LLC()/SNAP()/Raw(b"payload")
+}
+
+# Intended differences between the scapy conversion and the lightweight parser, indexed by frame : attribute -> (possible scapy values, parser value)
+DIFFERENCES = {
+	# The scapy conversion reads the capabilities from the information elements layer, the privacy bit is never found
+	"beacon_wep":{"cypher":({"OPN"},"WEP")},
+	# The scapy conversion adds OPN (or WEP) before finding the RSN or WPA element, the result depends on the order of a set
+	"beacon_wpa2":{"cypher":({"OPN","WPA2"},"WPA2")},
+	"probe_response_wpa":{"cypher":({"OPN","WPA"},"WPA")}
+}
+
+class MonitorDevice:
+	fastMode = False
+	linkType = 803
+
+class ScapyReceiver:
+	device = MonitorDevice()
+
+def attributes(packet):
+	return {name:value for name,value in vars(packet).items() if name not in ("raw","_packet","packet")}
+
+@pytest.mark.parametrize("name",FRAMES)
+def test_parser_matches_scapy_conversion(name):
+	frame = raw(FRAMES[name])
+	parsed = parseManagementFrame(frame)
+	assert raw(parsed.packet) == frame
+	if name == "protected_deauthentication":
+		# The body of a protected frame is not parsed, the scapy conversion fails
+		with pytest.raises(IndexError):
+			wifi.WifiReceiver.convert(ScapyReceiver(),frame)
+		assert (type(parsed),parsed.reason) == (wifi.WifiDeauth,None)
+		return
+
+	converted = wifi.WifiReceiver.convert(ScapyReceiver(),frame)
+	assert type(parsed) is type(converted)
+	expected,actual = attributes(converted),attributes(parsed)
+	for attribute,(scapyValues,parserValue) in DIFFERENCES.get(name,{}).items():
+		assert expected.pop(attribute) in scapyValues
+		assert actual.pop(attribute) == parserValue
+	assert actual == expected
+
+def test_parsed_fields():
+	beacon = parseManagementFrame(raw(FRAMES["beacon_fcs"]))
+	assert (beacon.SSID,beacon.channel,beacon.cypher,beacon.srcMac) == ("café",6,"OPN","00:11:22:33:44:55")
+	assert parseManagementFrame(raw(FRAMES["deauthentication"])).reason == 7
+
+def test_management_filter():
+	assert buildManagementFilter(subtypes=[4,5,8])[-5:] == [(0x15,3,0,0x40),(0x15,2,0,0x50),(0x15,1,0,0x80),(0x06,0,0,0),(0x06,0,0,0x40000)]